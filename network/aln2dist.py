@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+
+"""
+Name
+
+    aln2dist.py - Pairwise Hamming distances of haplotypes, as a PHYLIP
+                  distance matrix or an edge list
+
+SYNOPSIS
+
+    aln2dist.py [--format phylip|edges] [--max-dist D] [--missing=-N]
+        [--fold-case] [--collapse] [--jobs N] <input> <output>
+
+DESCRIPTION
+
+    Input is a FASTA alignment, or its packed file, see 'aln2pak.py', or a
+    fluxus network '.rdf' or '.ami' file of 'create_rdf.py' and
+    'create_ami.py'. Distances of an alignment are computed over its
+    variation sites only, since invariant sites add nothing.
+
+    Differences are counted by popcount of bitsets of each character state,
+    by tiles of sequences, in parallel with '--jobs N'. See 'hamming.py'.
+
+    Output formats:
+
+        phylip  - A square strict PHYLIP distance matrix, names truncated
+                  or padded to 10 characters, with a warning of names not
+                  unique after truncation. Needs N x N x 4 bytes of memory
+        edges   - Tab-delimited pairs of sequences within '--max-dist',
+                  without a full matrix:
+
+============================================================
+#Source Target  Distance
+SQ1     SQ2     1
+SQ1     SQ5     3
+============================================================
+
+    Characters of '--missing=-N?' are not compared between two
+    sequences. Default, all characters, including gaps, are states.
+
+    With '--collapse', identical sequences of an alignment are collapsed
+    into one haplotype first, and member IDs are written into the map file.
+    Names and frequencies of a fluxus file are kept as they are.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+
+"""
+
+import argparse
+import sys
+
+from collections import defaultdict
+
+from alnmat import (collapse, read_aln, read_fluxus, var_sites,
+                    write_haplotypes)
+from hamming import (bit_planes, dist_edges, dist_matrix, write_edges,
+                     write_phylip)
+
+#===========================================================
+#
+#                   Main
+#
+#===========================================================
+
+argParser   = argparse.ArgumentParser(
+    description="Pairwise Hamming distances of haplotypes")
+argParser.add_argument("fin", action="store",
+    help="Fasta format alignment, packed alignment, or fluxus .rdf/.ami "
+         "file")
+argParser.add_argument("fout", action="store",
+    help="Output distance file")
+argParser.add_argument("-f", "--format", action="store", default="phylip",
+    choices=["phylip", "edges"],
+    help="Output format. Default 'phylip'.")
+argParser.add_argument("--max-dist", action="store", type=int,
+    dest="max_dist",
+    help="Maximum distance of edges. Implies '--format edges'.")
+argParser.add_argument("--missing", action="store", default="",
+    help="Characters not compared, e.g. '--missing=-N?'. Default none.")
+argParser.add_argument("--fold-case", action="store_true", dest="fold_case",
+    help="Compare letters case insensitively.")
+argParser.add_argument("--collapse", action="store_true",
+    help="Collapse identical sequences of an alignment.")
+argParser.add_argument("--map", action="store", dest="fmap",
+    help="Output haplotype to member IDs mapping file. "
+         "Default '<output>.map'.")
+argParser.add_argument("-j", "--jobs", action="store", type=int, default=1,
+    help="Number of processes. Default 1.")
+
+args    = argParser.parse_args()
+
+if args.max_dist is not None:
+    args.format = "edges"
+elif args.format == "edges":
+    sys.exit("[ERROR] Option '--format edges' needs '--max-dist'.")
+
+missing = args.missing.encode()
+
+if args.fin.lower().endswith((".rdf", ".ami")):
+    print("[DEBUG] Reading fluxus file {}" . format(args.fin))
+    names, _, vmat  = read_fluxus(args.fin)
+else:
+    print("[DEBUG] Reading alignment file {}" . format(args.fin))
+    names, mat  = read_aln(args.fin)
+
+    # A column of one state besides gaps adds nothing, if gaps are missing
+    sites   = var_sites(mat, 'ignore' if b'-' in missing else 'keep',
+                        args.fold_case, args.jobs)
+    vmat    = mat[:, sites]
+
+    print("Alignment length:\t%d" % mat.shape[1])
+
+    if args.collapse:
+        freqs, members  = collapse(names, vmat, defaultdict(str))
+        reps    = sorted(members)
+
+        with open(args.fmap or args.fout + ".map", "w") as fh_map:
+            write_haplotypes(fh_map, names, vmat.shape[1], freqs, members)
+
+        names   = [names[i] for i in reps]
+        vmat    = vmat[reps]
+
+        print("Haplotypes:\t%d" % len(names))
+
+print("Sequences:\t%d" % len(names))
+print("Sites:\t%d" % vmat.shape[1])
+
+planes  = bit_planes(vmat, missing, args.fold_case)
+
+with open(args.fout, "w") as fh_out:
+    if args.format == "phylip":
+        write_phylip(fh_out, names, dist_matrix(planes, args.jobs))
+    else:
+        n   = write_edges(fh_out, names,
+                          dist_edges(planes, args.max_dist, args.jobs))
+
+        print("Edges:\t%d" % n)
+
+print("OK!")
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+
+"""
+Name
+
+    aln2pak.py  - Convert a FASTA alignment into a packed alignment file
+
+SYNOPSIS
+
+    aln2pak.py <Fasta file> [<packed file>]
+
+DESCRIPTION
+
+    The packed alignment, default '<Fasta file>.apk', is memory mapped by
+    'create_rdf.py' and 'create_ami.py' instead of parsing the FASTA file.
+    An up to date '<Fasta file>.apk' is used automatically, when the FASTA
+    file is given.
+
+    Nucleotides and gaps are packed into 4 bits, 2 characters per byte,
+    if all characters are uppercase IUPAC codes or '-'. Otherwise, e.g.
+    protein, characters are kept in 8 bits. See 'alnmat.py'.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+
+"""
+
+import argparse
+import os
+
+from alnmat import PAK_SUFFIX, pack_aln
+
+#===========================================================
+#
+#                   Main
+#
+#===========================================================
+
+argParser   = argparse.ArgumentParser(
+    description="Convert a FASTA alignment into a packed alignment file")
+argParser.add_argument("fseq", action="store",
+    help="Fasta format sequence alignment file")
+argParser.add_argument("fpak", action="store", nargs="?",
+    help="Output packed alignment file. Default '<Fasta file>.apk'")
+
+args    = argParser.parse_args()
+
+fpak    = args.fpak or args.fseq + PAK_SUFFIX
+
+nseq, ncols, bits   = pack_aln(args.fseq, fpak)
+
+print("Sequences:\t%d" % nseq)
+print("Alignment length:\t%d" % ncols)
+print("Bits per character:\t%d" % bits)
+print("Packed file:\t%s, %d bytes, %.1f%% of FASTA" % (fpak,
+      os.path.getsize(fpak),
+      100.0 * os.path.getsize(fpak) / os.path.getsize(args.fseq)))
+
+print("OK!")
@@ -0,0 +1,1176 @@
+#!/usr/bin/python3
+
+"""
+Name
+
+    alnmat.py   - Alignment as a uint8 matrix, for fluxus network scripts
+
+SYNOPSIS
+
+    from alnmat import read_aln, var_sites, write_fluxus
+
+    ids, mat    = read_aln('aln.fasta')
+    sites       = var_sites(mat, gaps='skip', fold_case=True)
+
+    with open('out.rdf', 'w') as fh:
+        write_fluxus(fh, site_names(sites), ids, mat[:, sites], info)
+
+DESCRIPTION
+
+    A FASTA alignment of N sequences of length L is loaded once into an
+    N x L numpy uint8 matrix, one byte per character.
+
+    Variable sites are found by counting characters of each column, by
+    vectorized operations over blocks of columns, instead of slicing the
+    alignment column by column. Counts take 1 KB per column. Gaps '-' are
+    handled by one of:
+
+        keep    - A gap is a character state, as 'create_ami.py'
+        skip    - Dismiss columns with any gap, as 'create_rdf.py'
+        ignore  - Remove gaps, then test the remaining characters
+
+    With 'fold_case', lowercase letters are compared as uppercase, while
+    output keeps the original characters.
+
+    With 'jobs' > 1, spans of columns are scanned by a pool of processes.
+    A matrix is placed once into shared memory, and a PackedAln is memory
+    mapped by each process. Workers write counts and variable site masks
+    into shared memory, so results are identical to a single process.
+
+    The matrix of variable sites is then gathered by a single fancy index
+    'mat[:, sites]'.
+
+    A large alignment can be converted once by 'aln2pak.py' into a packed
+    file, which is memory mapped instead of parsed:
+
+============================================================
+'APAK' <B version> <B bits> <H 0>       <-  Magic, bits per character
+<Q N> <Q L> <Q size of IDs>
+IDs, delimited by '\n', padded to 8 bytes
+N rows of packed characters
+============================================================
+
+    With 4 bits, each byte holds 2 columns, high nibble first, of codes
+    of '-ACGTRYKMSWBDHVN'. It is used only if all characters of the
+    alignment are in this set, so that output is the same as the FASTA.
+    Otherwise, e.g. protein or lowercase letters, 8 bits raw characters.
+
+    Identical haplotypes can be collapsed by collapse() into one record
+    of the real frequency, optionally within the same phenotype, geography
+    or lineage. The mapping to member IDs is written by write_haplotypes().
+
+    update_sites() keeps column counts, variable sites and their matrix
+    in a state file '<FASTA file>.vst'. If sequences have only been
+    appended to the alignment since, i.e. the old file size and a digest
+    of the whole old file are unchanged, only new sequences are parsed and
+    counted. The digest is of a sequential read, still far cheaper than
+    parsing, and is extended by appended bytes only for the next run.
+    Otherwise the state is rebuilt by a full scan. Newly variable columns
+    are filled for old rows by counts, unless old rows have more than one
+    character, e.g. mixed case, and columns no longer variable, e.g. new
+    gaps with 'skip', are dropped.
+
+    Variable sites of many subsets of sequences, e.g. by geography, are
+    found by subset_sites() in one pass over blocks of columns. A subset of
+    more than half of the sequences is counted by its complement, which is
+    subtracted from counts of all sequences.
+
+    read_aln() opens a packed file, given directly or as an up to date
+    '<FASTA file>.apk', as a PackedAln. It is scanned block by block of
+    columns, so peak memory does not grow with the alignment size.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+    0.0.2   2026-10-18  Packed and memory mapped alignment, PackedAln.
+    0.0.3   2026-10-18  Collapse identical haplotypes.
+    0.0.4   2026-10-18  Character counts of columns. Parallel scan.
+    0.0.5   2026-10-18  Variable site state of appended alignments.
+    0.0.6   2026-10-18  Read fluxus network files.
+    0.0.7   2026-10-18  Variable sites of subsets by one pass.
+
+"""
+
+import hashlib
+import multiprocessing
+import os
+import re
+import struct
+import sys
+import tempfile
+import zipfile
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+GAP         = ord('-')
+
+# Indices of data fields, which haplotypes can be collapsed within
+DATA_FIELDS = {'phenotype' : 0, 'geography' : 1, 'lineage' : 2,
+               'group1' : 3, 'group2' : 4, 'group3' : 5}
+
+# No. of cells, sequences x columns, tested at a time. Bounds temporary
+# arrays
+BLOCK_CELLS = 1 << 22
+
+# Size of blocks read from a FASTA file
+READ_SIZE   = 1 << 24
+
+# Packed alignment file
+PAK_MAGIC   = b'APAK'
+PAK_VERSION = 1
+PAK_HEADER  = '<4sBBHQQQ'
+PAK_SUFFIX  = '.apk'
+
+# Variable site state of an appended alignment. Version 2 hashes the whole
+# old alignment
+STATE_SUFFIX    = '.vst'
+STATE_VERSION   = 2
+
+# 4-bit codes of IUPAC nucleotides and gap
+CODES       = b'-ACGTRYKMSWBDHVN'
+DECODE      = np.frombuffer(CODES, dtype=np.uint8)
+ENCODE      = np.zeros(256, dtype=np.uint8)
+ENCODE[DECODE]  = np.arange(len(CODES), dtype=np.uint8)
+
+# Lookup table to convert lowercase ASCII letters into uppercase
+UPPER       = np.arange(256, dtype=np.uint8)
+UPPER[ord('a'):ord('z') + 1]    -= 32
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def fasta_records(fh):
+    """
+    Desc:
+        Parse FASTA records from a binary file handle, by blocks.
+    Args:
+        fh      - A binary file handle
+    Ret:
+        A generator of (sequence ID, sequence bytes). ID is the first word
+        of each header, the same as Bio.SeqIO.
+    """
+
+    rest    = b''
+
+    while True:
+        block   = fh.read(READ_SIZE)
+        parts   = (rest + block).split(b'\n>')
+        rest    = parts.pop() if block else b''
+
+        for part in parts:
+            if not part.strip():
+                continue
+
+            header, _, seq  = part.lstrip(b'>').partition(b'\n')
+
+            yield ((header.split() or [b''])[0].decode(),
+                   seq.replace(b'\n', b'').replace(b'\r', b'')
+                      .replace(b' ', b''))
+
+        if not block:
+            return
+
+#===========================================================
+
+def is_packed(fin):
+    "Whether a file is a packed alignment"
+
+    with open(fin, 'rb') as fh:
+        return fh.read(len(PAK_MAGIC)) == PAK_MAGIC
+
+#===========================================================
+
+def read_aln(fseq):
+    """
+    Desc:
+        Read a FASTA format alignment into a matrix, or open a packed
+        alignment.
+    Args:
+        fseq    - FASTA alignment file, or packed alignment file
+    Ret:
+        ids     - A list of sequence IDs, the first word of each header,
+                  the same as Bio.SeqIO
+        mat     - A numpy uint8 matrix of N sequences x L columns, or a
+                  PackedAln of a packed file, or an up to date
+                  '<FASTA file>.apk'
+    """
+
+    fpak    = fseq + PAK_SUFFIX
+
+    if is_packed(fseq):
+        fpak    = fseq
+    elif not os.path.exists(fpak) \
+        or os.path.getmtime(fpak) < os.path.getmtime(fseq):
+        fpak    = None
+
+    if fpak:
+        mat = PackedAln(fpak)
+
+        return mat.ids, mat
+
+    ids     = []
+    seqs    = []
+
+    with open(fseq, 'rb') as fh:
+        for seq_id, seq in fasta_records(fh):
+            ids.append(seq_id)
+            seqs.append(seq)
+
+    if not seqs:
+        sys.exit("[ERROR] No sequence in alignment '%s'." % fseq)
+
+    if any(len(s) != len(seqs[0]) for s in seqs):
+        sys.exit("[ERROR] Sequences in alignment '%s' are not of the "
+                 "same length." % fseq)
+
+    mat = np.frombuffer(b''.join(seqs), dtype=np.uint8) \
+        .reshape(len(seqs), len(seqs[0]))
+
+    return ids, mat
+
+#===========================================================
+
+def pack_aln(fseq, fpak):
+    """
+    Desc:
+        Convert a FASTA alignment into a packed alignment file, by two
+        passes, so only one sequence is held in memory at a time.
+    Args:
+        fseq    - FASTA alignment file
+        fpak    - Output packed alignment file
+    Ret:
+        nseq    - No. of sequences
+        ncols   - Alignment length
+        bits    - Bits per character, 4 or 8
+    """
+
+    ids     = []
+    ncols   = None
+    bits    = 4
+
+    # Pass 1: IDs, length and whether all characters can be 4-bit coded
+    with open(fseq, 'rb') as fh:
+        for seq_id, seq in fasta_records(fh):
+            if ncols is None:
+                ncols   = len(seq)
+            elif len(seq) != ncols:
+                sys.exit("[ERROR] Sequences in alignment '%s' are not of "
+                         "the same length." % fseq)
+
+            if bits == 4 and seq.translate(None, CODES):
+                bits    = 8
+
+            ids.append(seq_id)
+
+    if not ids:
+        sys.exit("[ERROR] No sequence in alignment '%s'." % fseq)
+
+    id_text = '\n'.join(ids).encode()
+
+    # Pass 2: Pack sequences
+    with open(fseq, 'rb') as fh, open(fpak, 'wb') as fh_pak:
+        fh_pak.write(struct.pack(PAK_HEADER, PAK_MAGIC, PAK_VERSION, bits, 0,
+                                 len(ids), ncols, len(id_text)))
+        fh_pak.write(id_text + b'\0' * (-len(id_text) % 8))
+
+        for seq_id, seq in fasta_records(fh):
+            if bits == 8:
+                fh_pak.write(seq)
+            else:
+                codes   = ENCODE[np.frombuffer(seq + b'-' * (ncols % 2),
+                                               dtype=np.uint8)]
+                fh_pak.write((codes[0::2] << 4 | codes[1::2]).tobytes())
+
+    return len(ids), ncols, bits
+
+#===========================================================
+
+def column_counts(mat, start=0, stop=None):
+    """
+    Desc:
+        Count characters of each column, by blocks of columns.
+    Args:
+        mat     - A numpy uint8 matrix of N sequences x L columns, or a
+                  PackedAln
+        start   - 0-based first column. Default 0
+        stop    - 0-based end column, exclusive. Default L
+    Ret:
+        A numpy uint32 matrix of (stop - start) columns x 256 characters.
+    """
+
+    stop    = mat.shape[1] if stop is None else stop
+
+    if isinstance(mat, PackedAln) and mat.bits == 4:
+        return mat.column_counts(start, stop)
+
+    counts  = np.zeros((stop - start, 256), dtype=np.uint32)
+    width   = max(8, BLOCK_CELLS // max(mat.shape[0], 1))
+
+    for a in range(start, stop, width):
+        b       = min(a + width, stop)
+        counts[a - start:b - start] = block_counts(mat[:, a:b])
+
+    return counts
+
+#===========================================================
+
+def block_counts(block):
+    "Character counts of a block of a matrix, columns x 256 characters"
+
+    width   = block.shape[1]
+
+    # Character of column j counted in bin 256 * j + character
+    bins    = block + np.arange(0, 256 * width, 256, dtype=np.intp)
+
+    return np.bincount(bins.ravel(), minlength=256 * width) \
+        .reshape(width, 256)
+
+#===========================================================
+
+def vsite_mask(counts, gaps='keep', fold_case=False):
+    """
+    Desc:
+        Variable columns by character counts.
+    Args:
+        counts      - Character counts of columns, by column_counts()
+        gaps        - 'keep', 'skip' or 'ignore' gaps. Default 'keep'
+        fold_case   - Compare letters case insensitively. Default False
+    Ret:
+        A numpy bool array of each column.
+    """
+
+    present = counts > 0
+
+    if fold_case:
+        present[:, ord('A'):ord('Z') + 1]   |= \
+            present[:, ord('a'):ord('z') + 1]
+        present[:, ord('a'):ord('z') + 1]   = False
+
+    states  = present.sum(axis=1)
+
+    if gaps == 'keep':
+        return states > 1
+
+    gap = present[:, GAP]
+
+    if gaps == 'skip':      # Dismiss columns with any gap
+        return ~gap & (states > 1)
+    else:                   # Not a state. A column of all gaps is invariant
+        return states - gap > 1
+
+#===========================================================
+
+def _init_worker(source, shape, counts_name, mask_name):
+    "Attach a worker process to shared alignment and result arrays"
+
+    global _worker
+
+    shms    = [shared_memory.SharedMemory(name=name)
+               for name in (counts_name, mask_name)]
+    _worker = {
+        'shms'      : shms,
+        'counts'    : np.ndarray((shape[1], 256), dtype=np.uint32,
+                                 buffer=shms[0].buf),
+        'mask'      : np.ndarray(shape[1], dtype=np.bool_,
+                                 buffer=shms[1].buf),
+    }
+
+    if source[0] == 'pak':  # Memory mapped by each worker
+        _worker['mat']  = PackedAln(source[1])
+    else:
+        shms.append(shared_memory.SharedMemory(name=source[1]))
+        _worker['mat']  = np.ndarray(shape, dtype=np.uint8,
+                                     buffer=shms[-1].buf)
+
+def _scan_span(task):
+    "Count characters and test variable columns of a span, in a worker"
+
+    start, stop, gaps, fold_case    = task
+
+    counts  = column_counts(_worker['mat'], start, stop)
+
+    _worker['counts'][start:stop]   = counts
+    _worker['mask'][start:stop]     = vsite_mask(counts, gaps, fold_case)
+
+#===========================================================
+
+def scan_columns(mat, gaps='keep', fold_case=False, jobs=1):
+    """
+    Desc:
+        Character counts and variable sites of all columns.
+    Args:
+        mat         - A numpy uint8 matrix of N sequences x L columns, or a
+                      PackedAln
+        gaps        - 'keep', 'skip' or 'ignore' gaps. Default 'keep'
+        fold_case   - Compare letters case insensitively. Default False
+        jobs        - No. of processes. Default 1
+    Ret:
+        mask        - A numpy bool array of variable columns
+        counts      - A numpy uint32 matrix of L columns x 256 characters
+    """
+
+    ncols   = mat.shape[1]
+
+    if jobs <= 1 or ncols < 2:
+        counts  = column_counts(mat)
+
+        return vsite_mask(counts, gaps, fold_case), counts
+
+    # Results are written by workers into shared memory. A matrix is
+    # placed into shared memory once, a PackedAln is memory mapped by each
+    # worker, so workers never receive a copy of alignment
+    shms    = [shared_memory.SharedMemory(create=True, size=ncols * 256 * 4),
+               shared_memory.SharedMemory(create=True, size=ncols)]
+
+    try:
+        if isinstance(mat, PackedAln):
+            source  = ('pak', mat.path)
+        else:
+            shms.append(shared_memory.SharedMemory(create=True,
+                                                   size=max(mat.nbytes, 1)))
+            np.ndarray(mat.shape, dtype=np.uint8, buffer=shms[-1].buf)[:] \
+                = mat
+            source  = ('shm', shms[-1].name)
+
+        # A few spans for each process, to balance the load
+        step    = -(-ncols // (jobs * 4))
+        tasks   = [(start, min(start + step, ncols), gaps, fold_case)
+                   for start in range(0, ncols, step)]
+
+        with multiprocessing.Pool(jobs, _init_worker,
+                (source, mat.shape, shms[0].name, shms[1].name)) as pool:
+            for _ in pool.imap_unordered(_scan_span, tasks):
+                pass
+
+        counts  = np.ndarray((ncols, 256), dtype=np.uint32,
+                             buffer=shms[0].buf).copy()
+        mask    = np.ndarray(ncols, dtype=np.bool_, buffer=shms[1].buf).copy()
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+    return mask, counts
+
+#===========================================================
+
+def var_sites(mat, gaps='keep', fold_case=False, jobs=1):
+    """
+    Desc:
+        Find variable sites of an alignment matrix.
+    Args:
+        mat         - A numpy uint8 matrix of N sequences x L columns, or a
+                      PackedAln
+        gaps        - 'keep', 'skip' or 'ignore' gaps. Default 'keep'
+        fold_case   - Compare letters case insensitively. Default False
+        jobs        - No. of processes. Default 1
+    Ret:
+        A numpy array of 0-based indices of variable columns.
+    """
+
+    mask, _ = scan_columns(mat, gaps, fold_case, jobs)
+
+    return np.flatnonzero(mask)
+
+#===========================================================
+
+def prefix_digest(fseq, size, start=0, h=None):
+    """
+    Desc:
+        BLAKE2b digest of the first 'size' bytes of a file. A digest of the
+        first 'start' bytes is extended by the bytes after only.
+    Args:
+        fseq    - File
+        size    - Bytes of the digest
+        start   - Bytes already in 'h'. Default 0
+        h       - A hashlib.blake2b object of the first 'start' bytes.
+                  Default a new one
+    Ret:
+        The hashlib.blake2b object.
+    """
+
+    h       = h or hashlib.blake2b(digest_size=16)
+    size    -= start
+
+    # A sequential read, without parsing, so any edit of the old alignment
+    # is detected
+    with open(fseq, 'rb') as fh:
+        fh.seek(start)
+
+        while size > 0:
+            block   = fh.read(min(size, READ_SIZE))
+
+            if not block:
+                break
+
+            h.update(block)
+            size    -= len(block)
+
+    return h
+
+#===========================================================
+
+def load_state(fstate, fseq, gaps, fold_case):
+    """
+    Desc:
+        Load the variable site state of an alignment, if it is of the same
+        settings and the alignment has only been appended since.
+    Args:
+        fstate      - State file
+        fseq        - FASTA alignment file
+        gaps        - 'keep', 'skip' or 'ignore' gaps
+        fold_case   - Compare letters case insensitively
+    Ret:
+        A dictionary of state arrays, and 'hash' of the old alignment, or
+        None.
+    """
+
+    try:
+        with np.load(fstate) as npz:
+            state   = {key : npz[key] for key in npz.files}
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None
+
+    # Counts are saved of present characters only
+    counts  = np.zeros((state['counts'].shape[0], 256), dtype=np.uint32)
+    counts[:, state['chars']]   = state['counts']
+    state['counts'] = counts
+
+    size    = int(state['size'])
+
+    if int(state['version']) != STATE_VERSION \
+        or str(state['gaps']) != gaps \
+        or bool(state['fold_case']) != fold_case:
+        print("[NOTE] State '%s' is of other settings. Rescan the whole "
+              "alignment." % fstate)
+        return None
+
+    if os.path.getsize(fseq) < size:
+        state['hash']   = None
+    else:
+        state['hash']   = prefix_digest(fseq, size)
+
+    if state['hash'] is None \
+        or str(state['digest']) != state['hash'].hexdigest():
+        print("[NOTE] Alignment '%s' was changed, not only appended, since "
+              "state '%s'. Rescan the whole alignment." % (fseq, fstate))
+        return None
+
+    # Appended text must start a new record
+    with open(fseq, 'rb') as fh:
+        fh.seek(size)
+        head    = fh.read(256).lstrip()
+
+    if head and not head.startswith(b'>'):
+        print("[NOTE] Appended text of '%s' does not start a record. "
+              "Rescan the whole alignment." % fseq)
+        return None
+
+    return state
+
+#===========================================================
+
+def save_state(fstate, size, digest, ids, counts, sites, vmat, gaps,
+               fold_case):
+    "Write the variable site state of the first 'size' bytes of alignment"
+
+    chars   = np.flatnonzero(counts.any(axis=0))
+
+    # Not compressed, which would take longer than a full scan
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(fstate) or '.',
+                                     suffix='.tmp', delete=False) as fh:
+        np.savez(fh, version=STATE_VERSION, gaps=gaps, fold_case=fold_case,
+            size=size, digest=digest,
+            ids=np.frombuffer('\n'.join(ids).encode(), dtype=np.uint8),
+            chars=chars, counts=counts[:, chars], sites=sites, vmat=vmat)
+
+    os.chmod(fh.name, 0o644)    # Not 0600 of a temporary file
+    os.replace(fh.name, fstate)
+
+#===========================================================
+
+def update_sites(fseq, gaps='keep', fold_case=False, jobs=1, fstate=None):
+    """
+    Desc:
+        Variable sites of a FASTA alignment, updated from a state file if
+        sequences have only been appended to the alignment since. The
+        state is then written for the next run.
+    Args:
+        fseq        - FASTA alignment file
+        gaps        - 'keep', 'skip' or 'ignore' gaps. Default 'keep'
+        fold_case   - Compare letters case insensitively. Default False
+        jobs        - No. of processes of a full scan. Default 1
+        fstate      - State file. Default '<FASTA file>.vst'
+    Ret:
+        ids     - A list of sequence IDs
+        sites   - A numpy array of 0-based indices of variable columns
+        vmat    - A numpy uint8 matrix of N sequences x variable sites
+    """
+
+    if is_packed(fseq):
+        sys.exit("[ERROR] Variable site state needs a FASTA alignment, "
+                 "not packed '%s'." % fseq)
+
+    fstate  = fstate or fseq + STATE_SUFFIX
+    size    = os.path.getsize(fseq)
+    state   = load_state(fstate, fseq, gaps, fold_case)
+
+    if state is not None:
+        new_ids = []
+        seqs    = []
+        ncols   = state['counts'].shape[0]
+
+        with open(fseq, 'rb') as fh:
+            fh.seek(int(state['size']))
+
+            for seq_id, seq in fasta_records(fh):
+                new_ids.append(seq_id)
+                seqs.append(seq)
+
+        if any(len(s) != ncols for s in seqs):
+            print("[WARNING] Appended sequences are not of the alignment "
+                  "length. Rescan the whole alignment.")
+            state   = None
+
+    if state is None:
+        ids, mat        = read_aln(fseq)
+        mask, counts    = scan_columns(mat, gaps, fold_case, jobs)
+        sites           = np.flatnonzero(mask)
+        vmat            = mat[:, sites]
+
+        save_state(fstate, size, prefix_digest(fseq, size).hexdigest(), ids,
+                   counts, sites, vmat, gaps, fold_case)
+
+        return ids, sites, vmat
+
+    ids         = state['ids'].tobytes().decode().split('\n')
+    old_counts  = state['counts']
+    old_sites   = state['sites']
+    old_vmat    = state['vmat']
+    nold        = len(ids)
+
+    new     = np.frombuffer(b''.join(seqs), dtype=np.uint8) \
+        .reshape(len(seqs), ncols)
+    counts  = old_counts + column_counts(new)
+    sites   = np.flatnonzero(vsite_mask(counts, gaps, fold_case))
+
+    # Old rows of sites variable before are taken from the state
+    pos     = np.minimum(np.searchsorted(old_sites, sites),
+                         max(len(old_sites) - 1, 0))
+    known   = old_sites[pos] == sites if len(old_sites) \
+        else np.zeros(len(sites), dtype=np.bool_)
+    vmat    = np.empty((nold + len(seqs), len(sites)), dtype=np.uint8)
+
+    vmat[:nold, known]  = old_vmat[:, pos[known]]
+
+    # A newly variable column of a single character in old rows is filled
+    # by counts. Otherwise, e.g. mixed case or gaps, old rows are read
+    fresh   = np.flatnonzero(~known)
+    single  = (old_counts[sites[fresh]] > 0).sum(axis=1) == 1
+
+    vmat[:nold, fresh[single]]  = \
+        old_counts[sites[fresh[single]]].argmax(axis=1)
+
+    if not single.all():
+        print("[NOTE] %d newly variable sites are not of a single "
+              "character in old sequences. Read the whole alignment."
+              % (~single).sum())
+
+        _, mat  = read_aln(fseq)
+        vmat[:nold, fresh[~single]] = mat[:, sites[fresh[~single]]][:nold]
+
+    vmat[nold:] = new[:, sites]
+
+    print("[NOTE] Appended sequences %d, newly variable sites %d, no "
+          "longer variable sites %d." % (len(seqs), len(fresh),
+          len(np.setdiff1d(old_sites, sites))))
+
+    ids += new_ids
+
+    # The old digest is verified already, so only appended bytes are read
+    digest  = prefix_digest(fseq, size, int(state['size']), state['hash'])
+
+    save_state(fstate, size, digest.hexdigest(), ids, counts, sites, vmat,
+               gaps, fold_case)
+
+    return ids, sites, vmat
+
+#===========================================================
+
+def site_names(sites):
+    "Site names line, e.g. 'S1;S5;S9;', of 0-based site indices"
+
+    return ''.join(['S%d;' % (site + 1) for site in sites])
+
+#===========================================================
+
+def fluxus_name(seq_id, ncols):
+    """
+    Desc:
+        Sequence name in a fluxus network file.
+    Args:
+        seq_id  - Sequence ID
+        ncols   - No. of output sites
+    Ret:
+        The first 6 characters of sequence ID, if necessary.
+    """
+
+    # Trim seq ID to 6 characters if necessary
+    # This is REQUIRED for fluxus network software. As ever, it is tested
+    # by the length of sequence, not of the ID
+    return seq_id[0:6] if ncols > 6 else seq_id
+
+#===========================================================
+
+def data_fields(text):
+    "Indices of comma separated data field names, e.g. 'phenotype,lineage'"
+
+    fields  = []
+
+    for name in text.split(','):
+        name    = name.strip().lower()
+
+        if name not in DATA_FIELDS:
+            sys.exit("[ERROR] Unknown data field '%s'. Must be one of %s."
+                     % (name, ", ".join(DATA_FIELDS)))
+
+        fields.append(DATA_FIELDS[name])
+
+    return tuple(fields)
+
+#===========================================================
+
+def collapse(ids, mat, info, fields=()):
+    """
+    Desc:
+        Collapse identical haplotypes, by a hash of the characters of
+        each sequence, optionally within the same data fields.
+    Args:
+        ids     - A list of sequence IDs
+        mat     - A numpy uint8 matrix of output sites, or a PackedAln
+        info    - A dictionary of sequence ID -> data fields, by get_data()
+        fields  - Indices of data fields, e.g. 0 for phenotype, that
+                  members of a haplotype must share. Default none
+    Ret:
+        freqs   - A list of frequency of each sequence, 0 for a member of
+                  a haplotype represented by a previous sequence
+        members - A dictionary of index of a representative sequence ->
+                  a list of member IDs, in input order
+    """
+
+    first   = {}    # Haplotype key -> index of representative sequence
+    freqs   = [0] * len(ids)
+    members = {}
+
+    for i, (seq_id, row) in enumerate(zip(ids, mat)):
+        meta    = info[seq_id].split(';')
+        key     = (hashlib.blake2b(row.tobytes(), digest_size=16).digest(),) \
+            + tuple(meta[f] for f in fields)
+        rep     = first.setdefault(key, i)
+
+        freqs[rep]  += 1
+        members.setdefault(rep, []).append(seq_id)
+
+    return freqs, members
+
+#===========================================================
+
+def write_haplotypes(fh, ids, ncols, freqs, members):
+    """
+    Desc:
+        Write the mapping of collapsed haplotypes to member IDs.
+    Args:
+        fh      - Output file handle
+        ids     - A list of sequence IDs
+        ncols   - No. of output sites
+        freqs   - Frequencies, by collapse()
+        members - Members, by collapse()
+    """
+
+    fh.write("#Name\tID\tFrequency\tMembers\n")
+
+    for rep, seq_ids in members.items():
+        fh.write("%s\t%s\t%d\t%s\n" % (fluxus_name(ids[rep], ncols),
+                 ids[rep], freqs[rep], ",".join(seq_ids)))
+
+#===========================================================
+
+def group_subsets(ids, info, field):
+    """
+    Desc:
+        Subsets of sequences by the value of a data field.
+    Args:
+        ids     - A list of sequence IDs
+        info    - A dictionary of sequence ID -> data fields, by get_data()
+        field   - Index of data field, by data_fields()
+    Ret:
+        A dictionary of field value -> a list of indices of sequences, in
+        order of first appearance.
+    """
+
+    subsets = {}
+
+    for i, seq_id in enumerate(ids):
+        subsets.setdefault(info[seq_id].split(';')[field], []).append(i)
+
+    return subsets
+
+#===========================================================
+
+def read_subsets(fspec, ids, info):
+    """
+    Desc:
+        Subsets of sequences by a subset spec file. Each line is a subset
+        name and conditions, delimited by white spaces, e.g.:
+
+            China_H3    geography=China lineage=H3N2
+            East_Asia   geography=China,Japan,Korea
+            Selected    id=SQ1,SQ5,SQ9
+
+        A sequence is in a subset if it matches all conditions, i.e. a
+        data field, by data_fields(), or 'id' of one of the given values.
+    Args:
+        fspec   - Subset spec file
+        ids     - A list of sequence IDs
+        info    - A dictionary of sequence ID -> data fields, by get_data()
+    Ret:
+        A dictionary of subset name -> a list of indices of sequences, in
+        order of the spec file.
+    """
+
+    subsets = {}
+
+    with open(fspec, 'r') as fh:
+        for line in fh:
+            items   = line.split()
+
+            if not items or items[0].startswith('#'):
+                continue
+
+            conds   = []
+
+            for item in items[1:]:
+                name, sep, values   = item.partition('=')
+
+                if not sep:
+                    sys.exit("[ERROR] Invalid condition '%s' of subset "
+                             "'%s'. Must be '<field>=<values>'."
+                             % (item, items[0]))
+
+                field   = None if name.lower() == 'id' \
+                    else data_fields(name)[0]
+                conds.append((field, set(values.split(','))))
+
+            subsets[items[0]]   = [i for i, seq_id in enumerate(ids)
+                if all((seq_id if field is None
+                        else info[seq_id].split(';')[field]) in values
+                       for field, values in conds)]
+
+    return subsets
+
+#===========================================================
+
+def subset_sites(mat, subsets, gaps='keep', fold_case=False):
+    """
+    Desc:
+        Variable sites of each subset of sequences, by one pass over
+        blocks of columns.
+    Args:
+        mat         - A numpy uint8 matrix of N sequences x L columns, or a
+                      PackedAln
+        subsets     - A dictionary of name -> a list of indices of sequences
+        gaps        - 'keep', 'skip' or 'ignore' gaps. Default 'keep'
+        fold_case   - Compare letters case insensitively. Default False
+    Ret:
+        A dictionary of name -> a numpy array of 0-based indices of
+        variable columns.
+    """
+
+    nseq, ncols = mat.shape
+    width   = max(8, BLOCK_CELLS // max(nseq, 1))
+    masks   = {name : np.zeros(ncols, dtype=np.bool_) for name in subsets}
+    rows    = {}
+
+    # A subset of more than half of sequences is counted by its complement,
+    # subtracted from counts of all sequences
+    for name, subset in subsets.items():
+        subset  = np.asarray(subset, dtype=np.intp)
+
+        if len(subset) > nseq // 2:
+            rows[name]  = (np.setdiff1d(np.arange(nseq), subset), True)
+        else:
+            rows[name]  = (subset, False)
+
+    total   = None
+
+    for a in range(0, ncols, width):
+        b       = min(a + width, ncols)
+        block   = mat[:, a:b]
+
+        if any(comp for _, comp in rows.values()):
+            total   = block_counts(block)
+
+        for name, (subset, comp) in rows.items():
+            counts  = block_counts(block[subset])
+
+            if comp:
+                counts  = total - counts
+
+            masks[name][a:b]    = vsite_mask(counts, gaps, fold_case)
+
+    return {name : np.flatnonzero(mask) for name, mask in masks.items()}
+
+#===========================================================
+
+def sub_matrix(mat, rows, sites=None):
+    """
+    Desc:
+        Matrix of some sequences and sites.
+    Args:
+        mat     - A numpy uint8 matrix of N sequences x L columns, or a
+                  PackedAln
+        rows    - A list of indices of sequences
+        sites   - A numpy array of indices of sites. Default all
+    Ret:
+        A numpy uint8 matrix of len(rows) x len(sites).
+    """
+
+    rows    = np.asarray(rows, dtype=np.intp)
+
+    if isinstance(mat, PackedAln):  # Columns only, of all sequences
+        return mat[:, slice(None) if sites is None else sites][rows]
+
+    return mat[rows] if sites is None else mat[np.ix_(rows, sites)]
+
+#===========================================================
+
+def subset_file(fout, name):
+    "Output file of a subset, e.g. 'out.China.rdf' of 'out.rdf'"
+
+    base, ext   = os.path.splitext(fout)
+
+    return "%s.%s%s" % (base, re.sub(r'[^\w.-]', '_', name), ext)
+
+#===========================================================
+
+def write_network(fout, names, ids, mat, info, fields=None, fmap=None):
+    """
+    Desc:
+        Write a fluxus network file, and collapse identical haplotypes if
+        necessary.
+    Args:
+        fout    - Output '.rdf' or '.ami' file
+        names   - Site names line, by site_names()
+        ids     - A list of sequence IDs
+        mat     - A numpy uint8 matrix of output sites, or a PackedAln
+        info    - A dictionary of sequence ID -> data fields
+        fields  - Indices of data fields to collapse haplotypes within,
+                  by collapse(). Default None, not collapsed
+        fmap    - Output haplotype mapping file. Default '<fout>.map'
+    Ret:
+        No. of haplotypes written.
+    """
+
+    freqs   = None
+
+    if fields is not None:
+        freqs, members  = collapse(ids, mat, info, fields)
+
+        with open(fmap or fout + ".map", "w") as fh_map:
+            write_haplotypes(fh_map, ids, mat.shape[1], freqs, members)
+
+    try:
+        fh_out  = open(fout, "w")
+    except IOError:
+        sys.exit("[ERROR] Create output file '%s' failed!" % fout)
+
+    with fh_out:
+        write_fluxus(fh_out, names, ids, mat, info, freqs)
+
+    return len(ids) if freqs is None else len(members)
+
+#===========================================================
+
+def write_fluxus(fh, names, ids, mat, info, freqs=None):
+    """
+    Desc:
+        Write a fluxus network '.rdf' or '.ami' file.
+    Args:
+        fh      - Output file handle
+        names   - Site names line, by site_names()
+        ids     - A list of sequence IDs
+        mat     - A numpy uint8 matrix of output sites, or a PackedAln
+        info    - A dictionary of sequence ID -> data fields
+        freqs   - A list of frequency of each sequence, by collapse().
+                  Sequences of frequency 0 are not written. Default None,
+                  all sequences of frequency 1
+    """
+
+    fh.write("  ;1.0\n")
+    fh.write(names + "\n")
+    fh.write("10;" * names.count(";") + "\n")
+
+    for i, (seq_id, row) in enumerate(zip(ids, mat)):
+        freq    = 1 if freqs is None else freqs[i]
+
+        if not freq:
+            continue
+
+        fh.write(">" + fluxus_name(seq_id, mat.shape[1]) + ";" + str(freq)
+                 + ";" + info[seq_id] + ";" + "\n")
+        fh.write(row.tobytes().decode('latin-1') + "\n")
+
+#===========================================================
+
+def read_fluxus(fin):
+    """
+    Desc:
+        Read a fluxus network '.rdf' or '.ami' file, by write_fluxus().
+    Args:
+        fin     - Fluxus network file
+    Ret:
+        names   - A list of sequence names
+        freqs   - A list of frequency of each sequence
+        mat     - A numpy uint8 matrix of N sequences x sites
+    """
+
+    names   = []
+    freqs   = []
+    seqs    = []
+
+    # Sequences follow the 3 header lines, one line each
+    with open(fin, 'r') as fh:
+        lines   = [line.rstrip('\r\n') for line in fh][3:]
+
+    for header, seq in zip(lines[0::2], lines[1::2]):
+        items   = header.lstrip('>').split(';')
+
+        names.append(items[0])
+        freqs.append(int(items[1]) if len(items) > 1 and items[1] else 1)
+        seqs.append(seq.encode('latin-1'))
+
+    if not seqs:
+        sys.exit("[ERROR] No sequence in fluxus file '%s'." % fin)
+
+    if any(len(s) != len(seqs[0]) for s in seqs):
+        sys.exit("[ERROR] Sequences in fluxus file '%s' are not of the "
+                 "same length." % fin)
+
+    mat = np.frombuffer(b''.join(seqs), dtype=np.uint8) \
+        .reshape(len(seqs), len(seqs[0]))
+
+    return names, freqs, mat
+
+#===========================================================
+#
+#                   Classes
+#
+#===========================================================
+
+class PackedAln:
+    """
+    Desc:
+        A memory mapped packed alignment. Columns are read by
+        'mat[:, start:stop]' or 'mat[:, sites]', and rows by iteration,
+        as numpy uint8 matrices of characters.
+    Args:
+        fpak    - Packed alignment file
+    """
+
+    def __init__(self, fpak):
+        with open(fpak, 'rb') as fh:
+            head    = fh.read(struct.calcsize(PAK_HEADER))
+            magic, version, bits, _, nseq, ncols, id_size   = \
+                struct.unpack(PAK_HEADER, head)
+
+            if magic != PAK_MAGIC or version != PAK_VERSION:
+                sys.exit("[ERROR] Invalid packed alignment '%s'." % fpak)
+
+            self.ids    = fh.read(id_size).decode().split('\n')
+
+        self.path   = fpak
+        self.bits   = bits
+        self.shape  = (nseq, ncols)
+        offset      = len(head) + id_size + (-id_size % 8)
+        row_size    = ncols if bits == 8 else (ncols + 1) // 2
+
+        self._data  = np.memmap(fpak, dtype=np.uint8, mode='r',
+                                offset=offset, shape=(nseq, row_size))
+
+    def column_counts(self, start, stop):
+        """
+        Desc:
+            Count characters of columns [start, stop) of 4-bit packed
+            rows, by codes without decoding.
+        Ret:
+            A numpy uint32 matrix of (stop - start) columns x 256
+            characters, the same as column_counts().
+        """
+
+        counts  = np.zeros((stop - start, 256), dtype=np.uint32)
+        width   = max(8, BLOCK_CELLS // max(self.shape[0], 1)) // 2 * 2
+
+        # Blocks start at even columns, the high nibble of a byte
+        for a in range(start - start % 2, stop, width):
+            b       = min(a + width, stop + stop % 2)
+            packed  = self._data[:, a // 2:b // 2]
+            bins    = np.arange(0, 8 * (b - a), 16, dtype=np.intp)
+            codes   = np.zeros((b - a, 16), dtype=np.uint32)
+
+            for nibble, col in ((packed >> 4, 0), (packed & 15, 1)):
+                codes[col::2]   = np.bincount((nibble + bins).ravel(),
+                    minlength=8 * (b - a)).reshape(-1, 16)
+
+            lo, hi  = max(a, start), min(b, stop)
+            counts[lo - start:hi - start, DECODE]   = \
+                codes[lo - a:hi - a]
+
+        return counts
+
+    def _decode(self, packed, cols):
+        "Characters of 0-based columns 'cols' of packed rows"
+
+        if self.bits == 8:
+            return np.asarray(packed[:, cols])
+
+        raw = np.asarray(packed[:, cols // 2])
+
+        return DECODE[np.where(cols % 2 == 0, raw >> 4, raw & 15)]
+
+    def __getitem__(self, key):
+        rows, cols  = key
+
+        if rows != slice(None):
+            raise IndexError("Only all rows of columns can be selected.")
+
+        if isinstance(cols, slice):
+            cols    = np.arange(self.shape[1])[cols]
+
+        cols    = np.asarray(cols, dtype=np.intp)
+
+        if not len(cols) or np.any(np.diff(cols) != 1):
+            return self._decode(self._data, cols)
+
+        # A block of columns, read the bytes covering them only
+        if self.bits == 8:
+            return np.array(self._data[:, cols[0]:cols[-1] + 1])
+
+        first   = cols[0] // 2
+        packed  = self._data[:, first:cols[-1] // 2 + 1]
+
+        return self._decode(packed, cols - first * 2)
+
+    def __iter__(self):
+        cols    = np.arange(self.shape[1])
+
+        for row in self._data:
+            yield self._decode(row[np.newaxis], cols)[0]
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+
+"""
+Name
+
+    benchmark_vsites.py - Benchmark scanning of variation sites by processes
+
+SYNOPSIS
+
+    benchmark_vsites.py [-n <No. of seqs>] [-l <length>] [-j 1,2,4,8]
+                        [--packed] [--repeat N]
+
+DESCRIPTION
+
+    A random nucleotide alignment, with a few percent of mutations and
+    gaps, is scanned by 'alnmat.scan_columns()' for each number of
+    processes. Variation site masks and column counts are checked to be
+    identical to a single process, and time, speedup and throughput are
+    reported:
+
+============================================================
+Jobs    Seconds Speedup Mcells/s    <-  Best of '--repeat' runs
+1       <sec>   1.00    <rate>
+2       <sec>   <x>     <rate>      <-  Speedup over the first one
+...
+============================================================
+
+    With '--packed', the alignment is written into a temporary 4-bit
+    packed file, and memory mapped by each process. Otherwise it is
+    placed into shared memory.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from alnmat import PackedAln, pack_aln, scan_columns
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def random_aln(nseq, ncols, seed=0):
+    "A random nucleotide alignment matrix, of mutations of a reference"
+
+    rng     = np.random.default_rng(seed)
+    ref     = rng.choice(np.frombuffer(b'ACGT', dtype=np.uint8), ncols)
+    mat     = np.tile(ref, (nseq, 1))
+    mut     = rng.random((nseq, ncols)) < 0.01
+
+    mat[mut]    = rng.choice(np.frombuffer(b'ACGT-', dtype=np.uint8),
+                             mut.sum())
+
+    return mat
+
+#===========================================================
+#
+#                   Main
+#
+#===========================================================
+
+argParser   = argparse.ArgumentParser(
+    description="Benchmark scanning of variation sites by processes")
+argParser.add_argument("-n", "--nseq", action="store", type=int,
+    default=5000,
+    help="Number of sequences. Default 5000.")
+argParser.add_argument("-l", "--length", action="store", type=int,
+    default=30000,
+    help="Alignment length. Default 30000.")
+argParser.add_argument("-j", "--jobs", action="store", default="1,2,4",
+    help="Comma separated numbers of processes. Default '1,2,4'.")
+argParser.add_argument("--packed", action="store_true",
+    help="Scan a memory mapped packed alignment.")
+argParser.add_argument("--repeat", action="store", type=int, default=3,
+    help="Best of N runs. Default 3.")
+
+args    = argParser.parse_args()
+
+jobs    = [int(j) for j in args.jobs.split(',')]
+mat     = random_aln(args.nseq, args.length)
+tmpdir  = None
+
+print("Alignment:\t%d x %d" % mat.shape)
+print("CPUs:\t%d" % os.cpu_count())
+
+if args.packed:
+    tmpdir  = tempfile.TemporaryDirectory()
+    fseq    = os.path.join(tmpdir.name, 'aln.fasta')
+
+    with open(fseq, 'wb') as fh:
+        for i, row in enumerate(mat):
+            fh.write(b'>s%d\n' % i + row.tobytes() + b'\n')
+
+    pack_aln(fseq, fseq + '.apk')
+    mat = PackedAln(fseq + '.apk')
+
+ref_mask, ref_counts    = scan_columns(mat, 'skip', True, 1)
+cells   = args.nseq * args.length
+base    = None
+
+print("Jobs\tSeconds\tSpeedup\tMcells/s")
+
+for j in jobs:
+    best    = None
+
+    for _ in range(args.repeat):
+        start   = time.time()
+        mask, counts    = scan_columns(mat, 'skip', True, j)
+        elapsed = time.time() - start
+        best    = elapsed if best is None else min(best, elapsed)
+
+    if not (np.array_equal(mask, ref_mask)
+            and np.array_equal(counts, ref_counts)):
+        sys.exit("[ERROR] Results of %d processes differ from 1 process!"
+                 % j)
+
+    base    = base or best
+
+    print("%d\t%.3f\t%.2f\t%.1f" % (j, best, base / best, cells / best / 1e6))
+
+print("Variation sites:\t%d" % ref_mask.sum())
+
+if tmpdir:
+    del mat
+    tmpdir.cleanup()
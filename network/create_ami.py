@@ -6,7 +6,10 @@ Name
 
 SYNOPSIS
 
-    create_ami.py [--snp] <Fasta file> <data>
+    create_ami.py [--snp] [--jobs N] <Fasta file> <data> <ami file>
+        [--collapse | --collapse-by <fields>] [--map <map file>]
+        [--group-by <field> | --subsets <subset spec file>]
+
 DESCRIPTION
 
     Fluxus network .ami file format:
@@ -27,6 +30,27 @@ AGCBA                                  (6-8) Group1-3
 AKFFC
 ============================================================
 
+    With '--jobs N', columns of the alignment are scanned by N processes
+    sharing the alignment matrix, see 'alnmat.py'.
+
+    With '--collapse', identical haplotypes of output sites are collapsed
+    into one record, with the real frequency. With '--collapse-by', only
+    sequences of the same data fields, e.g. 'phenotype,geography', are
+    collapsed. Member IDs of each haplotype are written into the map file.
+
+    With '--group-by <field>', e.g. 'geography', or '--subsets <file>',
+    one output is written for each subset of sequences, e.g. 'out.China.ami'
+    of 'out.ami'. The alignment is read once, and variation sites of all
+    subsets are found by one pass over it. Each line of a subset spec file
+    is a name and conditions on data fields or IDs, e.g.:
+
+        China_H3    geography=China lineage=H3N2
+        Selected    id=SQ1,SQ5,SQ9
+
+    Map files of collapsed haplotypes are '<subset output>.map', or
+    'map.<subset>.txt' of '--map map.txt'. Subsets are not scanned by
+    processes, so '--jobs' can not be used with them.
+
 AUTHORS
 
     zeroliu-at-gmail-dot-com
@@ -34,73 +58,51 @@ AUTHORS
 VERSION
 
     0.0.1   2016-08-31
+    0.0.2   2026-10-18  Vectorized variation sites by 'alnmat.py'.
+    0.0.3   2026-10-18  Add options to collapse identical haplotypes.
+    0.0.4   2026-10-18  Add option '--jobs'.
+    0.0.5   2026-10-18  Add options '--group-by' and '--subsets'.
 
 """
 
-from Bio import AlignIO
 import argparse
 import sys
 import regex as re
 
+from alnmat import (PackedAln, data_fields, group_subsets, read_aln,
+                    read_subsets, site_names, sub_matrix, subset_file,
+                    subset_sites, var_sites, write_network)
+
 #===========================================================
 #
 #                   Functions
 #
 #===========================================================
 
-def get_snp(aln, rmgap=False):
+def get_snp(mat, rmgap=False, jobs=1):
     """
     Desc:
         Get variation sites from given alignment.
     Args:
-        aln     - A MultipleSeqAlignment object
+        mat     - A numpy uint8 alignment matrix, by alnmat.read_aln()
         rmgap   - Remove gaps in alignment.
                   Default False
+        jobs    - No. of processes. Default 1
     Ret:
-        sv      - A MultipleSeqAlignment object
+        snp_sites   - Location of variation sites, delimited by ";"
+        sites       - A numpy array of 0-based indices of variation sites
     """
 
-    num_seqs    = len(aln)          # No. of sequences in MSA
-    aln_len     = len(aln[0])  # Length of MSA
-
-    # DEBUG
-    #print("Alignment:\nSeq No.:\t{}Aln length:\t{}". format(num_seqs, aln_len))
-
-    snp_sites   = ""
-    snp_aln     = None
-
-    for site in range(0, aln_len):
-        ss_aln_str  = aln[:, site]  # Single site alignment string
-        # Check whether this string consists of ONLY ONE character
-        #F_IsSingleChar  = False     # A flag, whether slice string is composed
-                                    # of a single character
-        if rmgap:   # Dismoss/remove gaps
-            ss_aln_str  = ss_aln_str.replace("-", "")
-
-        if (ss_aln_str == len(ss_aln_str) * ss_aln_str[0]):
-            """The single slice string consists of ONLY ONE character"""
-            continue;
-        else:
-            if snp_sites == "":
-                snp_sites   = "S" + str(site + 1) + ";"
-            else:
-                snp_sites   += "S" + str(site + 1) + ";"
-
-            ss_aln  = aln[:, site:site+1] # Single site alignment MSA object
-
-            if snp_aln is None:
-                snp_aln = ss_aln
-            else:
-                snp_aln += ss_aln
+    # A gap is a character state, unless removed. Case sensitive
+    sites   = var_sites(mat, 'ignore' if rmgap else 'keep', jobs=jobs)
 
-    # print(snp_aln)
-    return snp_sites, snp_aln
+    return site_names(sites), sites
 
 def get_data(file):
     "Read and parse data file for fluxus network"
 
     try:
-        fh_data = open(file, "rU")
+        fh_data = open(file, "r")
     except IOError:
         sys.exit("[ERROR] Open data file 'file' failed!")
 
@@ -140,53 +142,86 @@ argParser.add_argument("--snp", action="store_true",
     help="Output variation sites only")
 argParser.add_argument("--rmgap", action="store_true",
     help="Dismiss gap for alignment")
+argParser.add_argument("-j", "--jobs", action="store", type=int, default=1,
+    help="Number of processes to scan variation sites. Default 1.")
+argParser.add_argument("--collapse", action="store_true",
+    help="Collapse identical haplotypes, with real frequencies.")
+argParser.add_argument("--collapse-by", action="store", dest="collapse_by",
+    help="Collapse only within the same data fields, comma separated "
+         "'phenotype', 'geography' and 'lineage'. Implies '--collapse'.")
+argParser.add_argument("--map", action="store", dest="fmap",
+    help="Output haplotype to member IDs mapping file. "
+         "Default '<output>.map'. With subsets, 'map.<subset>.txt' of "
+         "'map.txt', default '<subset output>.map'.")
+argParser.add_argument("--group-by", action="store", dest="group_by",
+    help="Write one output for each value of a data field, e.g. "
+         "'geography', as 'out.<value>.ami' of output 'out.ami'.")
+argParser.add_argument("--subsets", action="store", dest="fsubsets",
+    help="Write one output for each subset of a subset spec file, as "
+         "'out.<subset>.ami' of output 'out.ami'.")
 
 args    = argParser.parse_args()
 
+# Subsets are scanned by one pass, not by processes
+if args.jobs > 1 and (args.group_by or args.fsubsets):
+    sys.exit("[ERROR] Option '--jobs' can not be used with subsets.")
+
 # Parse alignment
-aln = AlignIO.read(args.fseq, "fasta")
+ids, mat    = read_aln(args.fseq)
 
 # Parse data file for fluxux network software
 info    = get_data(args.fdata)   # info is a dictionary
 
-# Get variation sites is necessary
-if args.snp:
-    result_sites, result_aln  = get_snp(aln, args.rmgap)
+# Collapse identical haplotypes if necessary
+fields  = None
+
+if args.collapse or args.collapse_by:
+    fields  = data_fields(args.collapse_by) if args.collapse_by else ()
+
+if args.group_by or args.fsubsets:  # One output for each subset
+    if args.group_by:
+        subsets = group_subsets(ids, info, data_fields(args.group_by)[0])
+    else:
+        subsets = read_subsets(args.fsubsets, ids, info)
+
+    # Variation sites of all subsets by one pass over the alignment
+    if args.snp:
+        subset_snps = subset_sites(mat, subsets,
+                                   'ignore' if args.rmgap else 'keep')
+
+    # A packed alignment is unpacked once, not for each subset
+    if not args.snp and isinstance(mat, PackedAln):
+        mat = sub_matrix(mat, range(len(ids)))
+
+    for name, rows in subsets.items():
+        if not rows:
+            print("[WARNING] No sequence in subset '%s'." % name)
+            continue
+
+        sites   = subset_snps[name] if args.snp else None
+        fout    = subset_file(args.fami, name)
+        fmap    = subset_file(args.fmap, name) if args.fmap else None
+        result_mat  = sub_matrix(mat, rows, sites)
+        nhap    = write_network(fout, site_names(range(result_mat.shape[1])
+                                if sites is None else sites),
+                                [ids[i] for i in rows], result_mat, info,
+                                fields, fmap)
+
+        print("%s:\t%i sequences, %i sites, %i haplotypes" % (fout,
+              len(rows), result_mat.shape[1], nhap))
 else:
-    result_aln  = aln
-
-    len_aln = length(aln[0])
-
-    result_sites    = ""
-    for i in range(0, len_aln):
-        if result_sites == "":
-            result_sites    = "S" + str(i+1) + ";"
-        else:
-            result_sites    +=  "S" + str(i+1) + ";"
-
-# Output file
-try:
-    fh_ami  = open(args.fami, "w")
-except IOError:
-    sys.exit("[ERROR] Create output .ami file failed!")
-
-# Output .ami file header
-fh_ami.write("  ;1.0\n")
-fh_ami.write( result_sites + "\n")
-fh_ami.write("10;" * result_sites.count(";") + "\n")
-
-# Trim seq ID to 6 characters if necessary
-# This is REQUIRED for fluxus network software
-
-for seq_rec in result_aln:
-    if len(seq_rec) > 6:    # Simply get the first 6 characters
-        seq_rec.id  = seq_rec.id[0:6] + ";" + "1" + ";" + info[ seq_rec.id ]
-    else:                   # Keep original seq ID
-        seq_rec.id  = seq_rec.id + ";" + "1" + ";" + info[ seq_rec.id ]
-
-    fh_ami.write(">" + seq_rec.id + ";" + "\n")
-    fh_ami.write(str(seq_rec.seq) + "\n")
-
-fh_ami.close()
+    # Get variation sites is necessary
+    if args.snp:
+        result_sites, sites = get_snp(mat, args.rmgap, args.jobs)
+        result_mat  = mat[:, sites]
+    else:
+        result_mat  = mat
+        result_sites    = site_names(range(mat.shape[1]))
+
+    nhap    = write_network(args.fami, result_sites, ids, result_mat, info,
+                            fields, args.fmap)
+
+    if fields is not None:
+        print("Haplotypes:\t%i" % nhap)
 
 print("OK!")
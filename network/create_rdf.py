@@ -7,7 +7,8 @@ Name
 
 SYNOPSIS
 
-    create_rdf.py [--snp] <Fasta file> <data>
+    create_rdf.py [--snp] [--jobs N] <Fasta file> <data> <rdf file>
+        [--state] [--collapse | --collapse-by <fields>] [--map <map file>]
 
 DESCRIPTION
 
@@ -31,6 +32,33 @@ ATTTA                       (6-8) Group 1-3
 GGAAT
 ============================================================
 
+    With '--jobs N', columns of the alignment are scanned by N processes
+    sharing the alignment matrix, see 'alnmat.py'.
+
+    With '--state', column counts and variation sites are kept in a state
+    file '<Fasta file>.vst'. If sequences have only been appended to the
+    alignment since the last run, only new sequences are read and counted,
+    and the '.rdf' file is regenerated from the state. Otherwise, the whole
+    alignment is scanned and the state is rebuilt.
+
+    With '--collapse', identical haplotypes of output sites are collapsed
+    into one record, with the real frequency. With '--collapse-by', only
+    sequences of the same data fields, e.g. 'phenotype,geography', are
+    collapsed. Member IDs of each haplotype are written into the map file.
+
+    With '--group-by <field>', e.g. 'geography', or '--subsets <file>',
+    one output is written for each subset of sequences, e.g. 'out.China.rdf'
+    of 'out.rdf'. The alignment is read once, and variation sites of all
+    subsets are found by one pass over it. Each line of a subset spec file
+    is a name and conditions on data fields or IDs, e.g.:
+
+        China_H3    geography=China lineage=H3N2
+        Selected    id=SQ1,SQ5,SQ9
+
+    Map files of collapsed haplotypes are '<subset output>.map', or
+    'map.<subset>.txt' of '--map map.txt'. Subsets are not scanned by
+    processes, so '--jobs' can not be used with them.
+
 AUTHORS
 
     zeroliu-at-gmail-dot-com
@@ -39,82 +67,52 @@ VERSION
 
     0.0.1   2016-09-05
     0.0.2   2016-09-06  Fix bugs.
+    0.0.3   2026-10-18  Vectorized variation sites by 'alnmat.py'.
+    0.0.4   2026-10-18  Add options to collapse identical haplotypes.
+    0.0.5   2026-10-18  Add option '--jobs'.
+    0.0.6   2026-10-18  Add option '--state', for appended alignments.
+    0.0.7   2026-10-18  Add options '--group-by' and '--subsets'.
 
 """
 
-from Bio import AlignIO
 import argparse
 import sys
 import regex as re
 
+from alnmat import (PackedAln, data_fields, group_subsets, read_aln,
+                    read_subsets, site_names, sub_matrix, subset_file,
+                    subset_sites, update_sites, var_sites, write_network)
+
 #===========================================================
 #
 #                   Functions
 #
 #===========================================================
 
-def get_vsites(aln, rmgaps):
+def get_vsites(mat, rmgaps, jobs=1):
     """
     Desc:
         Get variation sites from given alignment.
     Args:
-        aln     - A MultipleSeqAlignment object
+        mat     - A numpy uint8 alignment matrix, by alnmat.read_aln()
         rmgap   - Remove gaps in alignment.
                   Default True
+        jobs    - No. of processes. Default 1
     Ret:
-        vsites      - Location of variation sites
-        vsites_aln  - A MultipleSeqAlignment object for variation sites
+        vsites  - Location of variation sites, delimited by ";"
+        sites   - A numpy array of 0-based indices of variation sites
     """
 
-    # num_seqs    = len(aln)      # No. of sequences in MSA
-    aln_len     = len(aln[0])   # Length of MSA
+    aln_len     = mat.shape[1]  # Length of MSA
 
     print("Alignment length: %s\n" % aln_len)
 
-    # DEBUG
-    #print("Alignment:\nSeq No.:\t{}Aln length:\t{}". format(num_seqs, aln_len))
-
-    vsites      = ""    # Locations of variation sites, delimited by ";"
-    vsites_aln  = None  # MultipleSeqAlignment object for variation sites
-
-    for site in range(0, aln_len):
-        ss_aln_str  = aln[:, site]  # Single site alignment string
-
-        # Convert to uppercase
-        ss_aln_str  = ss_aln_str.upper()
-
-        if rmgaps:
-            if '-' in ss_aln_str:   # Dismoss/remove sites with gaps
-                continue
-        else:
-            ss_aln_str  = ss_aln_str.replace("-", "") # Remove '-' in string
-
-        if (ss_aln_str == len(ss_aln_str) * ss_aln_str[0]):
-            """The single slice string consists of ONLY ONE character"""
-            continue;
-        else:
-            #print("Site:\t{}" . format(site))
-            #print("Leading char:\t{}" . format(ss_aln_str[0]))
-            #print("Whole column:\t{}" . format(ss_aln_str))
-
-            #input("Press Enter to continue ...")
-
-            if vsites == "":
-                vsites   = "S" + str(site + 1) + ";"
-            else:
-                vsites   += "S" + str(site + 1) + ";"
-
-            # print("Variation site:\t%s" % vsites)
-            # Get single site alignment MSA object
-            ss_aln  = aln[:, site:site+1]
-
-            if vsites_aln is None:
-                vsites_aln = ss_aln
-            else:
-                vsites_aln += ss_aln
+    # Sites with gaps are dismissed, or gaps are removed from each site.
+    # Case insensitive
+    sites   = var_sites(mat, 'skip' if rmgaps else 'ignore', fold_case=True,
+                      jobs=jobs)
 
-    # print(snp_aln)
-    return vsites, vsites_aln
+    return site_names(sites), sites
 
 #===========================================================
 
@@ -122,7 +120,7 @@ def get_data(file):
     "Read and parse data file for fluxus network"
 
     try:
-        fh_data = open(file, "rU")
+        fh_data = open(file, "r")
     except IOError:
         sys.exit("[ERROR] Open data file 'file' failed!")
 
@@ -162,57 +160,108 @@ argParser.add_argument("--vsites", action="store_true",
     help="Output variation sites only. Default TRUE.")
 argParser.add_argument("--rmgaps", action="store_false",
     help="Dismiss sites with gaps. Default FALSE.")
+argParser.add_argument("-j", "--jobs", action="store", type=int, default=1,
+    help="Number of processes to scan variation sites. Default 1.")
+argParser.add_argument("--state", action="store_true",
+    help="Keep variation sites in '<Fasta file>.vst', and update them by "
+         "appended sequences only. Needs '--vsites'.")
+argParser.add_argument("--collapse", action="store_true",
+    help="Collapse identical haplotypes, with real frequencies.")
+argParser.add_argument("--collapse-by", action="store", dest="collapse_by",
+    help="Collapse only within the same data fields, comma separated "
+         "'phenotype', 'geography' and 'lineage'. Implies '--collapse'.")
+argParser.add_argument("--map", action="store", dest="fmap",
+    help="Output haplotype to member IDs mapping file. "
+         "Default '<output>.map'. With subsets, 'map.<subset>.txt' of "
+         "'map.txt', default '<subset output>.map'.")
+argParser.add_argument("--group-by", action="store", dest="group_by",
+    help="Write one output for each value of a data field, e.g. "
+         "'geography', as 'out.<value>.rdf' of output 'out.rdf'.")
+argParser.add_argument("--subsets", action="store", dest="fsubsets",
+    help="Write one output for each subset of a subset spec file, as "
+         "'out.<subset>.rdf' of output 'out.rdf'.")
 
 args    = argParser.parse_args()
 
 print("[DEBUG] %s\n" % (args))
 
-# Parse alignment
-print("[DEBUG] Reading alignment file {}" . format(args.fseq))
-aln = AlignIO.read(args.fseq, "fasta")
-
-# Parse data file for fluxux network software
-info    = get_data(args.fdata)   # info is a dictionary
-
-# Get variation sites if necessary
-if args.vsites: # Output variation sites
-    result_sites, result_aln  = get_vsites(aln, args.rmgaps)
-else:           # Output total alignment
-    result_aln  = aln
-
-    len_aln     = len(aln[0])
-    result_sites    = ""
-    for i in range(0, len_aln):
-        if result_sites == "":
-            result_sites    = "S" + str(i+1) + ";"
-        else:
-            result_sites    +=  "S" + str(i+1) + ";"
-
-print("Total variation sites:\t%i" % ( len( result_aln[0] ) ))
-
-# Output file
-try:
-    fh_rdf  = open(args.frdf, "w")
-except IOError:
-    sys.exit("[ERROR] Create output .ami file failed!")
+if args.state and not args.vsites:
+    print("[WARNING] Option '--state' is ignored without '--vsites'.")
 
-# Output .ami file header
-fh_rdf.write("  ;1.0\n")
-fh_rdf.write( result_sites + "\n")
-fh_rdf.write("10;" * result_sites.count(";") + "\n")
+if args.state and (args.group_by or args.fsubsets):
+    sys.exit("[ERROR] Option '--state' can not be used with subsets.")
 
-# Trim seq ID to 6 characters if necessary
-# This is REQUIRED for fluxus network software
+# Subsets are scanned by one pass, not by processes
+if args.jobs > 1 and (args.group_by or args.fsubsets):
+    sys.exit("[ERROR] Option '--jobs' can not be used with subsets.")
 
-for seq_rec in result_aln:
-    if len(seq_rec) > 6:    # Simply get the first 6 characters
-        seq_rec.id  = seq_rec.id[0:6] + ";" + "1" + ";" + info[ seq_rec.id ]
-    else:                   # Keep original seq ID
-        seq_rec.id  = seq_rec.id + ";" + "1" + ";" + info[ seq_rec.id ]
-
-    fh_rdf.write(">" + seq_rec.id + ";" + "\n")
-    fh_rdf.write(str(seq_rec.seq) + "\n")
+# Parse data file for fluxux network software
+info    = get_data(args.fdata)   # info is a dictionary
 
-fh_rdf.close()
+# Collapse identical haplotypes if necessary
+fields  = None
+
+if args.collapse or args.collapse_by:
+    fields  = data_fields(args.collapse_by) if args.collapse_by else ()
+
+if args.group_by or args.fsubsets:  # One output for each subset
+    print("[DEBUG] Reading alignment file {}" . format(args.fseq))
+    ids, mat    = read_aln(args.fseq)
+
+    if args.group_by:
+        subsets = group_subsets(ids, info, data_fields(args.group_by)[0])
+    else:
+        subsets = read_subsets(args.fsubsets, ids, info)
+
+    # Variation sites of all subsets by one pass over the alignment
+    if args.vsites:
+        subset_vsites   = subset_sites(mat, subsets,
+            'skip' if args.rmgaps else 'ignore', fold_case=True)
+
+    # A packed alignment is unpacked once, not for each subset
+    if not args.vsites and isinstance(mat, PackedAln):
+        mat = sub_matrix(mat, range(len(ids)))
+
+    for name, rows in subsets.items():
+        if not rows:
+            print("[WARNING] No sequence in subset '%s'." % name)
+            continue
+
+        sites   = subset_vsites[name] if args.vsites else None
+        fout    = subset_file(args.frdf, name)
+        fmap    = subset_file(args.fmap, name) if args.fmap else None
+        result_mat  = sub_matrix(mat, rows, sites)
+        nhap    = write_network(fout, site_names(range(result_mat.shape[1])
+                                if sites is None else sites),
+                                [ids[i] for i in rows], result_mat, info,
+                                fields, fmap)
+
+        print("%s:\t%i sequences, %i variation sites, %i haplotypes"
+              % (fout, len(rows), result_mat.shape[1], nhap))
+else:
+    # Get variation sites if necessary
+    if args.vsites and args.state:  # Update variation sites by the state
+        print("[DEBUG] Updating alignment file {}" . format(args.fseq))
+        ids, sites, result_mat  = update_sites(args.fseq,
+            'skip' if args.rmgaps else 'ignore', True, args.jobs)
+        result_sites    = site_names(sites)
+    elif args.vsites:   # Output variation sites
+        print("[DEBUG] Reading alignment file {}" . format(args.fseq))
+        ids, mat    = read_aln(args.fseq)
+        result_sites, sites = get_vsites(mat, args.rmgaps, args.jobs)
+        result_mat  = mat[:, sites]
+    else:               # Output total alignment
+        print("[DEBUG] Reading alignment file {}" . format(args.fseq))
+        ids, mat    = read_aln(args.fseq)
+        result_mat  = mat
+        result_sites    = site_names(range(mat.shape[1]))
+
+    print("Total variation sites:\t%i" % (result_mat.shape[1]))
+
+    nhap    = write_network(args.frdf, result_sites, ids, result_mat, info,
+                            fields, args.fmap)
+
+    if fields is not None:
+        print("Haplotypes:\t%i" % nhap)
 
 print("OK!")
@@ -0,0 +1,319 @@
+#!/usr/bin/python3
+
+"""
+Name
+
+    hamming.py  - Pairwise Hamming distances of haplotypes by bitsets
+
+SYNOPSIS
+
+    from hamming import bit_planes, dist_matrix, dist_edges
+
+    planes      = bit_planes(vmat, missing=b'-N')
+    dmat        = dist_matrix(planes, jobs=4)
+
+    for i, j, d in dist_edges(planes, max_dist=3, jobs=4):
+        ...
+
+DESCRIPTION
+
+    A matrix of N sequences x k sites, e.g. variation sites by 'alnmat.py',
+    is converted into bit planes, one for each character state. Plane s of
+    sequence i is a bitset of k bits, a bit set where sequence i has state
+    s, packed into 64-bit words:
+
+============================================================
+Plane 0         <-  Compared sites, i.e. not a missing character
+Plane 1..S      <-  One for each character state of the matrix
+============================================================
+
+    The distance of sequences i and j is the number of compared sites of
+    both, minus the number of sites of the same state:
+
+        d(i, j) = popcount(P0[i] & P0[j]) - sum(popcount(Ps[i] & Ps[j]))
+
+    Missing characters, e.g. '-' or 'N', are not compared, i.e. pairwise
+    deletion. Without missing characters, d(i, j) is the number of sites
+    where i and j differ.
+
+    Distances are computed by tiles of sequences, the upper triangle only,
+    so that temporary arrays are bounded. With 'jobs' > 1, tiles are
+    computed by a pool of processes, and bit planes are placed once into
+    shared memory.
+
+    popcount is 'numpy.bitwise_count()' of numpy >= 2.0, or a lookup table
+    of bytes otherwise.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+
+"""
+
+import multiprocessing
+
+from collections import Counter
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from alnmat import UPPER
+
+# No. of 64-bit words of a tile of bitsets, tile x tile x words. Bounds
+# temporary arrays
+TILE_WORDS  = 1 << 20
+
+# Name width of strict PHYLIP format
+PHYLIP_NAME = 10
+
+# Bits set of each byte, if numpy.bitwise_count() is not available
+POPCOUNT    = np.array([bin(i).count('1') for i in range(256)],
+                       dtype=np.uint8)
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def popcount(words):
+    "Total bits set of 64-bit words along the last axis"
+
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.uint32)
+
+    return POPCOUNT[words.view(np.uint8)].sum(axis=-1, dtype=np.uint32)
+
+#===========================================================
+
+def bit_planes(mat, missing=b'', fold_case=False):
+    """
+    Desc:
+        Convert a matrix of characters into bit planes.
+    Args:
+        mat         - A numpy uint8 matrix of N sequences x k sites
+        missing     - Bytes of missing characters, not compared. Default
+                      none
+        fold_case   - Compare letters case insensitively. Default False
+    Ret:
+        A numpy uint64 array of (1 + S) planes x N sequences x words.
+    """
+
+    mat     = UPPER[mat] if fold_case else np.asarray(mat)
+    missing = UPPER[np.frombuffer(missing, dtype=np.uint8)] if fold_case \
+        else np.frombuffer(missing, dtype=np.uint8)
+    states  = np.setdiff1d(np.unique(mat), missing)
+    nseq, nsites    = mat.shape
+    words   = max(-(-nsites // 64), 1)
+    planes  = np.zeros((1 + len(states), nseq, words * 8), dtype=np.uint8)
+    nbytes  = -(-nsites // 8)
+
+    planes[0, :, :nbytes]   = np.packbits(~np.isin(mat, missing), axis=1)
+
+    for s, state in enumerate(states, 1):
+        planes[s, :, :nbytes]   = np.packbits(mat == state, axis=1)
+
+    return planes.view(np.uint64)
+
+#===========================================================
+
+def tile_dist(planes, i0, i1, j0, j1):
+    """
+    Desc:
+        Distances of a tile of sequences.
+    Args:
+        planes  - Bit planes, by bit_planes()
+        i0, i1  - 0-based first and end sequences of rows
+        j0, j1  - 0-based first and end sequences of columns
+    Ret:
+        A numpy uint32 matrix of (i1 - i0) x (j1 - j0) distances.
+    """
+
+    dist    = popcount(planes[0, i0:i1, None] & planes[0, None, j0:j1])
+
+    for plane in planes[1:]:
+        dist    -= popcount(plane[i0:i1, None] & plane[None, j0:j1])
+
+    return dist
+
+#===========================================================
+
+def tile_size(planes):
+    "No. of sequences of a tile"
+
+    return max(16, int((TILE_WORDS / planes.shape[2]) ** 0.5))
+
+#===========================================================
+
+def _init_worker(name, shape):
+    "Attach a worker process to shared bit planes"
+
+    global _worker
+
+    shm     = shared_memory.SharedMemory(name=name)
+    _worker = {
+        'shm'       : shm,
+        'planes'    : np.ndarray(shape, dtype=np.uint64, buffer=shm.buf),
+    }
+
+def _init_local(planes):
+    "Tiles computed in this process"
+
+    global _worker
+
+    _worker = {'planes' : planes}
+
+def _tile_task(task):
+    "Distances of a tile, or its edges within max_dist, in a worker"
+
+    i0, i1, j0, j1, max_dist    = task
+
+    dist    = tile_dist(_worker['planes'], i0, i1, j0, j1)
+
+    if max_dist is None:
+        return i0, j0, dist
+
+    # Upper triangle only
+    keep    = dist <= max_dist
+    keep    &= np.arange(i0, i1)[:, None] < np.arange(j0, j1)[None, :]
+    ii, jj  = np.nonzero(keep)
+
+    return i0, j0, (ii + i0, jj + j0, dist[ii, jj])
+
+#===========================================================
+
+def dist_tiles(planes, max_dist=None, jobs=1, tile=None):
+    """
+    Desc:
+        Compute tiles of the upper triangle of distances.
+    Args:
+        planes      - Bit planes, by bit_planes()
+        max_dist    - Return edges within this distance instead of tiles.
+                      Default None
+        jobs        - No. of processes. Default 1
+        tile        - No. of sequences of a tile. Default by TILE_WORDS
+    Ret:
+        A generator of (i0, j0, tile distances), or (i0, j0, (i, j, d))
+        with max_dist, in order of rows then columns of tiles.
+    """
+
+    nseq    = planes.shape[1]
+    tile    = tile or tile_size(planes)
+    tasks   = [(i0, min(i0 + tile, nseq), j0, min(j0 + tile, nseq), max_dist)
+               for i0 in range(0, nseq, tile)
+               for j0 in range(i0, nseq, tile)]
+
+    if jobs <= 1 or len(tasks) < 2:
+        _init_local(planes)
+        yield from map(_tile_task, tasks)
+        return
+
+    # Bit planes are placed into shared memory once, workers never receive
+    # a copy
+    shm = shared_memory.SharedMemory(create=True, size=planes.nbytes)
+
+    try:
+        np.ndarray(planes.shape, dtype=np.uint64, buffer=shm.buf)[:] = planes
+
+        with multiprocessing.Pool(jobs, _init_worker,
+                                  (shm.name, planes.shape)) as pool:
+            yield from pool.imap(_tile_task, tasks)
+    finally:
+        shm.close()
+        shm.unlink()
+
+#===========================================================
+
+def dist_matrix(planes, jobs=1, tile=None):
+    """
+    Desc:
+        Full matrix of pairwise distances.
+    Args:
+        planes  - Bit planes, by bit_planes()
+        jobs    - No. of processes. Default 1
+        tile    - No. of sequences of a tile. Default by TILE_WORDS
+    Ret:
+        A symmetric numpy uint32 matrix of N x N distances.
+    """
+
+    nseq    = planes.shape[1]
+    dmat    = np.zeros((nseq, nseq), dtype=np.uint32)
+
+    for i0, j0, dist in dist_tiles(planes, None, jobs, tile):
+        i1, j1  = i0 + dist.shape[0], j0 + dist.shape[1]
+
+        dmat[i0:i1, j0:j1]  = dist
+        dmat[j0:j1, i0:i1]  = dist.T
+
+    return dmat
+
+#===========================================================
+
+def dist_edges(planes, max_dist, jobs=1, tile=None):
+    """
+    Desc:
+        Pairs of sequences within a distance, without a full matrix.
+    Args:
+        planes      - Bit planes, by bit_planes()
+        max_dist    - Maximum distance of an edge
+        jobs        - No. of processes. Default 1
+        tile        - No. of sequences of a tile. Default by TILE_WORDS
+    Ret:
+        A generator of (i, j, distance), i < j, by tiles.
+    """
+
+    for _, _, (ii, jj, dd) in dist_tiles(planes, max_dist, jobs, tile):
+        yield from zip(ii.tolist(), jj.tolist(), dd.tolist())
+
+#===========================================================
+
+def write_phylip(fh, names, dmat):
+    """
+    Desc:
+        Write a square strict PHYLIP distance matrix. Names are truncated
+        or padded to 10 characters, and truncated names of more than one
+        sequence are warned about.
+    Args:
+        fh      - Output file handle
+        names   - A list of sequence names
+        dmat    - A matrix of N x N distances, by dist_matrix()
+    """
+
+    short   = [name[:PHYLIP_NAME] for name in names]
+    dups    = sorted(n for n, c in Counter(short).items() if c > 1)
+
+    if dups:
+        print("[WARNING] Names of 10 characters are not unique: %s"
+              % ", ".join(dups))
+
+    fh.write("%d\n" % len(names))
+
+    for name, row in zip(short, dmat):
+        fh.write("%-10s %s\n" % (name, " ".join(map(str, row.tolist()))))
+
+#===========================================================
+
+def write_edges(fh, names, edges):
+    """
+    Desc:
+        Write a tab-delimited edge list.
+    Args:
+        fh      - Output file handle
+        names   - A list of sequence names
+        edges   - An iterable of (i, j, distance), by dist_edges()
+    Ret:
+        No. of edges.
+    """
+
+    fh.write("#Source\tTarget\tDistance\n")
+
+    n   = 0
+
+    for n, (i, j, d) in enumerate(edges, 1):
+        fh.write("%s\t%s\t%d\n" % (names[i], names[j], d))
+
+    return n
@@ -0,0 +1,212 @@
+#!/usr/bin/python3
+
+'''
+NAME
+
+    faidx.py    - Extract sequences or subsequences by a faidx index
+
+SYNOPSIS
+
+    faidx.py [-r <region file>] [-w <width>] <FASTA file> [<region> ...]
+
+DESCRIPTION
+
+    Regions are given as 'name', 'name:start' or 'name:start-end', with
+    1-based and inclusive coordinates, the same as 'samtools faidx'.
+
+    The samtools compatible '<FASTA file>.fai' index is created by
+    'seqlen.py --fai'. It is built here on the fly if missing or older than
+    the FASTA file. Only index lines of requested names are kept, and each
+    region is read by a single seek, so no pass over the sequence data is
+    needed. Reading the index stops as soon as all requested names are
+    found.
+
+    A region of a name with ':', e.g. 'HLA-A*01:01', is looked up as a
+    whole name only if the name before ':' is not found.
+
+    The FASTA file must be uncompressed, since regions are read by seeks.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+
+'''
+
+import argparse
+import os
+import re
+import sys
+
+from collections import namedtuple
+
+from seqlen import fasta_lengths, write_fai
+from xopen import compression
+
+FaiEntry    = namedtuple('FaiEntry',
+                ['length', 'offset', 'line_bases', 'line_bytes'])
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def parse_region(region):
+    """
+    Desc:
+        Parse a region string 'name:start-end'.
+    Args:
+        region  - A region string
+    Ret:
+        name    - Sequence name
+        start   - 0-based start, or None for the whole sequence
+        end     - 0-based exclusive end, or None for the sequence end
+    """
+
+    m   = re.match(r'^(.+):([\d,]+)(?:-([\d,]+))?$', region)
+
+    if not m:
+        return region, None, None
+
+    start   = int(m.group(2).replace(',', '')) - 1
+    end     = int(m.group(3).replace(',', '')) if m.group(3) else None
+
+    return m.group(1), max(start, 0), end
+
+#===========================================================
+
+def load_fai(ffai, names):
+    """
+    Desc:
+        Load index entries of given names from a '.fai' file.
+    Args:
+        ffai    - The '.fai' file
+        names   - A set of sequence names
+    Ret:
+        A dictionary of name -> FaiEntry, of names found.
+    """
+
+    fai     = {}
+
+    with open(ffai, 'r') as fh_fai:
+        for line in fh_fai:
+            items   = line.rstrip('\n').split('\t')
+
+            if items[0] in names:
+                fai[items[0]]   = FaiEntry(*map(int, items[1:5]))
+
+                if len(fai) == len(names):  # All found, stop reading
+                    break
+
+    return fai
+
+#===========================================================
+
+def fetch(fh, entry, start=None, end=None):
+    """
+    Desc:
+        Read residues [start, end) of an indexed sequence.
+    Args:
+        fh      - A FASTA file handle opened in binary mode
+        entry   - A FaiEntry
+        start   - 0-based start. Default 0
+        end     - 0-based exclusive end. Default the sequence length
+    Ret:
+        A bytes object of residues.
+    """
+
+    start   = 0 if start is None else min(start, entry.length)
+    end     = entry.length if end is None else min(end, entry.length)
+
+    if start >= end or not entry.line_bases:
+        return b''
+
+    def locate(pos):    # File offset of residue 'pos'
+        return entry.offset + pos // entry.line_bases * entry.line_bytes \
+            + pos % entry.line_bases
+
+    fh.seek(locate(start))
+    data    = fh.read(locate(end - 1) + 1 - locate(start))
+
+    return data.replace(b'\n', b'').replace(b'\r', b'')
+
+#===========================================================
+#
+#                   Main
+#
+#===========================================================
+
+def main():
+    argParser   = argparse.ArgumentParser(
+        description="Extract sequences or subsequences by a faidx index.")
+    argParser.add_argument("fin", action="store",
+        help="Input FASTA file.")
+    argParser.add_argument("regions", action="store", nargs="*",
+        help="Regions, as 'name', 'name:start' or 'name:start-end'.")
+    argParser.add_argument("-r", "--region-file", action="store",
+        dest="fregion",
+        help="File of regions, one per line.")
+    argParser.add_argument("-w", "--width", action="store", type=int,
+        default=60,
+        help="Line width of output sequences. Default 60.")
+
+    args    = argParser.parse_args()
+
+    regions = list(args.regions)
+
+    if args.fregion:
+        with open(args.fregion, 'r') as fh_region:
+            regions += [line.strip() for line in fh_region if line.strip()]
+
+    if not regions:
+        sys.exit("[ERROR] No region provided.")
+
+    fmt     = compression(args.fin)
+
+    if fmt:
+        sys.exit("[ERROR] '%s' is compressed by %s. Regions are read by "
+                 "seeks, decompress it first." % (args.fin, fmt))
+
+    ffai    = args.fin + '.fai'
+
+    if not os.path.exists(ffai) \
+        or os.path.getmtime(ffai) < os.path.getmtime(args.fin):
+        print("[NOTE] Building index '%s' ..." % ffai, file=sys.stderr)
+
+        for _ in write_fai(fasta_lengths(args.fin), ffai, args.fin):
+            pass
+
+    fai     = load_fai(ffai, set(parse_region(r)[0] for r in regions))
+
+    # A name may contain ':', so try whole region strings of names not found
+    whole   = set(r for r in regions
+                  if parse_region(r)[0] not in fai and r not in fai)
+
+    if whole:
+        fai.update(load_fai(ffai, whole))
+
+    with open(args.fin, 'rb') as fh_in:
+        for region in regions:
+            name, start, end    = parse_region(region)
+
+            if name not in fai and region in fai:
+                name, start, end    = region, None, None
+
+            if name not in fai:
+                print("[WARNING] Sequence '%s' not found." % name,
+                      file=sys.stderr)
+                continue
+
+            seq = fetch(fh_in, fai[name], start, end).decode()
+
+            sys.stdout.write('>' + region + '\n')
+
+            for i in range(0, len(seq), args.width):
+                sys.stdout.write(seq[i:i + args.width] + '\n')
+
+if __name__ == '__main__':
+    main()
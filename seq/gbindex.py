@@ -0,0 +1,305 @@
+#!/usr/bin/python3
+
+'''
+NAME
+
+    gbindex.py  - Accession index for random access into GenBank flat files
+
+SYNOPSIS
+
+    from gbindex import open_records
+
+    with open_records('gbvrl1.seq', ['AB000000.1', 'X00001']) as fh:
+        for line in fh:
+            ...
+
+DESCRIPTION
+
+    The index '<GenBank file>.gbi' is built by one pass over the file,
+    locating records by 'LOCUS' lines and '//' terminators in a memory
+    map, and parsing only header lines before 'FEATURES'. It is a tab
+    delimited file:
+
+============================================================
+#gbi    1   <size>  <mtime_ns>          <-  Of the GenBank file
+#Offset Length  ID  Name    Accession   ... <-  Column names
+<offset>    <length>    <accession.version> <LOCUS name>    ...
+============================================================
+
+    Columns after the byte offset and length of each record are its
+    'accession.version', LOCUS name, accession, and LOCUS line fields:
+    sequence length, molecule type, topology, division and date.
+
+    A record is looked up by 'accession.version', accession or LOCUS
+    name. The index is rebuilt automatically if size or mtime of the
+    GenBank file changes.
+
+    Only uncompressed files are supported, since a compressed stream can
+    not be seeked.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+
+'''
+
+import io
+import mmap
+import os
+import sys
+import tempfile
+
+from collections import namedtuple
+
+from gbkstream import parse_locus, record_id
+from xopen import ChunkReader, compression
+
+SUFFIX      = '.gbi'
+GBI_VERSION = '1'
+
+# Size of blocks read from a record
+BLOCK_SIZE  = 1 << 20
+
+GbiEntry    = namedtuple('GbiEntry', ['offset', 'length', 'id', 'name',
+                'accession', 'seq_len', 'mol_type', 'topology', 'division',
+                'date'])
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def scan_records(fin):
+    """
+    Desc:
+        Locate records of a GenBank file, and parse their headers.
+    Args:
+        fin     - GenBank file
+    Ret:
+        A generator of GbiEntry.
+    """
+
+    if os.path.getsize(fin) == 0:
+        return
+
+    with open(fin, 'rb') as fh, \
+        mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = 0 if mm[:5] == b'LOCUS' else mm.find(b'\nLOCUS') + 1
+
+        if pos == 0 and mm[:5] != b'LOCUS':     # No record
+            return
+
+        while True:
+            end = mm.find(b'\n//', pos)
+            end = len(mm) if end == -1 else mm.find(b'\n', end + 3) + 1 \
+                or len(mm)
+
+            # Header lines only
+            hend    = mm.find(b'\nFEATURES', pos, end)
+            hend    = mm.find(b'\nORIGIN', pos, end) if hend == -1 else hend
+            header  = mm[pos:end if hend == -1 else hend].decode('latin-1')
+
+            locus   = parse_locus(header.split('\n', 1)[0])
+            accs    = [line.split()[1:] for line in header.split('\n')
+                       if line.startswith('ACCESSION')]
+
+            yield GbiEntry(pos, end - pos, record_id(header), locus['name'],
+                           accs[0][0] if accs and accs[0] else '',
+                           locus['length'], locus['mol_type'],
+                           locus['topology'], locus['division'],
+                           locus['date'])
+
+            nxt = mm.find(b'\nLOCUS', end - 1)
+
+            if nxt == -1:
+                break
+
+            pos = nxt + 1
+
+#===========================================================
+
+def file_stat(fin):
+    "Size and mtime of a file"
+
+    st  = os.stat(fin)
+
+    return st.st_size, st.st_mtime_ns
+
+#===========================================================
+
+def write_index(fin, fidx):
+    """
+    Desc:
+        Build the index of a GenBank file.
+    Args:
+        fin     - GenBank file
+        fidx    - Index file
+    Ret:
+        A list of GbiEntry.
+    """
+
+    stat    = file_stat(fin)
+    entries = list(scan_records(fin))
+
+    try:
+        fh  = tempfile.NamedTemporaryFile('w', dir=os.path.dirname(fidx)
+                                          or '.', suffix=SUFFIX + '.tmp',
+                                          delete=False)
+    except OSError as err:
+        print("[WARNING] Can not write index '%s': %s" % (fidx, err),
+              file=sys.stderr)
+        return entries
+
+    with fh:
+        fh.write('#gbi\t%s\t%d\t%d\n' % ((GBI_VERSION,) + stat))
+        fh.write('#Offset\tLength\tID\tName\tAccession\tSeqLength\t'
+                 'MolType\tTopology\tDivision\tDate\n')
+
+        for e in entries:
+            fh.write('\t'.join(map(str, e)) + '\n')
+
+    os.chmod(fh.name, 0o644)    # Not 0600 of a temporary file
+    os.replace(fh.name, fidx)
+
+    return entries
+
+#===========================================================
+
+def read_index(fin, fidx):
+    """
+    Desc:
+        Read the index of a GenBank file, if it is up to date.
+    Args:
+        fin     - GenBank file
+        fidx    - Index file
+    Ret:
+        A list of GbiEntry, or None if missing or out of date.
+    """
+
+    try:
+        fh  = open(fidx, 'r')
+    except OSError:
+        return None
+
+    with fh:
+        items   = fh.readline().rstrip('\n').split('\t')
+
+        if items[:2] != ['#gbi', GBI_VERSION] \
+            or tuple(map(int, items[2:4])) != file_stat(fin):
+            return None
+
+        entries = []
+
+        for line in fh:
+            if line.startswith('#'):
+                continue
+
+            items   = line.rstrip('\n').split('\t')
+            entries.append(GbiEntry(int(items[0]), int(items[1]),
+                                    *items[2:]))
+
+    return entries
+
+#===========================================================
+
+def load_index(fin):
+    """
+    Desc:
+        Load the index of a GenBank file, and build it if missing or out
+        of date.
+    Args:
+        fin     - GenBank file
+    Ret:
+        A dictionary of 'accession.version', accession and LOCUS name ->
+        GbiEntry.
+    """
+
+    if fin == '-' or compression(fin):
+        sys.exit("[ERROR] Random access needs an uncompressed file, "
+                 "not '%s'." % fin)
+
+    fidx    = fin + SUFFIX
+    entries = read_index(fin, fidx)
+
+    if entries is None:
+        print("[NOTE] Building index '%s' ..." % fidx, file=sys.stderr)
+        entries = write_index(fin, fidx)
+
+    index   = {}
+
+    # 'accession.version' takes precedence over accession and name
+    for key in ('name', 'accession', 'id'):
+        for e in entries:
+            if getattr(e, key):
+                index[getattr(e, key)]  = e
+
+    return index
+
+#===========================================================
+
+def read_ids(ids=None, fid=None):
+    "Record IDs from a comma separated string and/or a file, one per line"
+
+    names   = []
+
+    if ids:
+        names   += [i.strip() for i in ids.split(',') if i.strip()]
+
+    if fid:
+        with open(fid, 'r') as fh:
+            names   += [line.strip() for line in fh if line.strip()]
+
+    return names
+
+#===========================================================
+
+def record_chunks(fin, entries):
+    "Bytes of given records, read by blocks"
+
+    with open(fin, 'rb') as fh:
+        for e in entries:
+            fh.seek(e.offset)
+            left    = e.length
+
+            while left > 0:
+                block   = fh.read(min(left, BLOCK_SIZE))
+
+                if not block:
+                    break
+
+                left    -= len(block)
+
+                yield block
+
+#===========================================================
+
+def open_records(fin, ids):
+    """
+    Desc:
+        Open the given records of a GenBank file as a text stream, by seeks
+        into the file.
+    Args:
+        fin     - GenBank file
+        ids     - A list of 'accession.version', accessions or LOCUS names
+    Ret:
+        A text file handle of the records, in the order of ids. Unknown
+        ids are warned.
+    """
+
+    index   = load_index(fin)
+    entries = []
+
+    for i in ids:
+        if i in index:
+            entries.append(index[i])
+        else:
+            print("[WARNING] Record '%s' not found in '%s'." % (i, fin),
+                  file=sys.stderr)
+
+    return io.TextIOWrapper(io.BufferedReader(
+        ChunkReader(record_chunks(fin, entries))))
@@ -2,15 +2,65 @@
 
 """
 Name
-    
+
     gbk2embl.py - Convert NCBI GenBank format file into EBI EMBL format.
 
 SYNOPSYIS
 
-    gbk2embl.py <gbk file> <embl file>
+    gbk2embl.py [--emit embl,fasta,gff3,faa] [--incremental]
+                [--ids <id,...>] [--id-file <file>]
+                [--strict | --low-mem | --jobs N [--window N]]
+                <gbk file> <embl file>
 
 DESCRIPTION
 
+    By default records are translated line by line by 'gbkstream.py'.
+    Header blocks are mapped to EMBL lines, while feature locations and
+    qualifiers are copied byte for byte. No Bio.SeqIO objects are built,
+    which is much faster on large GenBank division dumps.
+
+    With '--emit' each record is parsed once, and written into several
+    formats at the same time, each by its own writer and buffered output
+    file:
+
+        embl    - EMBL flat file, <embl file>
+        fasta   - Nucleotide sequences, <basename>.fasta
+        gff3    - Features in GFF3, <basename>.gff3
+        faa     - '/translation' of CDS features, <basename>.faa
+
+    where <basename> is <embl file> or <gbk file> without extension.
+
+    With '--incremental' a manifest '<first output>.manifest' keeps a
+    content hash and output byte ranges of each record, keyed by
+    'accession.version', see 'manifest.py'. Outputs of unchanged records are
+    copied from the previous outputs, and only new or changed records are
+    converted. Counts of records added, changed, unchanged and removed are
+    reported.
+
+    With '--ids' or '--id-file' only the given records, by
+    'accession.version', accession or LOCUS name, are converted. They are
+    read by seeks into the GenBank file, by an index '<gbk file>.gbi',
+    which is built by one pass if missing or out of date, see 'gbindex.py'.
+
+    With '--low-mem' ORIGIN lines are formatted into EMBL 'SQ' lines in
+    fixed size chunks, and base composition is counted on the fly. The
+    formatted lines of a record beyond 16 MB are spooled into a temporary
+    file, so memory does not grow with the length of chromosome scale
+    records.
+
+    With '--strict' each record is parsed and written by Bio.SeqIO instead,
+    for EMBL output only.
+
+    With '--jobs N' the input is split at '//' terminators into shards of
+    records, which are converted by a pool of N processes. A single writer
+    outputs shards in the original record order. At most '--window'
+    records are in flight at any time, which bounds peak memory.
+
+    Conversion speed in records/sec is reported at the end.
+
+    Input file compressed by gzip, bgzip, bz2, xz or zstd is read directly,
+    see 'xopen.py'.
+
 AUTHOR
 
     zeroliu-at-gmail-dot-com
@@ -18,13 +68,40 @@ AUTHOR
 VERSION
 
     0.0.1   2016-09-26
+    0.0.2   2026-10-18  Read compressed input transparently.
+    0.0.3   2026-10-18  Streaming translator. Add option '--strict'.
+    0.0.4   2026-10-18  Add option '--jobs' for parallel conversion.
+    0.0.5   2026-10-18  Add option '--low-mem' for chromosome scale records.
+    0.0.6   2026-10-18  Add option '--emit' for multiple output formats.
+    0.0.7   2026-10-18  Add option '--incremental'.
+    0.0.8   2026-10-18  Add options '--ids' and '--id-file'.
 
 """
 
-from Bio import SeqIO
 import argparse
+import io
+import multiprocessing
 import os
 import sys
+import time
+
+from collections import deque
+
+from gbkstream import (EmblWriter, FaaWriter, FastaWriter, Gff3Writer,
+                       GFF3_VERSION, record_id, split_records, translate)
+from gbindex import open_records, read_ids
+from manifest import Manifest
+from xopen import open_input
+
+# Max size of formatted sequence lines held in memory for '--low-mem'
+SPOOL_SIZE  = 1 << 24
+
+# Buffer size of each output file
+SINK_SIZE   = 1 << 20
+
+# Output formats and file extensions
+FORMATS     = {'embl' : '.embl', 'fasta' : '.fasta', 'gff3' : '.gff3',
+               'faa' : '.faa'}
 
 #===========================================================
 #
@@ -32,7 +109,193 @@ import sys
 #
 #===========================================================
 
+def make_writers(handles, spool_size=None, header=True):
+    """
+    Desc:
+        Create a writer for each output format.
+    Args:
+        handles     - A dictionary of format -> output file handle
+        spool_size  - Spool size of EmblWriter
+        header      - Write GFF3 version line
+    Ret:
+        A list of writers.
+    """
+
+    writers = []
+
+    for fmt, fh in handles.items():
+        if fmt == 'embl':
+            writers.append(EmblWriter(fh, spool_size))
+        elif fmt == 'fasta':
+            writers.append(FastaWriter(fh))
+        elif fmt == 'gff3':
+            writers.append(Gff3Writer(fh, header))
+        elif fmt == 'faa':
+            writers.append(FaaWriter(fh))
+
+    return writers
+
+#===========================================================
+
+def convert_strict(fh_gb, handles):
+    "Convert records by Bio.SeqIO, yield each record ID"
+
+    # Imported here, the streaming translator does not need Biopython
+    from Bio import SeqIO
+
+    for seq_rec in SeqIO.parse(fh_gb, 'genbank'):
+        SeqIO.write(seq_rec, handles['embl'], 'embl')
+
+        yield seq_rec.id
+
+#===========================================================
+
+def convert_stream(fh_gb, handles, spool_size=None, header=True):
+    "Convert records by the streaming translator, yield each record ID"
+
+    for rec in translate(fh_gb, make_writers(handles, spool_size, header)):
+        yield rec.id
+
+#===========================================================
+
+def convert_shard(task):
+    """
+    Desc:
+        Convert a shard of GenBank records, for a worker process.
+    Args:
+        task    - A tuple of (list of record text, strict, formats)
+    Ret:
+        outs    - A dictionary of format -> output text of the shard
+        ids     - A list of record IDs
+    """
+
+    texts, strict, emit = task
+
+    fh_gb   = io.StringIO(''.join(texts))
+    handles = dict((fmt, io.StringIO()) for fmt in emit)
+
+    if strict:
+        ids = list(convert_strict(fh_gb, handles))
+    else:   # GFF3 version line is written once by the parent
+        ids = list(convert_stream(fh_gb, handles, header=False))
+
+    return dict((fmt, fh.getvalue()) for fmt, fh in handles.items()), ids
+
+#===========================================================
+
+def convert_record(text, emit, strict):
+    "Convert record text into a list of output text, one for each format"
+
+    fh_gb   = io.StringIO(text)
+    handles = dict((fmt, io.StringIO()) for fmt in emit)
+
+    if strict:
+        list(convert_strict(fh_gb, handles))
+    else:
+        list(convert_stream(fh_gb, handles, header=False))
+
+    return [handles[fmt].getvalue() for fmt in emit]
+
+#===========================================================
+
+def convert_incremental(fh_gb, fouts, emit, strict):
+    """
+    Desc:
+        Convert only new or changed records by a manifest, and copy the
+        others from previous outputs.
+    Args:
+        fh_gb   - Input GenBank file handle
+        fouts   - A dictionary of format -> output file
+        emit    - A list of output formats
+        strict  - Convert by Bio.SeqIO
+    Ret:
+        A generator of record IDs, as they are written.
+    """
+
+    man     = Manifest(fouts[emit[0]] + '.manifest',
+                       [fouts[fmt] for fmt in emit],
+                       settings='strict' if strict else 'stream')
+
+    if not man.valid:
+        print("[NOTE] No valid manifest, convert all records.")
+
+    heads   = [GFF3_VERSION if fmt == 'gff3' else '' for fmt in emit]
+    records = ((record_id(text), text) for text in split_records(fh_gb))
+
+    for seq_id, status in man.update(records,
+            lambda text: convert_record(text, emit, strict), heads):
+        yield seq_id
+
+    print("[NOTE] " + man.summary())
+
+#===========================================================
+
+def shards(records, size):
+    "Group record text into lists of 'size' records"
+
+    shard   = []
+
+    for text in records:
+        shard.append(text)
+
+        if len(shard) == size:
+            yield shard
+            shard   = []
+
+    if shard:
+        yield shard
+
+#===========================================================
+
+def convert_mp(fh_gb, handles, strict, jobs, window):
+    """
+    Desc:
+        Convert records by a pool of processes, and write them in order.
+    Args:
+        fh_gb   - Input GenBank file handle
+        handles - A dictionary of format -> output file handle
+        strict  - Convert by Bio.SeqIO
+        jobs    - No. of processes
+        window  - Max No. of records in flight
+    Ret:
+        A generator of record IDs, as they are written.
+    """
+
+    # Small enough shards to keep all processes busy within the window
+    size    = max(1, min(100, window // (jobs * 2)))
+
+    pending = deque()   # (async result, No. of records) in input order
+    flight  = 0         # No. of records in flight
+    emit    = list(handles)
+
+    if 'gff3' in handles and not strict:
+        handles['gff3'].write(GFF3_VERSION)
+
+    with multiprocessing.Pool(jobs) as pool:
+        for shard in shards(split_records(fh_gb), size):
+            # Write the oldest shards until the new one fits in the window
+            while pending and flight + len(shard) > window:
+                result, num = pending.popleft()
+                outs, ids   = result.get()
+                flight      -= num
+
+                for fmt, text in outs.items():
+                    handles[fmt].write(text)
 
+                yield from ids
+
+            pending.append((pool.apply_async(convert_shard,
+                            ((shard, strict, emit),)), len(shard)))
+            flight  += len(shard)
+
+        while pending:
+            result, num = pending.popleft()
+            outs, ids   = result.get()
+
+            for fmt, text in outs.items():
+                handles[fmt].write(text)
+
+            yield from ids
 
 #===========================================================
 #
@@ -40,40 +303,128 @@ import sys
 #
 #===========================================================
 
-# Create and parse command line arguments
-argParser   = argparse.ArgumentParser(
-    description="Convert NCBI GenBank format file into EMBL format.")
-argParser.add_argument("fgb", action="store",
-    help="Input NCBI GenBank format file.")
-argParser.add_argument("febl", action="store", nargs="?",
-    help="Outupt EBI EMBL format file. Optional")
+def main():
+    # Create and parse command line arguments
+    argParser   = argparse.ArgumentParser(
+        description="Convert NCBI GenBank format file into EMBL format.")
+    argParser.add_argument("fgb", action="store",
+        help="Input NCBI GenBank format file.")
+    argParser.add_argument("febl", action="store", nargs="?",
+        help="Outupt EBI EMBL format file. Optional")
+    argParser.add_argument("-e", "--emit", action="store", default="embl",
+        help="Comma separated output formats, of 'embl', 'fasta', 'gff3' "
+             "and 'faa'. Default 'embl'.")
+    argParser.add_argument("--strict", action="store_true",
+        help="Parse and write records by Bio.SeqIO.")
+    argParser.add_argument("--low-mem", action="store_true",
+        help="Spool sequence lines of large records into temporary files.")
+    argParser.add_argument("-i", "--incremental", action="store_true",
+        help="Convert only new or changed records, by a manifest.")
+    argParser.add_argument("--ids", action="store",
+        help="Comma separated IDs of records to convert.")
+    argParser.add_argument("--id-file", action="store", dest="fid",
+        help="File of IDs of records to convert, one per line.")
+    argParser.add_argument("-j", "--jobs", action="store", type=int,
+        default=1,
+        help="Number of processes to convert records. Default 1.")
+    argParser.add_argument("-w", "--window", action="store", type=int,
+        default=1000,
+        help="Max number of records in flight for '--jobs'. Default 1000.")
+
+    args    = argParser.parse_args()
+
+    if not args.fgb:   # Whether input file exists
+        sys.exit("[ERROR] No input GenBank filename!")
+    else:
+        fgb     = args.fgb
+
+    emit    = []
+
+    for fmt in args.emit.split(','):
+        fmt = fmt.strip().lower()
+
+        if fmt not in FORMATS:
+            sys.exit("[ERROR] Unknown output format '%s'." % fmt)
+
+        if fmt not in emit:
+            emit.append(fmt)
+
+    if args.strict and emit != ['embl']:
+        sys.exit("[ERROR] Option '--strict' supports 'embl' output only.")
+
+    if args.febl:  # Whether output file exists
+        filename, file_ext  = os.path.splitext(args.febl)
+    else:
+        filename, file_ext  = os.path.splitext(args.fgb)
+
+        if file_ext in ('.gz', '.bgz', '.bz2', '.xz', '.zst'):
+            filename, file_ext  = os.path.splitext(filename)
+
+    fouts   = dict((fmt, filename + FORMATS[fmt]) for fmt in emit)
+
+    if args.febl:
+        fouts['embl']   = args.febl
+
+    ## DEBUG
+    print(">>>Input file: %s" % fgb)
+
+    for fmt in emit:
+        print(">>>Output file: %s" % fouts[fmt])
+
+    if args.jobs < 1 or args.window < 1:
+        sys.exit("[ERROR] Options '--jobs' and '--window' must be positive.")
+
+    if args.low_mem and (args.strict or args.jobs > 1):
+        sys.exit("[ERROR] Option '--low-mem' can not be used with "
+                 "'--strict' or '--jobs'.")
+
+    if args.incremental and (args.low_mem or args.jobs > 1):
+        sys.exit("[ERROR] Option '--incremental' can not be used with "
+                 "'--low-mem' or '--jobs'.")
+
+    if args.incremental and (args.ids or args.fid):
+        sys.exit("[ERROR] Option '--incremental' can not be used with "
+                 "'--ids' or '--id-file'.")
+
+    # fh_gb   = open(fgb, "rU")
+    if args.ids or args.fid:
+        fh_gb   = open_records(fgb, read_ids(args.ids, args.fid))
+    else:
+        fh_gb   = io.TextIOWrapper(open_input(fgb))
+    handles = {}
 
-args    = argParser.parse_args()
+    if args.incremental:    # Outputs are replaced at the end
+        seq_ids = convert_incremental(fh_gb, fouts, emit, args.strict)
+    else:
+        handles = dict((fmt, open(fouts[fmt], "w", buffering=SINK_SIZE))
+                       for fmt in emit)
 
-if not args.fgb:   # Whether input file exists
-    sys.exit("[ERROR] No input GenBank filename!")
-else:
-    fgb     = args.fgb
+        if args.jobs > 1:
+            seq_ids = convert_mp(fh_gb, handles, args.strict, args.jobs,
+                                 args.window)
+        elif args.strict:
+            seq_ids = convert_strict(fh_gb, handles)
+        else:
+            seq_ids = convert_stream(fh_gb, handles,
+                                     SPOOL_SIZE if args.low_mem else None)
 
-if args.febl:  # Whether output file exists
-    febl    = args.febl
-else:
-    filename, file_ext  = os.path.splitext(args.fgb)
-    febl    = filename + '.embl'
+    num_recs    = 0
+    start_time  = time.time()
 
-## DEBUG
-print(">>>Input file: %s" % fgb)
-print(">>>Output file: %s" % febl)
+    for seq_id in seq_ids:
+        print("Seq ID:\t %s" % seq_id)
+        num_recs    += 1
 
-fh_gb   = open(fgb, "rU")
-fh_ebl  = open(febl, "w")
+    elapsed = time.time() - start_time
 
-for seq_rec in SeqIO.parse(fh_gb, 'genbank'):
-    print("Seq ID:\t %s" % seq_rec.id)
-    SeqIO.write(seq_rec, fh_ebl, 'embl')
+    print("Converted %d records in %.1f s, %.1f records/sec."
+          % (num_recs, elapsed, num_recs / elapsed if elapsed else 0))
+    print("Done!")
 
-print("Done!")
+    fh_gb.close()
 
-fh_gb.close()
-fh_ebl.close()
+    for fh in handles.values():
+        fh.close()
 
+if __name__ == '__main__':
+    main()
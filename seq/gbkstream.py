@@ -0,0 +1,838 @@
+#!/usr/bin/python3
+
+'''
+NAME
+
+    gbkstream.py    - Streaming line level GenBank flat file translator
+
+SYNOPSIS
+
+    from gbkstream import EmblWriter, FastaWriter, translate
+
+    with open('in.gbk') as fh_in, open('out.embl', 'w') as fh_embl, \
+        open('out.fasta', 'w') as fh_fasta:
+        for rec in translate(fh_in, [EmblWriter(fh_embl),
+                                     FastaWriter(fh_fasta)]):
+            print(rec.id)
+
+DESCRIPTION
+
+    GenBank records are parsed line by line into a lightweight Record:
+
+        LOCUS       - A dictionary of LOCUS line fields
+        header      - A list of [keyword, lines] of header blocks, e.g.
+                      DEFINITION, ACCESSION, REFERENCE, AUTHORS ...
+        features    - Feature table lines, as they are
+
+    No SeqFeature or location objects are built. Each writer is called by:
+
+        start(rec)      - Once header and feature table are read
+        sequence(seq)   - For chunks of sequence letters of ORIGIN block
+        end(rec)        - At record terminator '//'
+
+    EmblWriter maps the header to EMBL lines, and copies the feature table
+    into 'FT' lines byte for byte, since both formats put the feature key
+    at column 6 and locations/qualifiers at column 22.
+
+    Sequence chunks are formatted into EMBL 'SQ' lines as they arrive, and
+    base composition is counted on the fly, since the 'SQ' header line with
+    the counts precedes the sequence lines. Formatted lines are held in a
+    spool, which can overflow into a temporary file, so memory does not
+    grow with sequence length.
+
+    Other writers, each on its own output handle, share the same parse:
+
+        FastaWriter     - Nucleotide sequences in FASTA format
+        FaaWriter       - '/translation' of CDS features in FASTA format
+        Gff3Writer      - Features in GFF3 format, by parse_features() and
+                          parse_location()
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+    0.0.2   2026-10-18  Format sequence lines on the fly, optional spool
+                        into a temporary file.
+    0.0.3   2026-10-18  Add FastaWriter, FaaWriter and Gff3Writer.
+    0.0.4   2026-10-18  Add record_id().
+
+'''
+
+import io
+import re
+import shutil
+import tempfile
+
+# No. of ORIGIN lines passed to writers at one time, about 64 KB letters
+SEQ_LINES   = 1024
+
+# Bytes in ORIGIN lines other than sequence letters
+NON_LETTERS = b' \t\r\n0123456789'
+
+# Max width of EMBL line text after the 5-char line code
+EMBL_WIDTH  = 75
+
+# GenBank divisions unknown to EMBL, same as Bio.SeqIO
+EMBL_DIVISIONS  = {'PHG', 'ENV', 'FUN', 'HUM', 'INV', 'MAM', 'VRT', 'MUS',
+                   'PLN', 'PRO', 'ROD', 'SYN', 'TGN', 'UNC', 'VRL', 'XXX'}
+GBK_TO_EMBL     = {'BCT' : 'PRO', 'UNK' : 'UNC'}
+
+GFF3_VERSION    = '##gff-version 3\n'
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def parse_locus(line):
+    """
+    Desc:
+        Parse a LOCUS line by whitespace delimited tokens.
+    Args:
+        line    - LOCUS line
+    Ret:
+        A dictionary of 'name', 'length', 'unit', 'mol_type', 'topology',
+        'division' and 'date'. Missing fields are ''.
+    """
+
+    items   = line.split()[1:]
+    locus   = dict.fromkeys(('name', 'length', 'unit', 'mol_type',
+                             'topology', 'division', 'date'), '')
+
+    if items:
+        locus['name']   = items.pop(0)
+
+    if len(items) >= 2 and items[0].isdigit():
+        locus['length'] = items.pop(0)
+        locus['unit']   = items.pop(0)
+
+    if items and re.match(r'^\d{1,2}-[A-Z]{3}-\d{4}$', items[-1]):
+        locus['date']   = items.pop()
+
+    if items and re.match(r'^[A-Z]{3}$', items[-1]):
+        locus['division']   = items.pop()
+
+    if items and items[-1] in ('linear', 'circular'):
+        locus['topology']   = items.pop()
+
+    locus['mol_type']   = ' '.join(items)
+
+    return locus
+
+#===========================================================
+
+def wrap(text, width=EMBL_WIDTH):
+    "Split text into lines no longer than width, on whitespaces"
+
+    lines   = []
+    line    = ''
+
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line    = word
+        else:
+            line    = line + ' ' + word if line else word
+
+    lines.append(line)
+
+    return lines
+
+#===========================================================
+
+def format_seq(data, pos):
+    """
+    Desc:
+        Format EMBL sequence lines, 60 letters per line in blocks of 10.
+    Args:
+        data    - Sequence letters, of a length of multiple of 60 except
+                  the last part of a sequence
+        pos     - No. of letters formatted before data
+    Ret:
+        A string of lines.
+    """
+
+    size    = len(data) - len(data) % 60    # Length of full lines
+    lines   = ['     %s %s %s %s %s %s%10d\n' % (data[i:i + 10],
+                data[i + 10:i + 20], data[i + 20:i + 30],
+                data[i + 30:i + 40], data[i + 40:i + 50],
+                data[i + 50:i + 60], pos + i + 60)
+               for i in range(0, size, 60)]
+
+    if size < len(data):    # The last partial line
+        line    = data[size:]
+        blocks  = ' '.join([line[j:j + 10] for j in range(0, 60, 10)])
+        lines.append('     %-65s%10d\n' % (blocks.rstrip(), pos + len(data)))
+
+    return ''.join(lines)
+
+#===========================================================
+
+def seq_letters(lines):
+    "Sequence letters of ORIGIN lines, without positions and whitespaces"
+
+    # bytes.translate() deletes characters much faster than str methods
+    return ''.join(lines).encode('latin-1').translate(None, NON_LETTERS) \
+        .decode('latin-1')
+
+#===========================================================
+
+def parse_features(lines):
+    """
+    Desc:
+        Parse feature table lines into features.
+    Args:
+        lines   - Feature table lines, as Record.features
+    Ret:
+        A list of (key, location, qualifiers), where qualifiers is a list
+        of [name, value] with quotes removed. Value is None for a qualifier
+        without value, e.g. '/pseudo'.
+    """
+
+    feats   = []
+    quals   = None
+    opened  = False     # Whether the last qualifier value is an open quote
+
+    for line in lines:
+        if line[5:6].strip():   # A feature key at column 6
+            quals   = []
+            opened  = False
+            feats.append((line[5:21].strip(), [line[21:].strip()], quals))
+            continue
+
+        if quals is None:
+            continue
+
+        text    = line[21:].strip()
+
+        if opened:
+            quals[-1][1].append(text)
+            opened  = text.count('"') % 2 == 0
+        elif text.startswith('/'):
+            name, _, value  = text[1:].partition('=')
+            quals.append([name, [value] if _ else None])
+            opened  = value.startswith('"') and value.count('"') % 2 == 1
+        elif not quals:     # Continued location
+            feats[-1][1].append(text)
+
+    result  = []
+
+    for key, loc, quals in feats:
+        for qual in quals:
+            if qual[1] is not None:
+                # Protein sequences are wrapped without spaces
+                sep     = '' if qual[0] == 'translation' else ' '
+                value   = sep.join(qual[1])
+
+                if value.startswith('"') and value.endswith('"'):
+                    value   = value[1:-1]
+
+                qual[1] = value.replace('""', '"')
+
+        result.append((key, ''.join(loc), quals))
+
+    return result
+
+#===========================================================
+
+def split_top(text):
+    "Split text at commas outside of parentheses"
+
+    items   = []
+    depth   = 0
+    start   = 0
+
+    for i, c in enumerate(text):
+        if c == '(':
+            depth   += 1
+        elif c == ')':
+            depth   -= 1
+        elif c == ',' and depth == 0:
+            items.append(text[start:i])
+            start   = i + 1
+
+    items.append(text[start:])
+
+    return items
+
+#===========================================================
+
+def parse_location(loc):
+    """
+    Desc:
+        Parse a GenBank feature location into parts.
+    Args:
+        loc     - Location string, e.g. 'complement(join(1..20,<30..>45))'
+    Ret:
+        A list of (start, end, strand) in biological order, with 1-based
+        inclusive coordinates and strand 1 or -1. Remote parts, e.g.
+        'J00194.1:100..202', and gaps are skipped.
+    """
+
+    loc     = loc.replace(' ', '')
+    items   = split_top(loc)
+
+    if len(items) > 1:
+        return [part for item in items for part in parse_location(item)]
+
+    m   = re.match(r'^(complement|join|order|bond|gap)\((.*)\)$', loc)
+
+    if m:
+        if m.group(1) == 'gap':
+            return []
+
+        parts   = parse_location(m.group(2))
+
+        if m.group(1) == 'complement':
+            return [(s, e, -strand) for s, e, strand in reversed(parts)]
+        else:
+            return parts
+
+    m   = re.match(r'^[<>]?(\d+)(?:(?:\.\.|\^)[<>]?(\d+))?[<>]?$', loc)
+
+    if not m:
+        return []
+
+    start   = int(m.group(1))
+    end     = int(m.group(2)) if m.group(2) else start
+
+    return [(start, end, 1)]
+
+#===========================================================
+
+def gff_escape(text):
+    "Escape characters reserved by GFF3 column 9"
+
+    return re.sub(r'[\x00-\x1f%;=&,\x7f]',
+                  lambda m: '%%%02X' % ord(m.group()), text)
+
+#===========================================================
+
+def split_records(fh, block_size=1 << 22):
+    """
+    Desc:
+        Split GenBank text into records at '//' terminator lines, without
+        parsing lines.
+    Args:
+        fh          - A text file handle
+        block_size  - Size of each block read. Default 4M chars
+    Ret:
+        A generator of record text, including the terminator line.
+    """
+
+    buf = ''
+    pos = 0     # Where to search for next terminator in buf
+
+    while True:
+        block   = fh.read(block_size)
+        buf     += block
+        start   = 0     # Start of next record in buf
+
+        while True:
+            idx = buf.find('\n//', pos)
+
+            if idx == -1:
+                pos = max(len(buf) - 3, start)
+                break
+
+            eol = buf.find('\n', idx + 3)
+
+            if eol == -1:   # Terminator line not complete yet
+                pos = idx
+                break
+
+            yield buf[start:eol + 1]
+
+            start   = eol + 1
+            pos     = start
+
+        buf = buf[start:]
+        pos -= start
+
+        if not block:
+            if buf.strip():     # Unterminated last record
+                yield buf
+
+            return
+
+#===========================================================
+
+def record_id(text):
+    "ID of record text, the same as Record.id, by header lines only"
+
+    name        = ''
+    accession   = ''
+
+    for line in io.StringIO(text):
+        if line.startswith('LOCUS') and not name:
+            name        = (line.split()[1:] or [''])[0]
+        elif line.startswith('ACCESSION') and not accession:
+            accession   = (line.split()[1:] or [''])[0]
+        elif line.startswith('VERSION') and line.split()[1:]:
+            return line.split()[1]
+        elif line.startswith(('FEATURES', 'ORIGIN', '//')):
+            break
+
+    return accession or name
+
+#===========================================================
+
+def translate(lines, writers):
+    """
+    Desc:
+        Parse GenBank records from lines, and pass them to writers.
+    Args:
+        lines   - An iterable of GenBank lines, e.g. a text file handle
+        writers - A list of writers
+    Ret:
+        A generator of each Record, after it is written.
+    """
+
+    rec     = None
+    state   = None      # None, 'header', 'features' or 'origin'
+    seq     = []        # Pending lines of ORIGIN block
+
+    for line in lines:
+        if state == 'origin':
+            if line.startswith('//'):
+                if seq:
+                    chunk   = seq_letters(seq)
+
+                    for w in writers:
+                        w.sequence(chunk)
+
+                for w in writers:
+                    w.end(rec)
+
+                yield rec
+
+                rec, state  = None, None
+                seq         = []
+            else:
+                seq.append(line)
+
+                if len(seq) >= SEQ_LINES:
+                    chunk   = seq_letters(seq)
+
+                    for w in writers:
+                        w.sequence(chunk)
+
+                    seq = []
+
+            continue
+
+        if line.startswith('LOCUS'):
+            rec     = Record(parse_locus(line))
+            state   = 'header'
+            continue
+
+        if rec is None:     # Text between records
+            continue
+
+        line    = line.rstrip('\r\n')
+
+        if state == 'features' and line.startswith(' '):
+            rec.features.append(line)
+        elif line.startswith('FEATURES'):
+            state   = 'features'
+        elif line.startswith('ORIGIN') or line.startswith('//'):
+            for w in writers:
+                w.start(rec)
+
+            if line.startswith('ORIGIN'):
+                state   = 'origin'
+            else:           # Record without sequence, e.g. CONTIG
+                for w in writers:
+                    w.end(rec)
+
+                yield rec
+
+                rec, state  = None, None
+        elif line[:12].strip() and not line.startswith(' ' * 5):
+            rec.header.append([line[:12].strip(), [line[12:]]])
+            state   = 'header'
+        elif rec.header:    # Continuation line
+            rec.header[-1][1].append(line[12:])
+
+#===========================================================
+#
+#                   Classes
+#
+#===========================================================
+
+class Record:
+    "A GenBank record parsed at line level"
+
+    def __init__(self, locus):
+        self.locus      = locus
+        self.header     = []
+        self.features   = []
+
+    def get(self, key):
+        "Text of the first header block of given keyword, or ''"
+
+        for k, lines in self.header:
+            if k == key:
+                return ' '.join(l.strip() for l in lines).strip()
+
+        return ''
+
+    @property
+    def accessions(self):
+        return self.get('ACCESSION').split()
+
+    @property
+    def id(self):
+        "'accession.version', the same as SeqRecord.id of Bio.SeqIO"
+
+        version = self.get('VERSION').split()
+
+        if version:
+            return version[0]
+        elif self.accessions:
+            return self.accessions[0]
+        else:
+            return self.locus['name']
+
+#===========================================================
+
+class EmblWriter:
+    """
+    Desc:
+        Write records in EMBL format.
+    Args:
+        handle      - Output file handle
+        spool_size  - Max size of formatted sequence lines of a record held
+                      in memory, beyond which they are spooled into a
+                      temporary file. Default None, always in memory
+    """
+
+    def __init__(self, handle, spool_size=None):
+        self.handle     = handle
+        self.spool_size = spool_size
+
+    def _line(self, code, text):
+        self.handle.write((code + '   ' + text).rstrip() + '\n')
+
+    def _lines(self, code, text):
+        for line in wrap(text):
+            self._line(code, line)
+
+    def _header(self, rec):
+        locus   = rec.locus
+        acc     = rec.accessions[0] if rec.accessions else locus['name']
+        rec_id  = rec.id
+
+        if '.' in rec_id and rec_id.rsplit('.', 1)[1].isdigit():
+            version = 'SV ' + rec_id.rsplit('.', 1)[1]
+        else:
+            version = ''
+
+        division    = locus['division']
+
+        if division not in EMBL_DIVISIONS:
+            division    = GBK_TO_EMBL.get(division, 'UNC')
+
+        unit    = 'AA' if locus['unit'] == 'aa' else 'BP'
+
+        self._line('ID', '%s; %s; %s; %s; ; %s; %s %s.' % (acc, version,
+            locus['topology'], locus['mol_type'] or 'DNA', division,
+            locus['length'] or '0', unit))
+        self.handle.write('XX\n')
+        self._lines('AC', '; '.join(rec.accessions or [acc]) + ';')
+        self.handle.write('XX\n')
+
+        for xref in rec.get('DBLINK').split():
+            if xref.startswith('BioProject:'):
+                self._line('PR', 'Project:' + xref.split(':', 1)[1] + ';')
+                self.handle.write('XX\n')
+                break
+
+        descr   = rec.get('DEFINITION')
+
+        if descr.endswith('.'):
+            descr   = descr[:-1]
+
+        self._lines('DE', descr or '.')
+        self.handle.write('XX\n')
+
+        if rec.get('KEYWORDS'):
+            self._lines('KW', rec.get('KEYWORDS'))
+            self.handle.write('XX\n')
+
+        organism, taxonomy  = '', ''
+
+        for key, lines in rec.header:
+            if key == 'ORGANISM':
+                organism    = lines[0].strip()
+                taxonomy    = ' '.join(l.strip() for l in lines[1:])
+                break
+
+        self._lines('OS', organism or rec.get('SOURCE'))
+        self._lines('OC', taxonomy or '.')
+        self.handle.write('XX\n')
+
+        self._references(rec)
+
+        for key, lines in rec.header:
+            if key == 'COMMENT':
+                for line in lines:
+                    self._line('CC', line.strip())
+
+                self.handle.write('XX\n')
+
+    def _references(self, rec):
+        refs    = []    # A dictionary of GenBank keyword -> text per reference
+
+        for key, lines in rec.header:
+            text    = ' '.join(l.strip() for l in lines).strip()
+
+            if key == 'REFERENCE':
+                refs.append({key : text})
+            elif refs and key in ('AUTHORS', 'CONSRTM', 'TITLE', 'JOURNAL',
+                                  'PUBMED', 'REMARK', 'MEDLINE'):
+                refs[-1][key]   = text
+
+        # In the order of EMBL reference lines
+        for number, ref in enumerate(refs, 1):
+            self._line('RN', '[%d]' % number)
+
+            # '1  (bases 1 to 1000; 1200 to 1300)'
+            spans   = re.findall(r'(\d+) to (\d+)', ref['REFERENCE'])
+
+            if spans:
+                self._line('RP', ', '.join('%s-%s' % s for s in spans))
+
+            if ref.get('PUBMED'):
+                self._line('RX', 'PUBMED; %s.' % ref['PUBMED'])
+
+            if ref.get('CONSRTM'):
+                self._lines('RG', ref['CONSRTM'])
+
+            if ref.get('AUTHORS'):
+                self._lines('RA', ref['AUTHORS'] + ';')
+
+            if 'TITLE' in ref:
+                self._lines('RT', '"%s";' % ref['TITLE'])
+
+            if ref.get('JOURNAL'):
+                self._lines('RL', ref['JOURNAL'])
+
+            self.handle.write('XX\n')
+
+    def start(self, rec):
+        self._header(rec)
+
+        self.handle.write('FH   Key             Location/Qualifiers\nFH\n')
+
+        for line in rec.features:   # Same columns as GenBank
+            self.handle.write('FT' + line[2:] + '\n')
+
+        self.handle.write('XX\n')
+
+        if self.spool_size is None:
+            self._spool = io.StringIO()
+        else:
+            self._spool = tempfile.SpooledTemporaryFile(self.spool_size,
+                                                        mode='w+')
+
+        self._counts    = [0, 0, 0, 0]  # No. of a, c, g, t
+        self._length    = 0             # No. of letters formatted
+        self._carry     = ''            # Letters of a partial line
+
+    def sequence(self, seq):
+        seq = seq.lower()
+
+        for i, c in enumerate('acgt'):
+            self._counts[i] += seq.count(c)
+
+        # Format full lines only, and carry the rest to next chunk
+        data    = self._carry + seq
+        size    = len(data) - len(data) % 60
+
+        self._spool.write(format_seq(data[:size], self._length))
+        self._length    += size
+        self._carry     = data[size:]
+
+    def end(self, rec):
+        self._spool.write(format_seq(self._carry, self._length))
+        self._length    += len(self._carry)
+        self._carry     = ''
+
+        contig  = ''.join(l.strip() for k, lines in rec.header
+                          if k == 'CONTIG' for l in lines)
+
+        if contig and not self._length:
+            self._lines('CO', contig)
+        elif rec.locus['unit'] == 'aa':
+            self.handle.write('SQ   \n')
+        else:
+            self.handle.write(
+                'SQ   Sequence %d BP; %d A; %d C; %d G; %d T; %d other;\n'
+                % tuple([self._length] + self._counts
+                        + [self._length - sum(self._counts)]))
+
+        if not contig or self._length:
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, self.handle, 1 << 20)
+
+        self._spool.close()
+
+        self.handle.write('//\n')
+
+#===========================================================
+
+class FastaWriter:
+    """
+    Desc:
+        Write records in FASTA format, the same header as Bio.SeqIO.
+    Args:
+        handle  - Output file handle
+        width   - Line width of sequences. Default 60
+    """
+
+    def __init__(self, handle, width=60):
+        self.handle = handle
+        self.width  = width
+
+    def start(self, rec):
+        desc    = rec.get('DEFINITION')
+
+        if desc.endswith('.'):
+            desc    = desc[:-1]
+
+        self.handle.write('>%s %s\n' % (rec.id, desc))
+        self._carry = ''
+
+    def sequence(self, seq):
+        data    = self._carry + seq.upper()     # The same as Bio.SeqIO
+        size    = len(data) - len(data) % self.width
+        w       = self.width
+
+        self.handle.write(''.join([data[i:i + w] + '\n'
+                                   for i in range(0, size, w)]))
+        self._carry = data[size:]
+
+    def end(self, rec):
+        if self._carry:
+            self.handle.write(self._carry + '\n')
+
+#===========================================================
+
+class FaaWriter:
+    """
+    Desc:
+        Write '/translation' of CDS features in FASTA format, with
+        '/protein_id' or '/locus_tag' as ID, and '/product' and record ID
+        as description.
+    Args:
+        handle  - Output file handle
+        width   - Line width of sequences. Default 60
+    """
+
+    def __init__(self, handle, width=60):
+        self.handle = handle
+        self.width  = width
+
+    def start(self, rec):
+        n   = 0     # No. of CDS
+
+        for key, loc, quals in parse_features(rec.features):
+            if key != 'CDS':
+                continue
+
+            n       += 1
+            quals   = dict((k, v) for k, v in quals if v is not None)
+
+            if 'translation' not in quals:
+                continue
+
+            prot_id = quals.get('protein_id') or quals.get('locus_tag') \
+                or '%s_cds%d' % (rec.id, n)
+            prot    = quals['translation']
+
+            self.handle.write('>%s %s [%s]\n'
+                              % (prot_id, quals.get('product', ''), rec.id))
+            self.handle.write(''.join([prot[i:i + self.width] + '\n'
+                for i in range(0, len(prot), self.width)]))
+
+    def sequence(self, seq):
+        pass
+
+    def end(self, rec):
+        pass
+
+#===========================================================
+
+class Gff3Writer:
+    """
+    Desc:
+        Write features in GFF3 format, a line for each part of a location.
+        Parts of a feature share the same ID. CDS phase is derived from
+        '/codon_start'. Qualifiers other than '/translation' are kept as
+        attributes.
+    Args:
+        handle  - Output file handle
+        header  - Write '##gff-version 3' line. Default True, False for
+                  partial outputs to be concatenated
+    """
+
+    def __init__(self, handle, header=True):
+        self.handle = handle
+
+        if header:
+            self.handle.write(GFF3_VERSION)
+
+    def start(self, rec):
+        seq_id  = gff_escape(rec.id)
+
+        if rec.locus['length']:
+            self.handle.write('##sequence-region %s 1 %s\n'
+                              % (seq_id, rec.locus['length']))
+
+        for n, (key, loc, quals) in enumerate(parse_features(rec.features),
+                                              1):
+            attrs   = ['ID=%s.%d' % (seq_id, n)]
+            values  = {}
+
+            for name, value in quals:
+                if name != 'translation':
+                    values.setdefault(name, []).append(
+                        'true' if value is None else gff_escape(value))
+
+            name    = values.get('gene') or values.get('locus_tag')
+
+            if name:
+                attrs.append('Name=' + name[0])
+
+            attrs   += ['%s=%s' % (gff_escape(k), ','.join(v))
+                        for k, v in values.items()]
+            attrs   = ';'.join(attrs)
+
+            ftype   = 'region' if key == 'source' else key
+            phase   = None
+
+            if key == 'CDS':
+                codon   = values.get('codon_start', ['1'])[0]
+                phase   = int(codon) - 1 if codon.isdigit() else 0
+
+            for start, end, strand in parse_location(loc):
+                if start > end:     # Across origin of a circular sequence
+                    start, end  = end, start
+
+                self.handle.write('%s\tGenBank\t%s\t%d\t%d\t.\t%s\t%s\t%s\n'
+                    % (seq_id, ftype, start, end, '+' if strand > 0 else '-',
+                       '.' if phase is None else phase, attrs))
+
+                if phase is not None:   # Phase of the next part
+                    phase   = (phase - (end - start + 1)) % 3
+
+    def sequence(self, seq):
+        pass
+
+    def end(self, rec):
+        pass
@@ -0,0 +1,330 @@
+#!/usr/bin/python3
+
+'''
+NAME
+
+    lencache.py - Persistent cache of sequence lengths for seqlen.py
+
+SYNOPSIS
+
+    from lencache import LenCache
+
+    cache   = LenCache(fin, fmt, cache_dir=None)
+    recs    = cache.load()          # None if missing or out of date
+
+    if recs is None:
+        recs    = cache.record(seq_lengths(fin, fmt))
+
+DESCRIPTION
+
+    The cache is a compact binary file, by default a sidecar
+    '<seq file>.slc' next to the sequence file, or a file named by the hash
+    of the absolute path in a shared cache directory.
+
+    File format:
+
+============================================================
+'SLC1'                          <-  Magic
+<Q size><q mtime_ns>            <-  Size and mtime of the sequence file
+<H len><format>                 <-  Sequence format, e.g. 'fasta'
+<H len><digest>                 <-  BLAKE2b digest of file content,
+                                    empty if not required
+zlib stream of lines            <-  '<seq id>\\t<length>\\n' per record
+============================================================
+
+    A cache is used only if path, size, mtime and format all match, the
+    content digest too if required, and the zlib stream is complete.
+    Otherwise, e.g. a truncated or corrupt cache, it is rebuilt by the next
+    full scan, so invalidation is automatic.
+
+    In a shared cache directory the total size is bounded. Least recently
+    used files are evicted first, and a cache hit touches the file mtime.
+    The file just written is never evicted, even if it is larger than the
+    bound alone.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+
+'''
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import zlib
+
+MAGIC       = b'SLC1'
+SUFFIX      = '.slc'
+
+# Size of blocks read for hashing and decompressing
+BLOCK_SIZE  = 1 << 20
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def file_digest(fin):
+    "BLAKE2b digest of file content"
+
+    h   = hashlib.blake2b(digest_size=20)
+
+    with open(fin, 'rb') as fh:
+        for block in iter(lambda: fh.read(BLOCK_SIZE), b''):
+            h.update(block)
+
+    return h.digest()
+
+#===========================================================
+
+def parse_size(size):
+    "Parse a size string with optional suffix K, M or G, into bytes"
+
+    units   = {'K' : 1 << 10, 'M' : 1 << 20, 'G' : 1 << 30}
+    size    = size.strip().upper()
+
+    if size[-1:] in units:
+        return int(float(size[:-1]) * units[size[-1]])
+    else:
+        return int(size)
+
+#===========================================================
+
+def pack_str(s):
+    "A string or bytes prefixed by its length"
+
+    b   = s if isinstance(s, bytes) else s.encode()
+
+    return struct.pack('<H', len(b)) + b
+
+#===========================================================
+
+def unpack_str(fh):
+    "Read a string prefixed by its length"
+
+    n,  = struct.unpack('<H', fh.read(2))
+
+    return fh.read(n)
+
+#===========================================================
+
+def complete_stream(fh):
+    """
+    Desc:
+        Whether the rest of a file is one complete zlib stream, checked by
+        its Adler-32, without keeping decompressed data.
+    Args:
+        fh      - A file handle at the start of the stream
+    Ret:
+        True or False. Raise zlib.error of a corrupt stream.
+    """
+
+    z   = zlib.decompressobj()
+
+    for block in iter(lambda: fh.read(BLOCK_SIZE), b''):
+        z.decompress(block)
+
+    return z.eof and not z.unused_data
+
+#===========================================================
+
+def evict(cache_dir, max_size, keep=None):
+    """
+    Desc:
+        Remove least recently used cache files until total size <= max_size.
+    Args:
+        cache_dir   - Shared cache directory
+        max_size    - Max total size in bytes
+        keep        - A cache file never removed, e.g. the one just
+                      written, even if it is larger than max_size alone.
+                      Default None
+    """
+
+    files   = []
+
+    for name in os.listdir(cache_dir):
+        if name.endswith(SUFFIX):
+            path    = os.path.join(cache_dir, name)
+
+            try:
+                st  = os.stat(path)
+            except OSError:     # Removed by another process
+                continue
+
+            files.append((st.st_mtime, st.st_size, path))
+
+    total   = sum(f[1] for f in files)
+
+    for _, size, path in sorted(files):
+        if total <= max_size:
+            break
+
+        if path == keep:
+            continue
+
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+        total   -= size
+
+#===========================================================
+#
+#                   Classes
+#
+#===========================================================
+
+class LenCache:
+    """
+    Desc:
+        Length cache of a sequence file.
+    Args:
+        fin         - Sequence file
+        fmt         - Sequence format
+        cache_dir   - Shared cache directory. Default None, a sidecar file
+        max_size    - Max total size in bytes of the cache directory
+        use_hash    - Also validate cache by a digest of file content
+    """
+
+    def __init__(self, fin, fmt, cache_dir=None, max_size=1 << 30,
+                 use_hash=False):
+        self.fin        = os.path.abspath(fin)
+        self.fmt        = fmt
+        self.cache_dir  = cache_dir
+        self.max_size   = max_size
+        self.use_hash   = use_hash
+
+        if cache_dir:
+            key     = hashlib.sha1((self.fin + '\0' + fmt).encode())
+            self.path   = os.path.join(cache_dir, key.hexdigest() + SUFFIX)
+        else:
+            self.path   = self.fin + SUFFIX
+
+    def _stat(self):
+        "Size and mtime of the sequence file"
+
+        st  = os.stat(self.fin)
+
+        return st.st_size, st.st_mtime_ns
+
+    def load(self):
+        """
+        Desc:
+            Read cached records, if the cache is up to date.
+        Ret:
+            A generator of (seq id, length, None, None, None) tuples, or
+            None if there is no valid cache.
+        """
+
+        try:
+            fh  = open(self.path, 'rb')
+        except OSError:
+            return None
+
+        # A truncated or corrupt cache is rebuilt
+        try:
+            with fh:
+                if fh.read(len(MAGIC)) != MAGIC:
+                    return None
+
+                stat    = struct.unpack('<Qq', fh.read(16))
+                fmt     = unpack_str(fh).decode()
+                digest  = unpack_str(fh)
+
+                if stat != self._stat() or fmt != self.fmt \
+                    or not complete_stream(fh):
+                    return None
+        except (struct.error, zlib.error, ValueError):
+            return None
+
+        if self.use_hash and digest != file_digest(self.fin):
+            return None
+
+        if self.cache_dir:  # Mark as recently used
+            os.utime(self.path)
+
+        return self._read()
+
+    def _read(self):
+        "Records in the zlib stream of the cache file"
+
+        with open(self.path, 'rb') as fh:
+            fh.seek(len(MAGIC) + 16)
+            unpack_str(fh)
+            unpack_str(fh)
+
+            z       = zlib.decompressobj()
+            rest    = b''
+
+            for block in iter(lambda: fh.read(BLOCK_SIZE), b''):
+                lines   = (rest + z.decompress(block)).split(b'\n')
+                rest    = lines.pop()
+
+                for line in lines:
+                    seq_id, seq_len = line.rsplit(b'\t', 1)
+
+                    yield seq_id.decode(), int(seq_len), None, None, None
+
+            # Checked by load(), unless the cache was replaced since
+            if not z.eof or rest:
+                raise IOError("Truncated length cache '%s'." % self.path)
+
+    def record(self, recs):
+        """
+        Desc:
+            Pass records through and write them into the cache, once all
+            records have been read.
+        Args:
+            recs    - An iterable of (seq id, length, ...) tuples
+        Ret:
+            A generator of the same tuples.
+        """
+
+        stat    = self._stat()
+        digest  = file_digest(self.fin) if self.use_hash else b''
+        out     = os.path.dirname(self.path) or '.'
+
+        try:
+            fh  = tempfile.NamedTemporaryFile(dir=out, suffix=SUFFIX + '.tmp',
+                                              delete=False)
+        except OSError as err:
+            print("[WARNING] Can not write length cache: %s" % err,
+                  file=sys.stderr)
+            yield from recs
+            return
+
+        try:
+            z   = zlib.compressobj()
+            fh.write(MAGIC + struct.pack('<Qq', *stat) + pack_str(self.fmt)
+                     + pack_str(digest))
+
+            for rec in recs:
+                fh.write(z.compress(b'%s\t%d\n' % (rec[0].encode(), rec[1])))
+
+                yield rec
+
+            fh.write(z.flush())
+            fh.close()
+
+            # Sequence file changed while scanning, do not cache
+            if self._stat() != stat:
+                os.remove(fh.name)
+                return
+
+            os.chmod(fh.name, 0o644)    # Not 0600 of a temporary file
+            os.replace(fh.name, self.path)
+        except BaseException:
+            fh.close()
+            os.remove(fh.name)
+            raise
+
+        if self.cache_dir:
+            evict(self.cache_dir, self.max_size, self.path)
@@ -0,0 +1,261 @@
+#!/usr/bin/python3
+
+'''
+NAME
+
+    manifest.py - Manifest of per record content hashes for incremental
+                  re-conversion
+
+SYNOPSIS
+
+    from manifest import Manifest
+
+    man     = Manifest('out.embl.manifest', ['out.embl'], settings='embl')
+
+    for key, status in man.update(records, convert):
+        print(key, status)
+
+    print(man.counts, man.removed)
+
+DESCRIPTION
+
+    A converter of flat files, e.g. 'gbk2embl.py', writes the output of
+    each input record as a contiguous byte range. The manifest records, for
+    each record key, e.g. 'accession.version', a BLAKE2b digest of the
+    input record text and the byte ranges of its output in each output file.
+
+    In the next run, the output of a record with the same key and digest is
+    copied from the old output files byte for byte, and only new or changed
+    records are converted. Records in the manifest but not in the input any
+    more are dropped. New outputs are written into temporary files, and
+    replace old ones at the end, together with the manifest.
+
+    File format, tab delimited:
+
+============================================================
+#manifest   1
+#settings   <converter settings>
+#output     <file name>     <size>  <mtime ns>  <-  One per output file
+<key>       <digest>        <offset>:<length> ...
+============================================================
+
+    A manifest is ignored, and all records are converted, if settings or
+    output files differ from the current run, or if the size or the
+    modification time in nanoseconds of any output file has changed since,
+    the same check as the length cache of 'seqlen.py'.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+    0.0.2   2026-10-18  Check modification time of output files.
+
+'''
+
+import hashlib
+import os
+import tempfile
+
+from collections import Counter
+
+MANIFEST_VERSION    = '2'
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def digest(text):
+    "BLAKE2b digest of record text, as a hex string"
+
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+#===========================================================
+#
+#                   Classes
+#
+#===========================================================
+
+class Manifest:
+    """
+    Desc:
+        Manifest of a set of output files.
+    Args:
+        fman        - Manifest file
+        fouts       - A list of output files
+        settings    - A string of converter settings, which change output
+    """
+
+    def __init__(self, fman, fouts, settings=''):
+        self.fman       = fman
+        self.fouts      = list(fouts)
+        self.settings   = settings
+        self.entries    = {}        # key -> (digest, [(offset, length)])
+        self.counts     = Counter() # 'added', 'changed' or 'unchanged'
+        self.removed    = []
+
+        self.valid      = self.load()
+
+    def load(self):
+        """
+        Desc:
+            Read the manifest, if it matches settings, and names, sizes
+            and modification times of output files.
+        Ret:
+            True if the manifest is valid.
+        """
+
+        try:
+            fh  = open(self.fman, 'r')
+        except OSError:
+            return False
+
+        outputs = []
+        entries = {}
+
+        with fh:
+            for line in fh:
+                items   = line.rstrip('\n').split('\t')
+
+                if items[0] == '#manifest':
+                    if items[1] != MANIFEST_VERSION:
+                        return False
+                elif items[0] == '#settings':
+                    if items[1] != self.settings:
+                        return False
+                elif items[0] == '#output':
+                    outputs.append((items[1], int(items[2]),
+                                    int(items[3])))
+                else:
+                    ranges  = [tuple(map(int, r.split(':')))
+                               for r in items[2:]]
+                    entries[items[0]]   = (items[1], ranges)
+
+        names   = [os.path.basename(fout) for fout in self.fouts]
+
+        if [name for name, *_ in outputs] != names:
+            return False
+
+        for fout, (_, size, mtime) in zip(self.fouts, outputs):
+            try:
+                st  = os.stat(fout)
+            except OSError:
+                return False
+
+            if st.st_size != size or st.st_mtime_ns != mtime:
+                return False
+
+        self.entries    = entries
+
+        return True
+
+    def update(self, records, convert, heads=None):
+        """
+        Desc:
+            Write outputs of records, by copying unchanged ones from old
+            outputs and converting the others, then the new manifest.
+        Args:
+            records - An iterable of (key, record text)
+            convert - A function of record text -> a list of output text,
+                      one for each output file
+            heads   - A list of leading text of each output file, e.g. a
+                      version line. Default None
+        Ret:
+            A generator of (key, status), where status is 'added',
+            'changed' or 'unchanged'.
+        """
+
+        olds    = [open(fout, 'rb') if self.valid else None
+                   for fout in self.fouts]
+        news    = [tempfile.NamedTemporaryFile(
+                       dir=os.path.dirname(fout) or '.',
+                       suffix='.tmp', delete=False)
+                   for fout in self.fouts]
+        entries = {}
+
+        try:
+            for fh_new, head in zip(news, heads or []):
+                fh_new.write(head.encode())
+
+            for key, text in records:
+                dgst    = digest(text)
+                old     = self.entries.get(key)
+                ranges  = []
+
+                if old and old[0] == dgst:
+                    status  = 'unchanged'
+
+                    for fh_old, fh_new, (offset, length) in zip(olds, news,
+                                                                old[1]):
+                        ranges.append((fh_new.tell(), length))
+                        fh_old.seek(offset)
+                        fh_new.write(fh_old.read(length))
+                else:
+                    status  = 'changed' if old else 'added'
+
+                    for fh_new, out in zip(news, convert(text)):
+                        out = out.encode()
+                        ranges.append((fh_new.tell(), len(out)))
+                        fh_new.write(out)
+
+                entries[key]    = (dgst, ranges)
+                self.counts[status] += 1
+
+                yield key, status
+
+            for fh in news:
+                fh.close()
+
+            for fh, fout in zip(news, self.fouts):
+                os.chmod(fh.name, 0o644)    # Not 0600 of a temporary file
+                os.replace(fh.name, fout)
+        except BaseException:
+            for fh in news:
+                fh.close()
+
+                if os.path.exists(fh.name):
+                    os.remove(fh.name)
+
+            raise
+        finally:
+            for fh in olds:
+                if fh is not None:
+                    fh.close()
+
+        self.removed    = [key for key in self.entries if key not in entries]
+        self.entries    = entries
+        self.valid      = True
+
+        self.write()
+
+    def write(self):
+        "Write the manifest, by a temporary file"
+
+        with tempfile.NamedTemporaryFile('w', delete=False, suffix='.tmp',
+                dir=os.path.dirname(self.fman) or '.') as fh:
+            fh.write('#manifest\t%s\n' % MANIFEST_VERSION)
+            fh.write('#settings\t%s\n' % self.settings)
+
+            for fout in self.fouts:
+                st  = os.stat(fout)
+                fh.write('#output\t%s\t%d\t%d\n' % (os.path.basename(fout),
+                                                    st.st_size,
+                                                    st.st_mtime_ns))
+
+            for key, (dgst, ranges) in self.entries.items():
+                fh.write('%s\t%s\t%s\n' % (key, dgst,
+                    '\t'.join('%d:%d' % r for r in ranges)))
+
+        os.chmod(fh.name, 0o644)
+        os.replace(fh.name, self.fman)
+
+    def summary(self):
+        "A line of record counts"
+
+        return "Records added %d, changed %d, unchanged %d, removed %d." \
+            % (self.counts['added'], self.counts['changed'],
+               self.counts['unchanged'], len(self.removed))
@@ -7,59 +7,833 @@ NAME
 
 SYNOPSIS
 
+    seqlen.py [--jobs N] [--fai] [--stats [--bin-size N]]
+              [--cache] [--cache-dir DIR [--cache-max-size SIZE]]
+              [--cache-hash] <seq file> [<format>]
+
+    seqlen.py [-f <format>] [-i <seq file> ...] [-g <glob> ...]
+              [--fofn <file of names>] [--jobs N] [options]
+
 DESCRIPTION
 
+    Output the ID and length of each sequence as a tab-delimited table.
+
+    For FASTA format the file is memory-mapped and scanned for header and
+    newline bytes directly, so no sequence strings are ever built. Other
+    formats are parsed by Bio.SeqIO.
+
+    With '--jobs N' a FASTA file is split into byte ranges, each range is
+    scanned in a process pool and the results are merged back in file
+    order. Residues of a record spanning several ranges are counted by
+    each range and summed, so the output is identical to a serial run and
+    the work scales with file size rather than record count.
+
+    With '--fai' a samtools compatible '<seq file>.fai' index is written as
+    a side effect of the same scan. The columns are name, length, offset of
+    the first residue, residues per line and bytes per line. See 'faidx.py'
+    for random access to records and subranges by this index. As samtools,
+    a record of lines of different lengths, other than the last one, is an
+    error, since it can not be read by seeks.
+
+    FASTQ format is read as 4-line records without decoding qualities.
+
+    Input compressed by gzip, bgzip, bz2, xz or zstd is detected by magic
+    bytes and decompressed on the fly by 'xopen.py', BGZF blocks by multiple
+    threads. A compressed FASTA file cannot be memory-mapped, so it is
+    scanned as a stream of blocks instead, and options '--jobs' and '--fai'
+    do not apply to it. Use '-' as <seq file> to read from STDIN.
+
+    With '--cache' the lengths are saved in a binary sidecar file
+    '<seq file>.slc', or in a shared directory by '--cache-dir', and later
+    runs on the unchanged file are answered from it without reading any
+    sequence data. The cache is keyed on path, size and mtime, plus a
+    content digest with '--cache-hash', and is rebuilt automatically when
+    the file changes. See 'lencache.py'.
+
+    Batch mode is enabled by '--inputs', '--glob' or '--fofn'. Files are
+    processed by a pool of '--jobs' worker processes, so the interpreter
+    and Biopython start only once. Results are output as each file is done,
+    in one merged table with a leading column '#File'. Lines of a file are
+    spooled by the worker into a temporary file and copied to the output
+    by the main process, so memory does not grow with the number of
+    sequences. With '--stats' the summary of all files is output.
+
+    With '--stats' the summary of all sequences is output instead of each
+    sequence: number of sequences, total bases, min/max/mean length, N50,
+    N90 and a histogram of lengths. Only a count per distinct length is
+    kept, so memory does not grow with the number of sequences.
+
 AUTHORS
 
     zeroliu-at-gmail-dot-com
 
 VERSION
-    
+
     0.0.1   2016-10-14
     0.0.2   2019-11-16  Now output only 1 line heading information
     0.0.3   2024-09-26  Fix bugs for Python 3.11.
+    0.0.4   2026-10-18  mmap based fast path for FASTA files.
+    0.0.5   2026-10-18  Add option '--jobs' for multi-core scanning.
+    0.0.6   2026-10-18  Add option '--fai' to write a faidx index.
+    0.0.7   2026-10-18  Fast path for FASTQ files. Add option '--stats'.
+    0.0.8   2026-10-18  Read compressed files transparently.
+    0.0.9   2026-10-18  Add persistent length cache.
+    0.1.0   2026-10-18  Add batch mode for many files.
 
 '''
 
-from Bio import SeqIO
 import argparse
+import glob
+import io
+import mmap
+import multiprocessing
 import os
+import shutil
 import sys
+import tempfile
+
+from collections import Counter
+
+from lencache import LenCache, parse_size
+from xopen import compression, open_input
+
+# Size of each slice of sequence bytes counted at one time
+CHUNK_SIZE  = 1 << 24
+
+# Approximate size of each byte range scanned by one job
+RANGE_SIZE  = 1 << 26
+
+# Non-residue bytes within sequence lines, dropped by Bio.SeqIO as well
+WHITESPACE  = b' \t\r\n'
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def next_header(buf, pos):
+    """
+    Desc:
+        Find the next FASTA header line at or after given position.
+    Args:
+        buf     - A bytes-like object, e.g. mmap
+        pos     - Start position
+    Ret:
+        Offset of the '>' character, or -1 if not found.
+    """
+
+    if pos == 0 and buf[0:1] == b'>':
+        return 0
+
+    idx = buf.find(b'\n>', max(pos - 1, 0))
+
+    return idx + 1 if idx != -1 else -1
+
+#===========================================================
+
+def check_start(head, fin):
+    "Exit if a FASTA file does not start with a header, as Bio.SeqIO does"
+
+    if head and head[:1] != b'>':
+        sys.exit("[ERROR] Text before the first '>' header of FASTA file "
+                 "'%s'." % fin)
+
+#===========================================================
+
+def count_residues(buf, start, end):
+    "Count sequence letters in buf[start:end], skipping whitespaces"
+
+    num = 0
+
+    for pos in range(start, end, CHUNK_SIZE):
+        chunk   = buf[pos:min(pos + CHUNK_SIZE, end)]
+        num     += len(chunk.translate(None, WHITESPACE))
+
+    return num
+
+#===========================================================
+
+def first_line(buf, start, end):
+    "No. of residues and bytes of the first sequence line in buf[start:end]"
+
+    if start >= end:
+        return 0, 0
+
+    eol = buf.find(b'\n', start, end)
+
+    if eol == -1:
+        return end - start, end - start
+
+    line_bases  = eol - start
+
+    if buf[eol - 1:eol] == b'\r':
+        line_bases  -= 1
+
+    return line_bases, eol + 1 - start
+
+#===========================================================
+
+def scan_fasta(buf, start=0, end=None, clip=False):
+    """
+    Desc:
+        Scan FASTA records whose header starts within buf[start:end].
+    Args:
+        buf     - A bytes-like object, e.g. mmap
+        start   - Start offset. Default 0
+        end     - End offset. Default the end of buf
+        clip    - Count residues before 'end' only. Default False
+    Ret:
+        A generator of (seq id, length, offset, line bases, line bytes)
+        tuples, the same as the columns of a '.fai' index.
+    """
+
+    size    = len(buf)
+
+    if end is None:
+        end = size
+
+    limit   = end if clip else size
+
+    hdr = next_header(buf, start)
+
+    while hdr != -1 and hdr < end:
+        eol = buf.find(b'\n', hdr)
+
+        if eol == -1:
+            eol = size
+
+        nxt = next_header(buf, eol + 1)
+
+        words   = buf[hdr + 1:eol].split(None, 1)
+        seq_id  = words[0].decode() if words else ''
+
+        seq_end = min(nxt, limit) if nxt != -1 else limit
+
+        yield (seq_id, count_residues(buf, eol + 1, seq_end), eol + 1) \
+            + first_line(buf, eol + 1, nxt if nxt != -1 else size)
+
+        hdr = nxt
+
+#===========================================================
+
+def scan_fasta_stream(fh, fin='-'):
+    """
+    Desc:
+        Scan FASTA records from a stream block by block, for compressed
+        input or STDIN which can not be memory-mapped.
+    Args:
+        fh      - A file handle opened in binary mode
+        fin     - File name of error messages. Default '-'
+    Ret:
+        A generator of (seq id, length, None, None, None) tuples.
+    """
+
+    seq_id      = None  # ID of current record, None before the first one
+    title       = None  # Header line being read, which may span blocks
+    num         = 0     # No. of residues of current record
+    at_bol      = True  # Whether a block starts at the beginning of a line
+    first       = True
+
+    while True:
+        block   = fh.read(CHUNK_SIZE)
+
+        if not block:
+            break
+
+        if first:
+            check_start(block, fin)
+            first   = False
+
+        pos     = 0
+        size    = len(block)
+
+        while pos < size:
+            if title is not None:   # Within a header line
+                eol = block.find(b'\n', pos)
+
+                if eol == -1:
+                    title   += block[pos:]
+                    break
+
+                words   = (title + block[pos:eol]).split(None, 1)
+                seq_id  = words[0].decode() if words else ''
+                title   = None
+                pos     = eol + 1
+                at_bol  = True
+
+                continue
+
+            if at_bol and block[pos:pos + 1] == b'>':
+                hdr = pos
+            else:
+                idx = block.find(b'\n>', pos)
+                hdr = idx + 1 if idx != -1 else -1
+
+            if seq_id is not None:
+                seq_end = hdr if hdr != -1 else size
+                num     += len(block[pos:seq_end].translate(None, WHITESPACE))
+
+            if hdr == -1:
+                at_bol  = block.endswith(b'\n')
+                break
+
+            if seq_id is not None:
+                yield seq_id, num, None, None, None
+
+            seq_id  = None
+            title   = b''
+            num     = 0
+            pos     = hdr + 1
+
+    if title is not None:   # Header line without a tailing newline
+        words   = title.split(None, 1)
+        seq_id  = words[0].decode() if words else ''
+
+    if seq_id is not None:
+        yield seq_id, num, None, None, None
+
+#===========================================================
+
+def fasta_lengths(fin):
+    "Sequence lengths of a FASTA file by mmap, or by stream if compressed"
+
+    if fin == '-' or compression(fin):
+        with open_input(fin) as fh_in:
+            yield from scan_fasta_stream(fh_in, fin)
+
+        return
+
+    with open(fin, 'rb') as fh_in:
+        if os.fstat(fh_in.fileno()).st_size == 0:   # mmap fails on empty file
+            return
+
+        with mmap.mmap(fh_in.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            check_start(mm[:1], fin)
+
+            yield from scan_fasta(mm)
+
+#===========================================================
+
+def scan_range(task):
+    """
+    Desc:
+        Scan a byte range of a FASTA file, for a worker process.
+    Args:
+        task    - A tuple of (file name, start offset, end offset)
+    Ret:
+        lead    - No. of residues before the first header of the range,
+                  which belong to the record of a previous range
+        recs    - A list of scan_fasta() tuples. Lengths are counted up
+                  to the end offset only.
+    """
+
+    fin, start, end = task
+
+    with open(fin, 'rb') as fh_in, \
+        mmap.mmap(fh_in.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Skip the rest of a header line which starts in a previous range
+        line_start  = mm.rfind(b'\n', 0, start) + 1
+
+        if start > 0 and mm[line_start:line_start + 1] == b'>':
+            eol         = mm.find(b'\n', start)
+            seq_start   = eol + 1 if eol != -1 else end
+        else:
+            seq_start   = start
+
+        hdr     = next_header(mm, start)
+        lead    = count_residues(mm, seq_start,
+                                 hdr if hdr != -1 and hdr < end else end)
+
+        return lead, list(scan_fasta(mm, start, end, clip=True))
+
+#===========================================================
+
+def fasta_lengths_mp(fin, jobs):
+    "Sequence lengths of a FASTA file by a pool of 'jobs' processes"
+
+    size    = os.path.getsize(fin)
+
+    if size == 0:
+        return
+
+    with open(fin, 'rb') as fh_in:
+        check_start(fh_in.read(1), fin)
+
+    # Enough ranges to keep all workers busy, but no larger than RANGE_SIZE
+    num_ranges  = max(jobs * 4, -(-size // RANGE_SIZE))
+    range_size  = -(-size // num_ranges)
+
+    tasks   = [(fin, start, min(start + range_size, size))
+                for start in range(0, size, range_size)]
+
+    # A record may span many ranges, so hold the last record of ranges
+    # merged so far, until the range holding its next header is met
+    last    = None
+
+    with multiprocessing.Pool(jobs) as pool:
+        for lead, recs in pool.imap(scan_range, tasks):
+            if last is not None:
+                last    = (last[0], last[1] + lead) + last[2:]
+
+            if recs:
+                if last is not None:
+                    yield last
+
+                yield from recs[:-1]
+
+                last    = recs[-1]
+
+    if last is not None:
+        yield last
+
+#===========================================================
+
+def fastq_lengths(fin):
+    """
+    Desc:
+        Sequence lengths of a FASTQ file of 4-line records. Quality lines
+        are not decoded, but records are checked for '@' and '+' markers,
+        quality length and a truncated last record, as Bio.SeqIO does.
+    Args:
+        fin     - Input FASTQ file, or '-' for STDIN
+    Ret:
+        A generator of (seq id, length, None, None, None) tuples.
+    """
+
+    with open_input(fin) as fh_in:
+        lines   = iter(fh_in)
+
+        for title in lines:
+            if not title.strip():   # Blank lines, skipped by Bio.SeqIO too
+                continue
+
+            seq, plus, qual = next(lines, None), next(lines, None), \
+                next(lines, None)
+
+            if qual is None:
+                sys.exit("[ERROR] Truncated FASTQ record at end of file: "
+                         "'%s'" % title.decode().rstrip())
+
+            if title[:1] != b'@' or plus[:1] != b'+':
+                sys.exit("[ERROR] Not a FASTQ file of 4-line records: "
+                         "'%s'" % title.decode().rstrip())
+
+            seq     = seq.rstrip()
+
+            if len(qual.rstrip()) != len(seq):
+                sys.exit("[ERROR] Lengths of sequence and quality differ: "
+                         "'%s'" % title.decode().rstrip())
+
+            words   = title[1:].split(None, 1)
+            seq_id  = words[0].decode() if words else ''
+
+            yield seq_id, len(seq), None, None, None
+
+#===========================================================
+
+def seqio_lengths(fin, fmt):
+    "Sequence lengths parsed by Bio.SeqIO"
+
+    # Imported here, the FASTA fast path does not need Biopython at all
+    from Bio import SeqIO
+
+    # fh_in   = open(fin, "rU")
+    # For Python 3.11 and later
+    with io.TextIOWrapper(open_input(fin)) as fh_in:
+        for seq_rec in SeqIO.parse(fh_in, fmt):
+            yield seq_rec.id, len(seq_rec), None, None, None
+
+#===========================================================
+
+def seq_lengths(fin, fmt='fasta', jobs=1):
+    """
+    Desc:
+        Dispatch to the fast FASTA scanner or Bio.SeqIO.
+    Args:
+        fin     - Input sequence file
+        fmt     - Sequence file format. Default 'fasta'
+        jobs    - No. of processes for FASTA format. Default 1
+    Ret:
+        A generator of (seq id, length, offset, line bases, line bytes)
+        tuples. The last 3 items are None, unless scanned by mmap.
+    """
+
+    # Compressed FASTA file is scanned as a stream by a single process
+    mappable    = fin != '-' and not compression(fin)
+
+    if fmt == 'fasta' and jobs > 1 and mappable:
+        return fasta_lengths_mp(fin, jobs)
+    elif fmt == 'fasta':
+        return fasta_lengths(fin)
+    elif fmt.startswith('fastq'):
+        return fastq_lengths(fin)
+    else:
+        return seqio_lengths(fin, fmt)
+
+#===========================================================
+
+def even_lines(buf, length, offset, line_bases, line_bytes):
+    """
+    Desc:
+        Whether all sequence lines of a record, but the last one, are of the
+        same length, as a '.fai' index requires.
+    Args:
+        buf         - A bytes-like object of the FASTA file, e.g. mmap
+        length      - No. of residues
+        offset      - Offset of the first residue
+        line_bases  - Residues of the first line
+        line_bytes  - Bytes of the first line
+    Ret:
+        True or False.
+    """
+
+    if line_bases == 0:     # A blank first line
+        return length == 0
+
+    if length <= line_bases:
+        return True
+
+    full    = length // line_bases  # Full lines
+    rest    = length % line_bases
+    end     = offset + full * line_bytes
+
+    # Each full line ends at the same column, with no other line break
+    if buf[offset + line_bytes - 1:end:line_bytes].count(b'\n') != full \
+        or buf[offset:end].count(b'\n') != full:
+        return False
+
+    # The last partial line, if any, holds the rest of residues
+    last    = buf[end:end + rest]
+
+    return b'\n' not in last and b'\r' not in last
+
+#===========================================================
+
+def write_fai(recs, ffai, fin=None):
+    """
+    Desc:
+        Write the '.fai' index of records passing through, to file 'ffai'.
+        The index is replaced only when all records have been read.
+    Args:
+        recs    - An iterable of scan_fasta() tuples
+        ffai    - Output '.fai' file
+        fin     - The FASTA file, to check line lengths of each record as
+                  samtools does. Default None, not checked
+    Ret:
+        A generator of the same tuples.
+    """
+
+    fh_in   = open(fin, 'rb') if fin else None
+    mm      = None
+
+    try:
+        with open(ffai + '.tmp', 'w') as fh_fai:
+            for rec in recs:
+                if fh_in and rec[1] > rec[3]:   # More than one line
+                    mm  = mm or mmap.mmap(fh_in.fileno(), 0,
+                                          access=mmap.ACCESS_READ)
+
+                    if not even_lines(mm, *rec[1:5]):
+                        sys.exit("[ERROR] Different line length in "
+                                 "sequence '%s'." % rec[0])
+
+                fh_fai.write('%s\t%d\t%d\t%d\t%d\n' % rec)
+
+                yield rec
+
+        os.replace(ffai + '.tmp', ffai)
+    except BaseException:
+        if os.path.exists(ffai + '.tmp'):
+            os.remove(ffai + '.tmp')
+
+        raise
+    finally:
+        if mm is not None:
+            mm.close()
+
+        if fh_in:
+            fh_in.close()
+
+#===========================================================
+
+def len_stats(counts, bin_size=100):
+    """
+    Desc:
+        Summary statistics of sequence lengths.
+    Args:
+        counts      - A Counter of length -> No. of sequences
+        bin_size    - Bin size of the length histogram. Default 100
+    Ret:
+        stats   - A list of (name, value) tuples
+        hist    - A list of (bin start, bin end, count) tuples
+    """
+
+    num_seqs    = sum(counts.values())
+    num_bases   = sum(l * n for l, n in counts.items())
+
+    stats   = [('Sequences', num_seqs), ('Bases', num_bases)]
+
+    if num_seqs == 0:
+        return stats, []
+
+    stats   += [('Min', min(counts)), ('Max', max(counts)),
+                ('Mean', '%.2f' % (num_bases / num_seqs))]
+
+    # N50/N90: Length L that sequences >= L hold 50%/90% of all bases
+    cum_bases   = 0
+    nx          = {}
+
+    for l in sorted(counts, reverse=True):
+        cum_bases   += l * counts[l]
+
+        for x in (50, 90):
+            if x not in nx and cum_bases * 100 >= num_bases * x:
+                nx[x]   = l
+
+    stats   += [('N50', nx[50]), ('N90', nx[90])]
+
+    bins    = Counter()
+
+    for l, n in counts.items():
+        bins[l // bin_size]   += n
+
+    hist    = [(b * bin_size, (b + 1) * bin_size - 1, bins[b])
+                for b in sorted(bins)]
+
+    return stats, hist
+
+#===========================================================
+
+def file_records(fin, fmt, args, jobs=1):
+    """
+    Desc:
+        Records of a sequence file, through the length cache and the
+        faidx index writer if required by the command line options.
+    Args:
+        fin     - Input sequence file
+        fmt     - Sequence file format
+        args    - Command line options
+        jobs    - No. of processes for FASTA format. Default 1
+    Ret:
+        A generator of seq_lengths() tuples.
+    """
+
+    recs    = None
+    cache   = None
+
+    # Index needs a full scan, and STDIN can not be cached
+    if (args.cache or args.cache_dir) and not args.fai and fin != '-':
+        if args.cache_dir:
+            os.makedirs(args.cache_dir, exist_ok=True)
+
+        cache   = LenCache(fin, fmt, args.cache_dir,
+                           parse_size(args.cache_max_size), args.cache_hash)
+        recs    = cache.load()
+
+    if recs is None:
+        recs    = seq_lengths(fin, fmt, jobs)
+
+        if cache is not None:
+            recs    = cache.record(recs)
+
+    if args.fai:
+        if fmt != 'fasta':
+            sys.exit("[ERROR] Option '--fai' works on FASTA format only.")
+
+        if fin == '-' or compression(fin):
+            sys.exit("[ERROR] Option '--fai' works on uncompressed file only.")
+
+        recs    = write_fai(recs, fin + '.fai', fin)
+
+    return recs
+
+#===========================================================
+
+def batch_inputs(args):
+    "Input files of batch mode, from arguments, globs and a file of names"
+
+    if args.fin:
+        yield args.fin
+
+    yield from args.inputs or []
+
+    for pattern in args.glob or []:
+        yield from sorted(glob.glob(pattern))
+
+    if args.fofn:
+        with open(args.fofn, 'r') as fh_fofn:
+            for line in fh_fofn:
+                line    = line.strip()
+
+                if line and not line.startswith('#'):
+                    yield line
+
+#===========================================================
+
+def batch_task(task):
+    """
+    Desc:
+        Process one file of batch mode, for a worker process.
+    Args:
+        task    - A tuple of (file name, format, command line options)
+    Ret:
+        fin     - Input file name
+        result  - Name of a temporary file of output lines of the file, to
+                  be removed by the caller, or a Counter of lengths for
+                  option '--stats'
+        error   - Error message, or None
+    """
+
+    fin, fmt, args  = task
+    fspool          = None
+
+    try:
+        recs    = file_records(fin, fmt, args)
+
+        if args.stats:
+            return fin, Counter(rec[1] for rec in recs), None
+
+        # Lines are spooled, so memory does not grow with the number of
+        # sequences of a file
+        with tempfile.NamedTemporaryFile('w', prefix='seqlen.',
+                                         suffix='.tmp', delete=False) as fh:
+            fspool  = fh.name
+
+            for rec in recs:
+                fh.write('%s\t%s\t%d\n' % (fin, rec[0], rec[1]))
+
+        return fin, fspool, None
+    except (Exception, SystemExit) as err:
+        if fspool is not None:
+            os.remove(fspool)
+
+        return fin, None, str(err)
+
+#===========================================================
+
+def print_stats(counts, bin_size):
+    "Output summary statistics of a Counter of lengths"
+
+    stats, hist = len_stats(counts, bin_size)
+
+    print("#Stat\tValue")
+
+    for name, value in stats:
+        print("%s\t%s" % (name, value))
+
+    print("#Length\tCount")
+
+    for bin_start, bin_end, num in hist:
+        print("%d-%d\t%d" % (bin_start, bin_end, num))
+
+#===========================================================
+#
+#                   Main
+#
+#===========================================================
+
+def main():
+    argParser   = argparse.ArgumentParser(
+        description="Display each sequence length.")
+    argParser.add_argument("fin", action="store", nargs="?",
+        help="Input sequence file.")
+    argParser.add_argument("fmt", action="store", nargs="?",
+        help="""Input sequence file format. Default 'fasta'.""")
+    argParser.add_argument("-f", "--format", action="store", dest="format",
+        help="Input sequence file format, for batch mode. Default 'fasta'.")
+    argParser.add_argument("-i", "--inputs", action="store", nargs="+",
+        help="More input sequence files. Batch mode.")
+    argParser.add_argument("-g", "--glob", action="append",
+        help="Glob pattern of input files, may be repeated. Batch mode.")
+    argParser.add_argument("--fofn", action="store",
+        help="File of input file names, one per line. Batch mode.")
+    argParser.add_argument("-j", "--jobs", action="store", type=int,
+        default=1,
+        help="Number of processes to scan a FASTA file, or to process "
+             "files in batch mode. Default 1.")
+    argParser.add_argument("--fai", action="store_true",
+        help="Also write faidx index '<seq file>.fai' of a FASTA file.")
+    argParser.add_argument("--stats", action="store_true",
+        help="Output summary statistics instead of each sequence length.")
+    argParser.add_argument("--bin-size", action="store", type=int,
+        default=100, dest="bin_size",
+        help="Bin size of the length histogram for '--stats'. Default 100.")
+    argParser.add_argument("--cache", action="store_true",
+        help="Use a persistent length cache '<seq file>.slc'.")
+    argParser.add_argument("--cache-dir", action="store", dest="cache_dir",
+        help="Use a shared length cache directory. Implies '--cache'.")
+    argParser.add_argument("--cache-max-size", action="store",
+        dest="cache_max_size", default="1G",
+        help="Max total size of '--cache-dir', e.g. 500M. Default 1G.")
+    argParser.add_argument("--cache-hash", action="store_true",
+        dest="cache_hash",
+        help="Also validate the cache by a digest of file content.")
+
+    args    = argParser.parse_args()
+
+    batch   = args.inputs or args.glob or args.fofn
+
+    if not args.fin and not batch:
+        sys.exit("[ERROR] No input sequence filename.")
+    else:
+        fin = args.fin
+
+    if args.format:
+        fmt = args.format
+    elif not args.fmt:
+        fmt = 'fasta'
+    else:
+        fmt = args.fmt
+
+    if args.jobs < 1:
+        sys.exit("[ERROR] Option '--jobs' must be a positive integer.")
+
+    if batch:
+        # Output results as soon as each file is done, in finishing order
+        tasks   = ((f, fmt, args) for f in batch_inputs(args))
+        counts  = Counter()
 
-argParser   = argparse.ArgumentParser(
-    description="Display each sequence length.")
-argParser.add_argument("fin", action="store",
-    help="Input sequence file.")
-argParser.add_argument("fmt", action="store", nargs="?",
-    help="""Input sequence file format. Default 'fasta'.""")
+        if not args.stats:
+            print("#File\tSeqID\tLength")
 
-args    = argParser.parse_args()
+        with multiprocessing.Pool(args.jobs) as pool:
+            for f, result, error in pool.imap_unordered(batch_task, tasks):
+                if error is not None:
+                    print("[ERROR] %s: %s" % (f, error), file=sys.stderr)
+                elif args.stats:
+                    counts.update(result)
+                else:
+                    try:
+                        with open(result, 'r') as fh_spool:
+                            shutil.copyfileobj(fh_spool, sys.stdout)
+                    finally:
+                        os.remove(result)
 
-if not args.fin:
-    sys.exit("[ERROR] No input sequence filename.")
-else:
-    fin = args.fin
+        if args.stats:
+            print_stats(counts, args.bin_size)
 
+        return
 
-if not args.fmt:
-    fmt = 'fasta'
-else:
-    fmt = args.fmt
+    if args.jobs > 1 and fmt != 'fasta':
+        print("[WARNING] Option '--jobs' works on FASTA format only.",
+              file=sys.stderr)
 
-# print("Input file:\t%s" % (fin))
-print("#SeqID\tLength")
-# print("====\t====")
+    recs    = file_records(fin, fmt, args, args.jobs)
 
-# fh_in   = open(fin, "rU")
-# For Python 3.11 and later
-fh_in   = open(fin, "r")
+    if args.stats:
+        print_stats(Counter(rec[1] for rec in recs), args.bin_size)
 
+        return
 
-for seq_rec in SeqIO.parse(fh_in, fmt):
-    print("%s\t%s" % (seq_rec.id, len(seq_rec)))
+    # print("Input file:\t%s" % (fin))
+    print("#SeqID\tLength")
+    # print("====\t====")
 
-fh_in.close()
+    for seq_id, seq_len, *_ in recs:
+        print("%s\t%s" % (seq_id, seq_len))
 
-#print('-' * 40)
+    #print('-' * 40)
 
-exit()
+if __name__ == '__main__':
+    main()
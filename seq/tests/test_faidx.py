@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+
+"""
+Name
+
+    test_faidx.py - Check '.fai' indexes of 'seqlen.py --fai' and regions
+                    of 'faidx.py'
+
+SYNOPSIS
+
+    python3 -m unittest discover -s seq/tests
+    python3 -m pytest seq/tests
+
+DESCRIPTION
+
+    Regions are read by seeks, which needs all sequence lines of a record,
+    but the last one, to be of the same length. Otherwise no index is
+    written, and the error is the same as samtools.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+HERE    = os.path.dirname(os.path.abspath(__file__))
+SEQ     = os.path.dirname(HERE)
+
+sys.path.insert(0, SEQ)
+
+from faidx import fetch, load_fai
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def run(script, *args):
+    "Run a script of 'seq/', return the completed process"
+
+    return subprocess.run([sys.executable, os.path.join(SEQ, script)]
+                          + list(args), stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, universal_newlines=True)
+
+#===========================================================
+#
+#                   Tests
+#
+#===========================================================
+
+class TestFai(unittest.TestCase):
+    "Index of even and uneven sequence lines"
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def fasta(self, text):
+        fin = os.path.join(self.tmpdir.name, 'test.fa')
+
+        with open(fin, 'w', newline='') as fh:
+            fh.write(text)
+
+        return fin
+
+    def test_even(self):
+        "Regions of lines of the same length, LF and CRLF"
+
+        fin     = self.fasta('>a desc\nACGTACGT\nTTGGCCAA\nAC\n>b\nAAAA\n'
+                             '>c\n>d\nAC\r\nGT\r\nA\r\n')
+        proc    = run('seqlen.py', '--fai', fin)
+
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
+        fai = load_fai(fin + '.fai', {'a', 'b', 'c', 'd'})
+
+        self.assertEqual(tuple(fai['a']), (18, 8, 8, 9))
+
+        with open(fin, 'rb') as fh:
+            self.assertEqual(fetch(fh, fai['a'], 4, 12), b'ACGTTTGG')
+            self.assertEqual(fetch(fh, fai['a']), b'ACGTACGTTTGGCCAAAC')
+            self.assertEqual(fetch(fh, fai['b'], 1, 3), b'AA')
+            self.assertEqual(fetch(fh, fai['c']), b'')
+            self.assertEqual(fetch(fh, fai['d'], 1, 4), b'CGT')
+
+    def test_uneven(self):
+        "A short inner line is an error, and no index is written"
+
+        for text in ('>a\nACGTACGT\nAC\nACGTACGT\n',
+                     '>a\nACGT\nACGTACGT\n',
+                     '>a\n\nACGT\n'):
+            fin     = self.fasta(text)
+
+            for script in ('seqlen.py', 'faidx.py'):
+                args    = ('--fai', fin) if script == 'seqlen.py' \
+                    else (fin, 'a:2-5')
+                proc    = run(script, *args)
+
+                self.assertNotEqual(proc.returncode, 0)
+                self.assertIn("Different line length in sequence 'a'",
+                              proc.stderr)
+                self.assertFalse(os.path.exists(fin + '.fai'))
+
+    def test_uneven_last(self):
+        "The last line may be shorter"
+
+        fin     = self.fasta('>a\nACGTACGT\nACGTACGT\nACG\n')
+        proc    = run('faidx.py', fin, 'a:7-18')
+
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout, '>a:7-18\nGTACGTACGTAC\n')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+#!/usr/bin/python3
+
+"""
+Name
+
+    test_gbk2embl.py - Compare the streaming translator of 'gbk2embl.py'
+                       with its '--strict' Bio.SeqIO engine
+
+SYNOPSIS
+
+    python3 -m unittest discover -s seq/tests
+    python3 -m pytest seq/tests
+
+DESCRIPTION
+
+    Each GenBank file of 'data/' is converted into EMBL by both engines.
+    Outputs must be the same line by line, except for these intended
+    differences of the streaming translator:
+
+        KW          - Keywords are written in EMBL form 'kw1; kw2.', and
+                      '.' as is, instead of one keyword a line
+        Qualifiers  - Bare qualifiers are kept as '/pseudo', not written
+                      as '/pseudo=""'
+        Wrapping    - Qualifier values are wrapped as in the GenBank file,
+                      not re-wrapped, so they are compared without
+                      whitespace
+        SQ          - Base counts are written for RNA records too, where
+                      Bio.SeqIO writes a bare 'SQ' line
+
+    Tests are skipped without Biopython.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+
+"""
+
+import io
+import os
+import re
+import sys
+import unittest
+
+HERE    = os.path.dirname(os.path.abspath(__file__))
+DATA    = os.path.join(HERE, 'data')
+
+sys.path.insert(0, os.path.dirname(HERE))
+
+from gbk2embl import convert_stream, convert_strict
+
+try:
+    import Bio
+except ImportError:
+    Bio = None
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def convert(fgb, strict):
+    "EMBL text and record IDs of a GenBank file, by one engine"
+
+    handles = {'embl' : io.StringIO()}
+
+    with open(fgb) as fh_gb:
+        if strict:
+            ids = list(convert_strict(fh_gb, handles))
+        else:
+            ids = list(convert_stream(fh_gb, handles))
+
+    return handles['embl'].getvalue(), ids
+
+#===========================================================
+
+def split_records(text):
+    "Lines of each EMBL record"
+
+    return [rec.strip('\n').split('\n')
+            for rec in text.split('//\n') if rec.strip()]
+
+#===========================================================
+
+def keywords(lines):
+    "Keywords of KW lines, of either form"
+
+    kws     = [line[5:].strip() for line in lines if line.startswith('KW')]
+    text    = ' '.join(kws)
+
+    if text.endswith('.'):      # EMBL form 'kw1; kw2.'
+        kws = text[:-1].split(';')
+
+    return [kw.strip() for kw in kws if kw.strip()]
+
+#===========================================================
+
+def features(lines):
+    "Feature keys, locations and qualifiers of FT lines, without wrapping"
+
+    items   = []
+
+    for line in lines:
+        if not line.startswith('FT'):
+            continue
+
+        if line[5] != ' ':                  # Feature key
+            items.append([line[5:21].strip(), line[21:]])
+        elif line[21] == '/':               # Qualifier
+            items.append(['', line[21:]])
+        else:                               # Continuation
+            items[-1][1]    += line[21:]
+
+    # Whitespace of wrapping, and bare qualifiers of '=""'
+    return [(key, re.sub(r'^(/\w+)=""$', r'\1', re.sub(r'\s+', '', value)))
+            for key, value in items]
+
+#===========================================================
+
+def sequence(lines):
+    "Sequence letters of a record"
+
+    start   = [i for i, line in enumerate(lines) if line.startswith('SQ')][0]
+
+    return ''.join(re.sub(r'[\s\d]', '', line) for line in lines[start + 1:])
+
+#===========================================================
+#
+#                   Tests
+#
+#===========================================================
+
+@unittest.skipIf(Bio is None, 'Biopython is not installed')
+class TestStreamStrict(unittest.TestCase):
+    "Streaming output against '--strict' output of each fixture"
+
+    def records(self, name):
+        stream, stream_ids  = convert(os.path.join(DATA, name), False)
+        strict, strict_ids  = convert(os.path.join(DATA, name), True)
+
+        self.assertEqual(stream_ids, strict_ids)
+
+        stream  = split_records(stream)
+        strict  = split_records(strict)
+
+        self.assertEqual(len(stream), len(strict))
+
+        return list(zip(stream, strict))
+
+    def check_same(self, name):
+        for stream, strict in self.records(name):
+            # Header lines other than KW, before the feature table
+            self.assertEqual(
+                [l for l in stream if l[:2] not in ('KW', 'FT', 'SQ', '  ')],
+                [l for l in strict if l[:2] not in ('KW', 'FT', 'SQ', '  ')])
+            self.assertEqual(keywords(stream), keywords(strict))
+            self.assertEqual(features(stream), features(strict))
+            self.assertEqual(sequence(stream), sequence(strict))
+
+    def check_sq(self, name):
+        for stream, strict in self.records(name):
+            sq_stream   = [l for l in stream if l.startswith('SQ')][0]
+            sq_strict   = [l for l in strict if l.startswith('SQ')][0]
+            seq         = sequence(stream).upper()
+            counts      = 'Sequence %d BP; %d A; %d C; %d G; %d T; %d other;' \
+                % (len(seq), seq.count('A'), seq.count('C'), seq.count('G'),
+                   seq.count('T'), len(seq) - sum(seq.count(c)
+                                                  for c in 'ACGT'))
+
+            self.assertEqual(sq_stream, 'SQ   ' + counts)
+            self.assertIn(sq_strict.rstrip(), ('SQ', sq_stream))
+
+    def test_virus(self):
+        "RNA record, a wrapped /translation"
+
+        self.check_same('virus.gbk')
+        self.check_sq('virus.gbk')
+
+    def test_plasmid(self):
+        "Two records, keywords, a bare qualifier, a wrapped /note, mRNA"
+
+        self.check_same('plasmid.gbk')
+        self.check_sq('plasmid.gbk')
+
+    def test_differences(self):
+        "Intended differences are kept as they are"
+
+        stream, _   = convert(os.path.join(DATA, 'plasmid.gbk'), False)
+
+        self.assertIn('KW   plasmid; antibiotic resistance.\n', stream)
+        self.assertIn('KW   .\n', stream)
+        self.assertIn('FT                   /pseudo\n', stream)
+        self.assertIn('FT                   /note="a note long enough to be '
+                      'wrapped over more than\n', stream)
+
+if __name__ == '__main__':
+    unittest.main()
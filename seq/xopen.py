@@ -0,0 +1,328 @@
+#!/usr/bin/python3
+
+'''
+NAME
+
+    xopen.py    - Open plain or compressed sequence files transparently
+
+SYNOPSIS
+
+    from xopen import open_input
+
+    with open_input('seqs.fasta.gz') as fh:
+        ...
+
+DESCRIPTION
+
+    The compression format is detected by magic bytes, not by file name
+    extension:
+
+        gzip    1f 8b
+        bgzip   gzip with a 'BC' extra subfield in the header
+        bz2     'BZh'
+        xz      fd '7zXZ' 00
+        zstd    28 b5 2f fd     (Requires python package 'zstandard')
+
+    BGZF blocks are independent, so they are decompressed by a pool of
+    threads. Other formats are decompressed by a background thread
+    streaming into a bounded queue. In both cases zlib/bz2/lzma release the
+    GIL, so decompression overlaps with parsing in the main thread, and no
+    temporary uncompressed copy is written to disk.
+
+    open_input() always returns a binary buffered reader. Wrap it with
+    io.TextIOWrapper for text based parsers, e.g. Bio.SeqIO.
+
+AUTHORS
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    0.0.1   2026-10-18
+
+'''
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import struct
+import sys
+import threading
+import zlib
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Size of decompressed chunks passed from a background thread
+CHUNK_SIZE  = 1 << 20
+
+# No. of chunks held by the queue between background thread and parser
+QUEUE_DEPTH = 8
+
+# No. of BGZF blocks decompressed by one task of the thread pool
+BGZF_BATCH  = 64
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def sniff(head):
+    """
+    Desc:
+        Detect compression format by the leading bytes of a file.
+    Args:
+        head    - Leading bytes, at least 18 bytes if available
+    Ret:
+        One of 'bgzip', 'gzip', 'bz2', 'xz', 'zstd', or None.
+    """
+
+    if head[:2] == b'\x1f\x8b':
+        # FLG.FEXTRA set and the first extra subfield is 'BC'
+        if len(head) >= 14 and head[3] & 4 and head[12:14] == b'BC':
+            return 'bgzip'
+        else:
+            return 'gzip'
+    elif head[:3] == b'BZh':
+        return 'bz2'
+    elif head[:6] == b'\xfd7zXZ\x00':
+        return 'xz'
+    elif head[:4] == b'\x28\xb5\x2f\xfd':
+        return 'zstd'
+    else:
+        return None
+
+#===========================================================
+
+def compression(fin):
+    "Compression format of a file, or None for a plain file"
+
+    if fin == '-':
+        return sniff(sys.stdin.buffer.peek(18)[:18])
+
+    with open(fin, 'rb') as fh:
+        return sniff(fh.read(18))
+
+#===========================================================
+
+def bgzf_blocks(fh):
+    "Split a BGZF stream into raw compressed blocks"
+
+    while True:
+        header  = fh.read(18)
+
+        if not header:
+            return
+
+        if len(header) < 18 or header[12:14] != b'BC':
+            raise IOError("Invalid BGZF block header.")
+
+        # XLEN at offset 10, BSIZE (total block size - 1) at offset 16
+        xlen,   = struct.unpack('<H', header[10:12])
+        bsize,  = struct.unpack('<H', header[16:18])
+
+        yield header + fh.read(bsize + 1 - 18), 12 + xlen
+
+#===========================================================
+
+def inflate_blocks(blocks):
+    "Decompress a batch of BGZF blocks, and check their CRC32"
+
+    out = []
+
+    for block, data_start in blocks:
+        data    = zlib.decompress(block[data_start:-8], -15)
+        crc, isize  = struct.unpack('<II', block[-8:])
+
+        if zlib.crc32(data) != crc or len(data) != isize:
+            raise IOError("BGZF block CRC32 mismatch.")
+
+        out.append(data)
+
+    return b''.join(out)
+
+#===========================================================
+
+def bgzf_chunks(fh, threads):
+    "Decompressed chunks of a BGZF stream by a pool of threads, in order"
+
+    pending = deque()   # Futures in submitted order
+
+    with ThreadPoolExecutor(threads) as pool:
+        batch   = []
+
+        for block in bgzf_blocks(fh):
+            batch.append(block)
+
+            if len(batch) == BGZF_BATCH:
+                pending.append(pool.submit(inflate_blocks, batch))
+                batch   = []
+
+                # Bound the memory held by decompressed chunks
+                if len(pending) >= threads * 2:
+                    yield pending.popleft().result()
+
+        if batch:
+            pending.append(pool.submit(inflate_blocks, batch))
+
+        while pending:
+            yield pending.popleft().result()
+
+#===========================================================
+
+def stream_chunks(fh):
+    "Decompressed chunks of a stream read by a single file handle"
+
+    while True:
+        chunk   = fh.read(CHUNK_SIZE)
+
+        if not chunk:
+            return
+
+        yield chunk
+
+#===========================================================
+
+def prefetch(chunks, depth=QUEUE_DEPTH):
+    """
+    Desc:
+        Run a chunk generator in a background thread.
+    Args:
+        chunks  - A generator of bytes
+        depth   - Max No. of chunks waiting in the queue
+    Ret:
+        A generator of the same chunks, and an event to stop the thread.
+    """
+
+    q       = queue.Queue(depth)
+    stop    = threading.Event()
+
+    def produce():
+        try:
+            for chunk in chunks:
+                while not stop.is_set():
+                    try:
+                        q.put(chunk, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+
+                if stop.is_set():
+                    break
+
+            if not stop.is_set():
+                q.put(None)
+        except BaseException as err:
+            if not stop.is_set():
+                q.put(err)
+        finally:
+            chunks.close()
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    def consume():
+        while True:
+            chunk   = q.get()
+
+            if chunk is None:
+                return
+            elif isinstance(chunk, BaseException):
+                raise chunk
+
+            yield chunk
+
+    return consume(), stop
+
+#===========================================================
+#
+#                   Classes
+#
+#===========================================================
+
+class ChunkReader(io.RawIOBase):
+    "A read-only raw stream over a generator of bytes chunks"
+
+    def __init__(self, chunks, stop=None, fh=None):
+        self._chunks    = chunks
+        self._stop      = stop      # Event to stop a background thread
+        self._fh        = fh        # Underlying file handle
+        self._buf       = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf:
+            chunk   = next(self._chunks, None)
+
+            if chunk is None:
+                return 0
+
+            self._buf   = memoryview(chunk)
+
+        n       = min(len(b), len(self._buf))
+        b[:n]   = self._buf[:n]
+        self._buf   = self._buf[n:]
+
+        return n
+
+    def close(self):
+        if not self.closed:
+            if self._stop is not None:
+                self._stop.set()
+
+            if self._fh is not None and self._fh is not sys.stdin.buffer:
+                self._fh.close()
+
+        super().close()
+
+#===========================================================
+#
+#                   Main function
+#
+#===========================================================
+
+def open_input(fin, threads=None):
+    """
+    Desc:
+        Open a plain or compressed file for reading in binary mode.
+    Args:
+        fin     - Input file name, or '-' for STDIN
+        threads - No. of threads to decompress BGZF blocks.
+                  Default the No. of CPUs
+    Ret:
+        A binary file object.
+    """
+
+    fh  = sys.stdin.buffer if fin == '-' else open(fin, 'rb')
+    fmt = sniff(fh.peek(18)[:18])
+
+    if fmt is None:
+        return fh
+
+    if fmt == 'bgzip':
+        chunks  = bgzf_chunks(fh, threads or os.cpu_count() or 1)
+    elif fmt == 'gzip':
+        chunks  = stream_chunks(gzip.GzipFile(fileobj=fh))
+    elif fmt == 'bz2':
+        chunks  = stream_chunks(bz2.BZ2File(fh))
+    elif fmt == 'xz':
+        chunks  = stream_chunks(lzma.LZMAFile(fh))
+    else:
+        try:
+            import zstandard
+        except ImportError:
+            sys.exit("[ERROR] Python package 'zstandard' is required "
+                     "to read zstd compressed file '%s'." % fin)
+
+        # Frames of e.g. 'pzstd' or concatenated files, not only the first
+        chunks  = stream_chunks(zstandard.ZstdDecompressor()
+                                .stream_reader(fh, read_across_frames=True))
+
+    chunks, stop    = prefetch(chunks)
+
+    return io.BufferedReader(ChunkReader(chunks, stop, fh), CHUNK_SIZE)
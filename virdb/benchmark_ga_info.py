@@ -0,0 +1,195 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+'''
+NAME
+
+    benchmark_ga_info.py - Benchmark update modes of 'upd_ga_info.py'
+
+SYNOPSIS
+
+    benchmark_ga_info.py [-n <No. of isolates>] [--modes rows,bulk]
+                         [--missing <fraction>] [--template <db>]
+
+DESCRIPTION
+
+    A synthetic virdb database, from the empty 'template.db', and a GISAID
+    information CSV file of N isolates of 8 segments are created in a
+    temporary directory. Each segment is a row of tables 'virus' and
+    'sequence'. A fraction of accessions are not in the database, so that
+    their isolates fail.
+
+    'upd_ga_info.py' is run in each mode on a fresh copy of the database.
+    Tables 'virus' and 'sequence' and the count of updated isolates are
+    checked to be the same as the first mode, and run time is reported:
+
+============================================================
+Mode    Seconds Isolates/s  Speedup <-  Speedup over the first mode
+rows    <sec>   <rate>      1.00
+bulk    <sec>   <rate>      <x>
+============================================================
+
+    Mode 'rows' updates isolate by isolate, and commits every
+    '--batch-size' isolates of 'upd_ga_info.py', default 1000. It may
+    still take long for 100k isolates.
+
+AUTHOR
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    2026-10-18  0.0.1
+'''
+
+import argparse
+import csv
+import hashlib
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+__version__ = '0.0.1'
+
+SEGMENTS    = ('PB2', 'PB1', 'PA', 'HA', 'NP', 'NA', 'MP', 'NS')
+
+# Options of 'upd_ga_info.py' of each mode
+MODES       = {'rows' : [], 'bulk' : ['--bulk']}
+
+#===========================================================
+#
+#                   Subroutines
+#
+#===========================================================
+
+def make_data(fdb, fcsv, num, missing, seed=0):
+    "Create a synthetic database and GISAID information CSV file"
+
+    rnd     = random.Random(seed)
+
+    with sqlite3.connect(fdb) as conn:
+        conn.executemany('INSERT INTO virus (id, strain) VALUES (?, ?)',
+            ((i + 1, 'old') for i in range(num * len(SEGMENTS))))
+        conn.executemany(
+            'INSERT INTO sequence (accession, vir_id) VALUES (?, ?)',
+            (('EPI{}'.format(i + 1), i + 1)
+             for i in range(num * len(SEGMENTS))
+             if rnd.random() >= missing))
+
+    header  = ['Isolate_Id', 'Isolate_Name', 'Subtype', 'Location', 'Host',
+               'Collection_Date', 'Animal_Specimen_Source'] \
+        + [seg + ' Segment_Id' for seg in SEGMENTS]
+
+    with open(fcsv, 'w', newline='') as fh:
+        writer  = csv.writer(fh)
+        writer.writerow(header)
+
+        for n in range(num):
+            row = ['EPI_ISL_{}'.format(n + 1),
+                   'A/place{}/{}/2017'.format(n % 97, n + 1),
+                   'A / H{}N{}'.format(n % 16 + 1, n % 9 + 1),
+                   'Country{}'.format(n % 50), rnd.choice(['Human', 'Swine',
+                   'Chicken', 'Duck']), '2017-{:02d}-01'.format(n % 12 + 1),
+                   '']
+
+            # Some isolates without some segments
+            for i in range(len(SEGMENTS)):
+                row.append('' if rnd.random() < 0.02 else
+                    'EPI{}|A/seg/{}'.format(n * len(SEGMENTS) + i + 1, i))
+
+            writer.writerow(row)
+
+#===========================================================
+
+def table_digest(fdb):
+    "A digest of tables 'virus' and 'sequence'"
+
+    md  = hashlib.blake2b(digest_size=16)
+
+    with sqlite3.connect(fdb) as conn:
+        for sql in ('SELECT * FROM virus ORDER BY id',
+                    'SELECT * FROM sequence ORDER BY id'):
+            for row in conn.execute(sql):
+                md.update(repr(row).encode())
+
+    return md.hexdigest()
+
+#===========================================================
+#
+#                   Main
+#
+#===========================================================
+
+arg_parser  = argparse.ArgumentParser(
+    description="Benchmark update modes of 'upd_ga_info.py'")
+
+arg_parser.add_argument('-n', '--num', action='store', type=int,
+                        default=100000,
+                        help='Number of isolates. Default 100000')
+arg_parser.add_argument('--modes', action='store', default='rows,bulk',
+                        help="Comma separated modes. Default 'rows,bulk'")
+arg_parser.add_argument('--missing', action='store', type=float,
+                        default=0.001,
+                        help='Fraction of accessions not in database. '
+                             'Default 0.001')
+arg_parser.add_argument('--template', action='store',
+                        default=os.path.join(os.path.dirname(
+                            os.path.abspath(__file__)), 'template.db'),
+                        help="Empty virdb database. Default 'template.db'")
+arg_parser.add_argument('-v', '--version', action='version',
+                        version='%(prog)s V' + __version__)
+
+args    = arg_parser.parse_args()
+
+script  = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       'upd_ga_info.py')
+
+with tempfile.TemporaryDirectory() as tmpdir:
+    fbase   = os.path.join(tmpdir, 'base.db')
+    fcsv    = os.path.join(tmpdir, 'gisaid.csv')
+
+    shutil.copyfile(args.template, fbase)
+
+    print('[NOTE] Creating {} isolates ...' . format(args.num))
+    make_data(fbase, fcsv, args.num, args.missing)
+
+    print('Mode\tSeconds\tIsolates/s\tSpeedup')
+
+    ref     = None
+    base    = None
+
+    for mode in args.modes.split(','):
+        fdb = os.path.join(tmpdir, mode + '.db')
+        shutil.copyfile(fbase, fdb)
+
+        start   = time.time()
+        proc    = subprocess.run([sys.executable, script, '-i', fcsv,
+                                  '-d', fdb] + MODES[mode],
+                                 stdout=subprocess.PIPE,
+                                 universal_newlines=True)
+        elapsed = time.time() - start
+
+        if proc.returncode:
+            sys.exit('[ERROR] Mode {} failed!' . format(mode))
+
+        result  = (proc.stdout.rstrip('\n').split('\n')[-1],
+                   table_digest(fdb))
+
+        if ref is None:
+            ref = result
+        elif result != ref:
+            sys.exit('[ERROR] Results of mode {} differ!\n{}\n{}' \
+                . format(mode, ref[0], result[0]))
+
+        base    = base or elapsed
+
+        print('{}\t{:.2f}\t{:.0f}\t{:.2f}' . format(mode, elapsed,
+              args.num / elapsed, base / elapsed))
+
+        os.remove(fdb)
+
+    print(ref[0])
@@ -0,0 +1,312 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+'''
+NAME
+
+    dbwriter.py - Batched and resumable writes into virdb database
+
+SYNOPSIS
+
+    from dbwriter import DbWriter, add_writer_args
+
+    with DbWriter('virdb.db', batch_size=1000, fckpt='in.csv.ckpt',
+                  source='in.csv') as writer:
+        start   = writer.resume()
+
+        for n, row in enumerate(rows):
+            if n < start:
+                continue
+
+            writer.execute(SQL, row)
+            writer.counts['rows'] += 1
+            writer.done(n + 1)
+
+DESCRIPTION
+
+    A write layer shared by virdb updaters, e.g. 'upd_ga_info.py' and
+    'upd_flu_complete.py':
+
+        - Commit every '--batch-size' input records, instead of each one
+        - WAL journal and 'synchronous = NORMAL', which never corrupts the
+          database on a crash, unlike 'synchronous = OFF'
+        - Prepared statements are reused, from the statement cache of the
+          connection, as long as the same SQL text is executed
+        - A checkpoint file of the input offset, i.e. No. of input records,
+          and counters of the last commit
+
+    A record of several statements can be made atomic by savepoint(), and
+    release() or rollback_record(), within a batch.
+
+    After an interrupted run, resume() returns the offset of the checkpoint,
+    if it is of the same input file, unchanged since, and database. The
+    updaters skip records before the offset. Since updates are idempotent,
+    records after the last commit are simply done again. The checkpoint is
+    removed when all records are done.
+
+    Checkpoint file format, tab delimited:
+
+============================================================
+#checkpoint 1
+#input      <input file>    <size>  <mtime_ns>
+#database   <database file>
+#offset     <No. of input records done>
+#count      <name>  <value>             <-  One line per counter
+============================================================
+
+AUTHOR
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    2026-10-18  0.0.1
+'''
+
+import os
+import sqlite3
+import tempfile
+
+from collections import Counter
+
+__version__ = '0.0.1'
+
+CKPT_VERSION    = '1'
+CKPT_SUFFIX     = '.ckpt'
+
+# Input records of a transaction
+BATCH_SIZE      = 1000
+
+# Prepared statements cached by a connection
+CACHED_STATEMENTS   = 256
+
+#===========================================================
+#
+#                   Subroutines
+#
+#===========================================================
+
+def add_writer_args(arg_parser):
+    "Add command line arguments of DbWriter"
+
+    arg_parser.add_argument('--batch-size', action='store', type=int,
+                            dest='batch_size', default=BATCH_SIZE,
+                            help='Input records of a transaction. '
+                                 'Default {}' . format(BATCH_SIZE))
+    arg_parser.add_argument('--checkpoint', action='store', dest='fckpt',
+                            help='Checkpoint file to resume an interrupted '
+                                 'run. Default "<input>' + CKPT_SUFFIX + '"')
+    arg_parser.add_argument('--restart', action='store_true',
+                            help='Ignore the checkpoint, and start over')
+
+#===========================================================
+
+def file_stat(fin):
+    "Size and mtime of a file"
+
+    st  = os.stat(fin)
+
+    return st.st_size, st.st_mtime_ns
+
+#===========================================================
+#
+#                   Classes
+#
+#===========================================================
+
+class DbWriter:
+    '''
+    Desc:
+        Batched writes of a database, with a checkpoint of input offset.
+    Args:
+        db          - SQLite3 database file
+        batch_size  - Input records of a transaction. Default BATCH_SIZE
+        fckpt       - Checkpoint file. Default None, no checkpoint
+        source      - Input file. Default None
+    '''
+
+    def __init__(self, db, batch_size=BATCH_SIZE, fckpt=None, source=None):
+        # Transactions are begun and committed explicitly
+        self.conn       = sqlite3.connect(db, isolation_level=None,
+                            cached_statements=CACHED_STATEMENTS)
+        self.cursor     = self.conn.cursor()
+        self.db         = os.path.abspath(db)
+        self.batch_size = max(batch_size, 1)
+        self.fckpt      = fckpt
+        self.source     = os.path.abspath(source) if source else ''
+        self.offset     = 0         # No. of input records done
+        self.offset_ckpt    = 0     # Of the checkpoint
+        self.pending    = 0         # Records of current transaction
+        self.commits    = 0
+        self.counts     = Counter()
+
+        self.cursor.execute('PRAGMA journal_mode = WAL')
+
+        if self.cursor.fetchone()[0].lower() != 'wal':
+            print('[WARNING] WAL journal mode is not available for "{}".' \
+                . format(db))
+
+        self.cursor.execute('PRAGMA synchronous = NORMAL')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # Uncommitted records are done again by the next run
+            if self.conn.in_transaction:
+                self.cursor.execute('ROLLBACK')
+
+            if self.fckpt and self.offset_ckpt:
+                print('[NOTE] Stopped. Resume from input record {} by '
+                      'checkpoint "{}".' . format(self.offset_ckpt,
+                                                  self.fckpt))
+
+            self.conn.close()
+
+        return False
+
+    def resume(self):
+        '''
+        Desc:
+            Read the checkpoint, if it is of the same input file and
+            database, and restore counters.
+        Ret:
+            No. of input records done, to be skipped.
+        '''
+
+        if not self.fckpt:
+            return 0
+
+        try:
+            fh  = open(self.fckpt, 'r')
+        except OSError:
+            return 0
+
+        items   = {}
+        counts  = Counter()
+
+        with fh:
+            for line in fh:
+                fields  = line.rstrip('\n').split('\t')
+
+                if fields[0] == '#count':
+                    counts[fields[1]]   = int(fields[2])
+                else:
+                    items[fields[0]]    = fields[1:]
+
+        try:
+            valid   = items['#checkpoint'] == [CKPT_VERSION] \
+                and items['#input'][0] == self.source \
+                and tuple(map(int, items['#input'][1:3])) \
+                    == file_stat(self.source) \
+                and items['#database'] == [self.db]
+            offset  = int(items['#offset'][0])
+        except (KeyError, IndexError, ValueError, OSError):
+            valid   = False
+
+        if not valid:
+            print('[WARNING] Checkpoint "{}" is not of this input or '
+                  'database. Start over.' . format(self.fckpt))
+            return 0
+
+        self.offset     = offset
+        self.offset_ckpt    = offset
+        self.counts     = counts
+
+        print('[NOTE] Resume from input record {}, by checkpoint "{}".' \
+            . format(offset, self.fckpt))
+
+        return offset
+
+    def begin(self):
+        "Begin a transaction, if not yet"
+
+        if not self.conn.in_transaction:
+            self.cursor.execute('BEGIN')
+
+    def execute(self, sql, params=()):
+        "Execute a statement in the transaction"
+
+        self.begin()
+
+        return self.cursor.execute(sql, params)
+
+    def executemany(self, sql, seq_params):
+        "Execute a statement of many parameters in the transaction"
+
+        self.begin()
+
+        return self.cursor.executemany(sql, seq_params)
+
+    def savepoint(self):
+        "Start an atomic record of several statements"
+
+        self.begin()
+        self.cursor.execute('SAVEPOINT record')
+
+    def release(self):
+        "Keep statements of the record"
+
+        self.cursor.execute('RELEASE record')
+
+    def rollback_record(self):
+        "Discard statements of the record, but not of the batch"
+
+        self.cursor.execute('ROLLBACK TO record')
+        self.cursor.execute('RELEASE record')
+
+    def done(self, offset):
+        "Input records before offset are done. Commit a full batch"
+
+        self.offset     = offset
+        self.pending    += 1
+
+        if self.pending >= self.batch_size:
+            self.commit()
+
+    def commit(self):
+        "Commit the transaction, then write the checkpoint"
+
+        if self.conn.in_transaction:
+            self.cursor.execute('COMMIT')
+
+        self.pending    = 0
+        self.commits    += 1
+
+        self.write_checkpoint()
+
+    def write_checkpoint(self):
+        "Write the checkpoint, by a temporary file"
+
+        if not self.fckpt:
+            return
+
+        with tempfile.NamedTemporaryFile('w', delete=False, suffix='.tmp',
+                dir=os.path.dirname(self.fckpt) or '.') as fh:
+            fh.write('#checkpoint\t{}\n' . format(CKPT_VERSION))
+
+            if self.source:
+                fh.write('#input\t{}\t{}\t{}\n' . format(self.source,
+                         *file_stat(self.source)))
+
+            fh.write('#database\t{}\n' . format(self.db))
+            fh.write('#offset\t{}\n' . format(self.offset))
+
+            for name, value in sorted(self.counts.items()):
+                fh.write('#count\t{}\t{}\n' . format(name, value))
+
+        os.replace(fh.name, self.fckpt)
+
+        self.offset_ckpt    = self.offset
+
+    def close(self):
+        "Commit the last batch, remove the checkpoint and close"
+
+        self.commit()
+
+        if self.fckpt and os.path.exists(self.fckpt):
+            os.remove(self.fckpt)
+
+        self.conn.close()
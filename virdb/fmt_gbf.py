@@ -7,6 +7,9 @@ NAME
 
 SYNOPSIS
 
+    fmt_gbf.py -i <in .gbf> [-o <out .gbk>] [--incremental]
+               [--ids <id,...>] [--id-file <file>]
+
 DESCRIPTION
     
     A typical NCBI Influenza Virus Sequence Annotation Tools report is:
@@ -66,6 +69,16 @@ REFERENCE   1
     7. Add '/db_xref="taxon:11320"' into 'source' filed of 'FEATURES'. This
        NCBI Taxonomy ID indicates the Influenza A virus species.
 
+    With '--incremental', only new or changed records are reformatted, and
+    the others are copied from the previous output, by a manifest
+    '<out .gbk>.manifest' of record content hashes keyed by
+    'accession.version'. See 'seq/manifest.py'.
+
+    With '--ids' or '--id-file', only the given records, by LOCUS name, are
+    reformatted. They are read by seeks into the .gbf file, by an index
+    '<in .gbf>.gbi', which is rebuilt automatically if the .gbf file
+    changes. See 'seq/gbindex.py'.
+
 AUTHOR
 
     zeroliu-at-gmail-dot-com
@@ -74,46 +87,44 @@ VERSION
     
     0.0.1   2017-06-27
     0.0.2   2017-07-12  Bug fix
+    0.0.3   2026-10-18  Add option '--incremental'.
+    0.0.4   2026-10-18  Add options '--ids' and '--id-file'.
 
 '''
 
 import argparse
+import io
 import os
 # import os.path
 import re
 import sys
 
-__version__ = '0.0.1'
-
-argParser   = argparse.ArgumentParser(
-    description="Reformat NCBI Influenza Virus Sequence Annotation Tool report to a formal Genbank format file.")
-argParser.add_argument('-i', '--in', action='store', 
-    dest='fin', help='Input .gbf file')
-argParser.add_argument('-o', '--out', action='store', 
-    dest='fout', help='Output .gbk file')
-argParser.add_argument('-v', '--version', 
-    action='version', version='%(prog)s')
-
-args        = argParser.parse_args()
-
-# Check whether input file provided
-if not args.fin:
-    print('[ERROR] No INPUT .gbf filename!\n')
-    argParser.print_help()
-    sys.exit()
-
-# Generate output filename, if necessary
-if not args.fout:
-    filename    = os.path.basename(args.fin)
-    basename    = os.path.splitext(filename)[0]
-    args.fout   = basename + '.gbk'
-    print("[NOTICE] Output filename: %s" % (args.fout))
-
-# Operate input .gbf and out .gbk files
-F_newRec    = False # A flag to identify new record
-
-with open(args.fin, 'r') as fh_in, open(args.fout, 'w') as fh_out:
-    for line in fh_in:
+# Shared modules in '../seq'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'seq'))
+
+from gbindex import open_records, read_ids
+from gbkstream import split_records
+from manifest import Manifest
+
+__version__ = '0.0.4'
+
+#===========================================================
+#
+#                   Functions
+#
+#===========================================================
+
+def fmt_lines(lines, fh_out):
+    """
+    Desc:
+        Reformat lines of .gbf records.
+    Args:
+        lines   - An iterator of input lines
+        fh_out  - Output file handle
+    """
+
+    for line in lines:
         line    = line.rstrip() # Remove tailing '\n'
 
         if line.startswith('LOCUS'):
@@ -129,7 +140,7 @@ with open(args.fin, 'r') as fh_in, open(args.fout, 'w') as fh_out:
             num_vbar    = line.count('|')
 
             if num_vbar < 3:
-                line    += next(fh_in)
+                line    += next(lines)
             
             # Replace mulitple spaces into ONE
             line    = ' '.join(line.split())
@@ -183,3 +194,90 @@ with open(args.fin, 'r') as fh_in, open(args.fout, 'w') as fh_out:
             pass
 
         fh_out.write(line + '\n')
+
+#===========================================================
+
+def fmt_record(text):
+    "Reformat the text of a .gbf record"
+
+    fh_out  = io.StringIO()
+
+    fmt_lines(io.StringIO(text), fh_out)
+
+    return fh_out.getvalue()
+
+#===========================================================
+
+def record_key(text):
+    "Key of a record text, 'accession.version' as reformatted"
+
+    for line in text.splitlines():
+        if line.startswith('LOCUS'):
+            return line.split()[1] + '.1'
+
+    return ''
+
+#===========================================================
+#
+#                   Main
+#
+#===========================================================
+
+def main():
+    argParser   = argparse.ArgumentParser(
+        description="Reformat NCBI Influenza Virus Sequence Annotation Tool report to a formal Genbank format file.")
+    argParser.add_argument('-i', '--in', action='store', 
+        dest='fin', help='Input .gbf file')
+    argParser.add_argument('-o', '--out', action='store', 
+        dest='fout', help='Output .gbk file')
+    argParser.add_argument('--incremental', action='store_true',
+        help='Reformat only new or changed records, by a manifest.')
+    argParser.add_argument('--ids', action='store',
+        help='Comma separated IDs of records to reformat.')
+    argParser.add_argument('--id-file', action='store', dest='fid',
+        help='File of IDs of records to reformat, one per line.')
+    argParser.add_argument('-v', '--version', 
+        action='version', version='%(prog)s')
+
+    args        = argParser.parse_args()
+
+    # Check whether input file provided
+    if not args.fin:
+        print('[ERROR] No INPUT .gbf filename!\n')
+        argParser.print_help()
+        sys.exit()
+
+    # Generate output filename, if necessary
+    if not args.fout:
+        filename    = os.path.basename(args.fin)
+        basename    = os.path.splitext(filename)[0]
+        args.fout   = basename + '.gbk'
+        print("[NOTICE] Output filename: %s" % (args.fout))
+
+    if args.incremental and (args.ids or args.fid):
+        print('[ERROR] Option --incremental can not be used with --ids.')
+        sys.exit()
+
+    if args.ids or args.fid:
+        with open_records(args.fin, read_ids(args.ids, args.fid)) as fh_in, \
+            open(args.fout, 'w') as fh_out:
+            fmt_lines(fh_in, fh_out)
+    elif args.incremental:
+        man     = Manifest(args.fout + '.manifest', [args.fout],
+                           settings='fmt_gbf')
+
+        with open(args.fin, 'r') as fh_in:
+            records = ((record_key(text), text)
+                       for text in split_records(fh_in))
+
+            for _ in man.update(records, lambda text: [fmt_record(text)]):
+                pass
+
+        print("[NOTICE] " + man.summary())
+    else:
+        # Operate input .gbf and out .gbk files
+        with open(args.fin, 'r') as fh_in, open(args.fout, 'w') as fh_out:
+            fmt_lines(fh_in, fh_out)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+'''
+NAME
+
+    pipeline.py - Bounded reader/parser/writer pipeline of virdb updaters
+
+SYNOPSIS
+
+    from pipeline import Pipeline, add_pipeline_args
+
+    pipe    = Pipeline(parse_rows, workers=2, depth=8, chunk_size=500)
+
+    for records in pipe.run(csv_reader):
+        ...                             # Write records, in input order
+
+    pipe.report()
+
+DESCRIPTION
+
+    Input records are read by a reader thread in chunks, parsed by a pool
+    of parse worker threads, and handed back to the caller, e.g. the only
+    thread of a SQLite connection, in input order:
+
+============================================================
+reader  --> [ queue ] --> parse workers --> [ queue ] --> writer
+   ^                                                        |
+   +------------------  chunks in flight  <-----------------+
+============================================================
+
+    At most 'depth' chunks are in flight, i.e. read but not yet written,
+    so that a slow writer blocks the reader, i.e. backpressure, and memory
+    is bounded. Chunks parsed out of order are held until the previous ones
+    are written, so results are the same for any number of workers.
+
+    Time of each stage is measured, as busy time and time waiting for
+    the previous stage, or for a free slot of the reader. Parse workers are
+    threads: parsing is overlapped with reading and SQLite writes, which
+    release the GIL, but several workers do not parse in parallel.
+
+AUTHOR
+
+    zeroliu-at-gmail-dot-com
+
+VERSION
+
+    2026-10-18  0.0.1
+'''
+
+import queue
+import threading
+import time
+
+__version__ = '0.0.1'
+
+# Chunks in flight
+QUEUE_DEPTH = 8
+
+# Input records of a chunk
+CHUNK_SIZE  = 500
+
+# Seconds between checks of a stopped pipeline, by a blocked thread
+POLL        = 0.1
+
+#===========================================================
+#
+#                   Subroutines
+#
+#===========================================================
+
+def add_pipeline_args(arg_parser):
+    "Add command line arguments of Pipeline"
+
+    arg_parser.add_argument('-j', '--jobs', action='store', type=int,
+                            default=1,
+                            help='Number of parse threads. Default 1')
+    arg_parser.add_argument('--queue-depth', action='store', type=int,
+                            dest='queue_depth', default=QUEUE_DEPTH,
+                            help='Chunks in flight between reader and '
+                                 'writer. Default {}' . format(QUEUE_DEPTH))
+    arg_parser.add_argument('--chunk-size', action='store', type=int,
+                            dest='chunk_size', default=CHUNK_SIZE,
+                            help='Input records of a chunk. Default {}' \
+                                . format(CHUNK_SIZE))
+
+#===========================================================
+#
+#                   Classes
+#
+#===========================================================
+
+class StageStats:
+    "Records, busy and waiting seconds of a pipeline stage"
+
+    def __init__(self, name):
+        self.name   = name
+        self.items  = 0
+        self.busy   = 0.0
+        self.wait   = 0.0
+        self.lock   = threading.Lock()
+
+    def add(self, items, busy, wait=0.0):
+        with self.lock:
+            self.items  += items
+            self.busy   += busy
+            self.wait   += wait
+
+    def __str__(self):
+        rate    = self.items / self.busy if self.busy else 0
+
+        return '{}\t{}\t{:.2f}\t{:.0f}\t{:.2f}' . format(self.name,
+            self.items, self.busy, rate, self.wait)
+
+#===========================================================
+
+class Pipeline:
+    '''
+    Desc:
+        Parse chunks of input records by worker threads, in order.
+    Args:
+        func        - Function to parse a list of input records, into a list
+                      of results
+        workers     - No. of parse threads. Default 1
+        depth       - Chunks in flight. Default QUEUE_DEPTH
+        chunk_size  - Input records of a chunk. Default CHUNK_SIZE
+    '''
+
+    def __init__(self, func, workers=1, depth=QUEUE_DEPTH,
+                 chunk_size=CHUNK_SIZE):
+        self.func       = func
+        self.workers    = max(workers, 1)
+        self.depth      = max(depth, 1)
+        self.chunk_size = max(chunk_size, 1)
+        self.stats      = [StageStats(name)
+                           for name in ('read', 'parse', 'write')]
+
+    def _read(self, source, in_q, out_q, slots, stop):
+        "Reader thread. Put chunks of (seq, records) into in_q"
+
+        stats   = self.stats[0]
+        records = iter(source)
+        seq     = 0
+
+        try:
+            while not stop.is_set():
+                # A free slot, or wait for the writer
+                start   = time.perf_counter()
+
+                while not slots.acquire(timeout=POLL):
+                    if stop.is_set():
+                        return
+
+                wait    = time.perf_counter() - start
+                start   = time.perf_counter()
+                chunk   = []
+
+                for record in records:
+                    chunk.append(record)
+
+                    if len(chunk) >= self.chunk_size:
+                        break
+
+                stats.add(len(chunk), time.perf_counter() - start, wait)
+
+                if not chunk:
+                    slots.release()
+                    break
+
+                in_q.put((seq, chunk))
+                seq += 1
+        except BaseException as err:
+            out_q.put((seq, None, err))
+        finally:
+            out_q.put((None, seq, None))    # No. of chunks
+
+            for _ in range(self.workers):
+                in_q.put(None)
+
+    def _parse(self, in_q, out_q, stop):
+        "Parse worker thread. Put (seq, results, error) into out_q"
+
+        stats   = self.stats[1]
+
+        while not stop.is_set():
+            start   = time.perf_counter()
+            task    = in_q.get()
+            wait    = time.perf_counter() - start
+
+            if task is None:
+                stats.add(0, 0.0, wait)
+                break
+
+            seq, chunk  = task
+            start       = time.perf_counter()
+
+            try:
+                out_q.put((seq, self.func(chunk), None))
+            except BaseException as err:
+                out_q.put((seq, None, err))
+
+            stats.add(len(chunk), time.perf_counter() - start, wait)
+
+    def run(self, source):
+        '''
+        Desc:
+            Read, parse and yield chunks of results, in input order.
+        Args:
+            source  - An iterable of input records, e.g. a csv.reader
+        Ret:
+            A generator of lists of results, one list of each chunk.
+        '''
+
+        in_q    = queue.Queue()
+        out_q   = queue.Queue()
+        slots   = threading.Semaphore(self.depth)
+        stop    = threading.Event()
+        stats   = self.stats[2]
+        threads = [threading.Thread(target=self._read, daemon=True,
+                                    args=(source, in_q, out_q, slots, stop))]
+        threads += [threading.Thread(target=self._parse, daemon=True,
+                                     args=(in_q, out_q, stop))
+                    for _ in range(self.workers)]
+
+        for thread in threads:
+            thread.start()
+
+        held    = {}    # Chunks parsed out of order
+        nchunks = None
+        seq     = 0
+
+        try:
+            while nchunks is None or seq < nchunks:
+                if seq not in held:
+                    start   = time.perf_counter()
+                    done, results, err  = out_q.get()
+                    stats.wait  += time.perf_counter() - start
+
+                    if err is not None:
+                        raise err
+
+                    if done is None:
+                        nchunks = results
+                    else:
+                        held[done]  = results
+
+                    continue
+
+                results = held.pop(seq)
+                start   = time.perf_counter()
+
+                yield results
+
+                stats.items += len(results)
+                stats.busy  += time.perf_counter() - start
+                seq         += 1
+
+                slots.release()
+        finally:
+            stop.set()
+
+    def report(self):
+        "Print records, busy seconds, throughput and waiting of each stage"
+
+        print('[NOTE] Stage\tRecords\tBusy(s)\tRecords/s\tWait(s)')
+
+        for stats in self.stats:
+            print('[NOTE] {}' . format(stats))
@@ -8,6 +8,9 @@
 #
 # SYNOPSIS
 #
+#   upd_flu_complete.py -d <virdb database> [-i <influenza_na.dat.gz>]
+#                       [--batch-size N] [--checkpoint <file>] [--restart]
+#
 # DESCRIPTION
 #
 #   Based on the NCBI Influenza Virus Resource ftp:
@@ -22,6 +25,15 @@
 #             and/or stop codons.
 #       p   - Partial sequences.
 #
+#   Sequences are updated in batches of '--batch-size' records per
+#   transaction, in WAL journal mode. A checkpoint file, default
+#   '<input>.ckpt', records the records committed, so an interrupted run is
+#   resumed from there, unless '--restart'. See 'dbwriter.py'.
+#
+#   Only sequences of a different completeness are written. Records of
+#   sequences changed, unchanged and not in the database are counted in
+#   the summary.
+#
 # AUTHOR
 #
 #   zeroliu-at-gmail-dot-com
@@ -29,6 +41,8 @@
 # VERSION
 #
 #   0.0.1       2018-07-10  Starting
+#   0.0.2       2026-10-18  Batched commits and checkpoints, by 'dbwriter.py'
+#   0.0.3       2026-10-18  Skip writes of unchanged sequences
 #
 # LICENSE
 #
@@ -37,13 +51,26 @@
 import argparse
 import csv
 import gzip
-import sqlite3
 import sys
 import requests
 
 from collections import namedtuple
 
-__version__ = '0.0.1'
+from dbwriter import CKPT_SUFFIX, DbWriter, add_writer_args
+
+__version__ = '0.0.3'
+
+# Rows of the same completeness are not written
+UPD_SQL     = '''
+    UPDATE sequence
+    SET
+        complete    = ?1
+    WHERE
+        accession   = ?2 AND complete IS NOT ?1
+'''
+
+# Whether a sequence not written is in the database
+ACC_SQL     = 'SELECT 1 FROM sequence WHERE accession = ? LIMIT 1'
 
 
 
@@ -102,6 +129,8 @@ arg_parser.add_argument(
     help = 'SQLite3 database file.'
 )
 
+add_writer_args(arg_parser)
+
 arg_parser.add_argument(
     '-v', '--version', action = 'version',
     version = '%(prog)s V' + __version__
@@ -121,44 +150,47 @@ if not args.fin:
 else:
     fin = args.fin
 
-# Counter for updated sequences
-num_upd_seq = 0
-
-with sqlite3.connect(args.db) as conn, gzip.open(fin, 'rt') as fh_in:
+with DbWriter(args.db, args.batch_size, args.fckpt or fin + CKPT_SUFFIX,
+              fin) as writer, gzip.open(fin, 'rt') as fh_in:
     reader  = csv.reader(fh_in, delimiter = '\t')
-    
-    cursor  = conn.cursor()
 
-    # Enable SQLite3 bulk mode
-    cursor.executescript('''
-       PRAGMA synchronous   = OFF;
-       PRAGMA cache_size    = 100000;
-    ''')
+    writer.cursor.execute('PRAGMA cache_size = 100000')
+
+    start   = 0 if args.restart else writer.resume()
 
     print("[NOTE] Updating table 'sequence' ...")
 
-    for row in reader:
+    for n, row in enumerate(reader):
+        if n < start:   # Done by a previous run
+            continue
+
         acc = row[0]
         completeness    = row[-1]
 
         print("[NOTE] Updating: " , acc)
 
-        sql = '''
-            UPDATE sequence
-            SET
-                complete    = ?
-            WHERE
-                accession   = ?
-        '''
-
+        # A failed statement changes nothing, the batch is kept
         try:
-            cursor.execute(sql, (completeness, acc,))
+            changed = writer.execute(UPD_SQL, (completeness, acc,)).rowcount
         except Exception as err:
-            print("[ERROR] Update table 'sequence' failed!\n, err")
-            conn.rollback()
+            print("[ERROR] Update table 'sequence' failed!\n", err)
         else:
-            conn.commit()
-            num_upd_seq += 1
+            writer.counts['sequences']  += 1
+
+            if changed:
+                writer.counts['changed']    += 1
+            elif writer.execute(ACC_SQL, (acc,)).fetchone():
+                writer.counts['unchanged']  += 1
+            else:
+                writer.counts['missing']    += 1
+
+        writer.done(n + 1)
+
+# Counter for updated sequences
+num_upd_seq = writer.counts['sequences']
 
+print('[NOTE] Sequences changed {}, unchanged {}, not in database {}.' \
+    . format(writer.counts['changed'], writer.counts['unchanged'],
+             writer.counts['missing']))
 print('[DONE] Updated {} sequences.\n' . format(num_upd_seq))
 
@@ -8,11 +8,53 @@ NAME
                      
 SYNOPSIS
 
+    upd_ga_info.py -i <GISAID CSV file> -d <virdb database> [--bulk]
+                   [--misses <report file>] [--batch-size N]
+                   [--checkpoint <file>] [--restart] [-j N]
+                   [--queue-depth N] [--chunk-size N]
+
 DESCRIPTION
 
     Update information for GISAID sequence database.
 
     Especially the 'virus' and 'sequence' tables.
+
+    By default, each isolate is updated by UPDATEs of each segment, as one
+    savepoint, and committed by batches of '--batch-size' isolates, in WAL
+    journal mode. A checkpoint file, default '<input>.ckpt', records the
+    isolates committed, so an interrupted run is resumed from there, unless
+    '--restart'. See 'dbwriter.py'.
+
+    With '--bulk', the CSV file is parsed and loaded into temporary staging
+    tables by executemany(), and tables 'sequence' and 'virus' are updated
+    by a few set based UPDATE ... FROM joins, in one transaction. Results
+    and the count of updated isolates are the same. It needs SQLite 3.33.0
+    or later.
+
+    Only rows of which any value differs are written, by 'IS NOT' guards of
+    each UPDATE, so that unchanged rows of a new release do not touch
+    indexes. Isolates changed, unchanged and with missing accessions are
+    counted in the summary.
+
+    CSV rows are read by a reader thread and parsed by '--jobs' parse
+    threads, in chunks of '--chunk-size' rows, and written by the main
+    thread, the only one of the database connection, in order of the CSV
+    file. At most '--queue-depth' chunks are in flight, so a slow writer
+    holds back the reader. Records, busy and waiting seconds of each stage
+    are reported. See 'pipeline.py'.
+
+    'vir_id' of all accessions of the CSV file, in bulk mode, or of each
+    chunk, is loaded by one query, into
+    a dict, or sorted arrays for more than 1M accessions. An isolate with
+    any accession not found in table 'sequence' is not updated, and the
+    accessions are written into a report, default '<input>.misses'. Rows
+    done by a previous run are skipped unparsed on resume, so the report
+    is of the rows of this run only:
+
+============================================================
+#Isolate_Id Segment Accession
+EPI_ISL_1   HA      EPI123
+============================================================
     
 AUTHOR
 
@@ -21,15 +63,164 @@ AUTHOR
 VERSION
 
     2017-06-28  0.0.1
+    2026-10-18  0.0.2   Add option '--bulk', by staging tables.
+    2026-10-18  0.0.3   Preload 'vir_id' of accessions. Report misses.
+    2026-10-18  0.0.4   Batched commits and checkpoints, by 'dbwriter.py'.
+    2026-10-18  0.0.5   Skip writes of unchanged rows.
+    2026-10-18  0.0.6   Pipelined reader, parse and writer threads.
 '''
 
 import argparse
 import csv
+import itertools
 import os
+import re
 import sqlite3
 import sys
 
-__version__ = '0.0.1'
+from array import array
+from bisect import bisect_left
+
+from dbwriter import CKPT_SUFFIX, DbWriter, add_writer_args
+from pipeline import Pipeline, add_pipeline_args
+
+__version__ = '0.0.6'
+
+SEGMENTS    = ('PB2', 'PB1', 'PA', 'HA', 'NP', 'NA', 'MP', 'NS')
+
+# Value of 'sequence.segment' of each segment
+# SEGMENT_NAMES   = {'PB2' : '1', 'PB1' : '2', 'PA' : '3', 'HA' : '4', \
+#                    'NP' : '5', 'NA' : '6', 'MP' : '7', 'NS' : '8'}
+
+SEGMENT_NAMES   = {'PB2' : 'PB2', 'PB1' : 'PB1', 'PA' : 'PA', \
+                   'HA' : 'HA', 'NP' : 'NP', 'NA' : 'NA', \
+                   'MP' : 'MP', 'NS' : 'NS'}
+
+# No. of accessions of a VirIdMap, from which sorted arrays are used
+ARRAY_MIN   = 1 << 20
+
+# Accession of a prefix and digits, e.g. 'EPI123456'
+ACC_RE      = re.compile(r'^(\D*)(\d+)$')
+
+# 'vir_id' of the first sequence of each accession, i.e. of an index scan
+VIRID_SQL   = '''
+    SELECT accession, vir_id FROM sequence
+    WHERE id IN (SELECT MIN(id) FROM sequence
+                 WHERE accession IN (SELECT accession FROM want_acc)
+                 GROUP BY accession)
+'''
+
+# Rows of the same values are not written, so that indexes and the WAL are
+# not touched. 'IS NOT' is true for NULL and a value
+UPD_SEQ_SQL = '''
+    UPDATE sequence 
+    SET 
+        segment = ?1
+    WHERE 
+        vir_id = ?2 AND segment IS NOT ?1
+'''
+
+UPD_VIR_SQL = '''
+    UPDATE virus
+    SET
+        strain          = ?1,
+        isolate         = ?2,
+        serotype        = ?3,
+        country         = ?4,
+        host            = ?5,
+        collect_date    = ?6,
+        tissue_type     = ?7
+    WHERE
+        id  = ?8
+        AND (strain, isolate, serotype, country, host, collect_date,
+             tissue_type) IS NOT (?1, ?2, ?3, ?4, ?5, ?6, ?7)
+'''
+
+# Staged isolates of any row to be changed, before BULK_SQLS updates
+CHANGED_SQL = '''
+    SELECT COUNT(DISTINCT last.n) FROM stage_last AS last
+    JOIN stage_isolate AS iso ON iso.n = last.n
+    WHERE
+        EXISTS (SELECT 1 FROM sequence
+                WHERE vir_id = last.vir_id AND segment IS NOT last.segment)
+        OR EXISTS (SELECT 1 FROM virus
+                   WHERE id = last.vir_id
+                   AND (strain, isolate, serotype, country, host,
+                        collect_date, tissue_type)
+                       IS NOT (iso.strain, iso.isolate, iso.serotype,
+                               iso.country, iso.host, iso.collect_date,
+                               iso.tissue_type))
+'''
+
+# Staging tables of bulk mode. 'ord' is the order of a segment update
+STAGE_SQLS  = (
+    '''
+    CREATE TEMP TABLE stage_isolate (
+        n               INTEGER PRIMARY KEY,
+        strain          TEXT,
+        isolate         TEXT,
+        serotype        TEXT,
+        country         TEXT,
+        host            TEXT,
+        collect_date    TEXT,
+        tissue_type     TEXT
+    )
+    ''',
+    '''
+    CREATE TEMP TABLE stage_segment (
+        ord             INTEGER PRIMARY KEY,
+        n               INTEGER,
+        segment         TEXT,
+        accession       TEXT,
+        vir_id          INTEGER
+    )
+    ''',
+    '''
+    CREATE TEMP TABLE stage_last (
+        vir_id          INTEGER PRIMARY KEY,
+        segment         TEXT,
+        n               INTEGER
+    )
+    ''',
+)
+
+BULK_SQLS   = (
+    # The last update of each 'vir_id' wins, as row by row. Ordered by
+    # 'vir_id', so that tables are updated in order of rowid
+    '''
+    INSERT INTO stage_last
+    SELECT vir_id, segment, n FROM stage_segment
+    WHERE ord IN (SELECT MAX(ord) FROM stage_segment GROUP BY vir_id)
+    ''',
+    '''
+    UPDATE sequence
+    SET
+        segment = last.segment
+    FROM stage_last AS last
+    WHERE
+        sequence.vir_id = last.vir_id
+        AND sequence.segment IS NOT last.segment
+    ''',
+    '''
+    UPDATE virus
+    SET
+        strain          = iso.strain,
+        isolate         = iso.isolate,
+        serotype        = iso.serotype,
+        country         = iso.country,
+        host            = iso.host,
+        collect_date    = iso.collect_date,
+        tissue_type     = iso.tissue_type
+    FROM stage_last AS last
+    JOIN stage_isolate AS iso ON iso.n = last.n
+    WHERE
+        virus.id = last.vir_id
+        AND (virus.strain, virus.isolate, virus.serotype, virus.country,
+             virus.host, virus.collect_date, virus.tissue_type)
+            IS NOT (iso.strain, iso.isolate, iso.serotype, iso.country,
+                    iso.host, iso.collect_date, iso.tissue_type)
+    ''',
+)
 
 #===========================================================
 #
@@ -37,22 +228,344 @@ __version__ = '0.0.1'
 #
 #===========================================================
 
-def get_virid(conn, acc):
-    "Query table 'sequence' for 'vir_id'"
+def load_virids(conn, accs):
+    """
+    Desc:
+        Load 'vir_id' of given accessions from table 'sequence' at once.
+    Args:
+        conn    - Database connection
+        accs    - A set of accessions, e.g. of the CSV file
+    Ret:
+        A VirIdMap of accession -> 'vir_id' of the first sequence of the
+        accession, the same as a query by accession.
+    """
+
+    cursor  = conn.cursor()
+    own     = not conn.in_transaction   # Or within a batch of the writer
+
+    if own:
+        cursor.execute('BEGIN')
+
+    cursor.execute('CREATE TEMP TABLE want_acc (accession TEXT PRIMARY KEY)'
+                   ' WITHOUT ROWID')
+    cursor.executemany('INSERT INTO want_acc VALUES (?)',
+                       ((acc,) for acc in accs))
+    cursor.execute(VIRID_SQL)
+
+    virids  = VirIdMap(cursor, len(accs))
+
+    cursor.execute('DROP TABLE temp.want_acc')
+
+    if own:
+        conn.commit()
+
+    return virids
+
+#===========================================================
+
+def isolate_accs(isolates):
+    "A set of accessions of isolates"
+
+    return {a for _, acc in isolates for a in acc.values() if a}
+
+#===========================================================
+
+def parse_rows(rows):
+    "Parse a chunk of CSV rows, in a parse thread of the pipeline"
+
+    return [parse_row(row) for row in rows]
+
+#===========================================================
+
+def write_misses(fmiss, misses):
+    "Write accessions not found, of isolate ID, segment and accession"
+
+    with open(fmiss, 'w') as fh:
+        fh.write('#Isolate_Id\tSegment\tAccession\n')
+
+        for miss in misses:
+            fh.write('\t'.join(miss) + '\n')
+
+#===========================================================
+
+def parse_row(row):
+    """
+    Desc:
+        Parse a row of GISAID information CSV file.
+    Args:
+        row     - A dictionary of CSV row, by csv.DictReader
+    Ret:
+        info    - A tuple of strain, isolate, serotype, country, host,
+                  collect_date and tissue_type, in order of table 'virus'
+                  update
+        acc     - A dictionary of segment -> EPI accession number, '' if
+                  missing
+    """
+
+    info    = (row['Isolate_Name'] or '', row['Isolate_Id'] or '',
+               row['Subtype'].split()[2] or '', row['Location'] or '',
+               row['Host'] or '', row['Collection_Date'] or '',
+               row['Animal_Specimen_Source'] or '')
+
+    # Segment EPI accession numbers
+    acc     = dict()
+
+    for seg in SEGMENTS:
+        acc[seg]    = row[seg + ' Segment_Id'].split('|')[0].strip() or ''
+
+    return info, acc
+
+#===========================================================
+
+def isolate_virids(info, acc, virids, misses):
+    """
+    Desc:
+        'vir_id' of each segment of an isolate, by the preloaded mapping.
+    Args:
+        info    - Isolate information, by parse_row()
+        acc     - Segment accessions, by parse_row()
+        virids  - A VirIdMap, by load_virids()
+        misses  - A list of (isolate ID, segment, accession) not found,
+                  which misses of the isolate are appended to
+    Ret:
+        A list of (segment, 'vir_id'), or None if any accession is not
+        found, so the isolate is not updated.
+    """
+
+    segs    = []
+    found   = True
+
+    for seg in SEGMENTS:
+        if not acc[seg]:
+            continue
+
+        vir_id  = virids.get(acc[seg])
+
+        if vir_id is None:
+            misses.append((info[1], seg, acc[seg]))
+            found   = False
+        else:
+            segs.append((seg, vir_id))
+
+    return segs if found else None
+
+#===========================================================
+
+def update_rows(writer, isolates, virids, misses, first=0):
+    """
+    Desc:
+        Update tables 'sequence' and 'virus' isolate by isolate. Each
+        isolate is atomic, and committed by batches of the writer.
+
+        Counters 'changed', 'unchanged' and 'missing' of isolates are
+        kept in the writer.
+    Args:
+        writer      - A DbWriter
+        isolates    - A list of (info, acc), by parse_row()
+        virids      - A VirIdMap, by load_virids()
+        misses      - A list, which accessions not found are appended to
+        first       - 0-based No. of the first isolate in the CSV file.
+                      Default 0
+    Ret:
+        No. of correctly updated isolates, including a previous run.
+    """
+
+    for n, (info, acc) in enumerate(isolates, first):
+        segs    = isolate_virids(info, acc, virids, misses)
+
+        print('Isolate: ', info[1])
+
+        if segs is None:
+            print('[WARNING] Accession not found. Skip isolate.')
+            writer.counts['missing']    += 1
+            writer.done(n + 1)
+            continue
+
+        # Update 'virus' and 'sequence' tables
+        writer.savepoint()
+
+        changed = 0     # Rows written
+
+        try:
+            for seg, vir_id in segs:
+                print('Segment: {}\tAccession: "{}"' \
+                    . format(seg, acc[seg]))
+
+                # Update 'sequence.segment'
+                changed += writer.execute(UPD_SEQ_SQL,
+                    (SEGMENT_NAMES[seg], vir_id,)).rowcount
+
+                # Update table 'virus'
+                changed += writer.execute(UPD_VIR_SQL,
+                    info + (vir_id,)).rowcount
+
+        except Exception as err:
+            print('[ERROR] Update table failed!\n', err)
+
+            # Show Error type, filename and line no.
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+            print('Type: {}\nFilename: {}\nLine No. {}\n' \
+                . format(exc_type, fname, exc_tb.tb_lineno))
+            writer.rollback_record()
+        else:
+            writer.release()
+
+            writer.counts['isolates']   += 1
+            writer.counts['changed' if changed else 'unchanged']    += 1
+
+        writer.done(n + 1)
+
+    return writer.counts['isolates']
+
+#===========================================================
+
+def update_bulk(writer, isolates, virids, misses):
+    """
+    Desc:
+        Update tables 'sequence' and 'virus' by set based UPDATE ... FROM
+        joins with temporary staging tables, in one transaction.
+
+        The result is the same as update_rows(). An isolate with any
+        accession not found is not staged, and the last isolate of a
+        'vir_id' in the CSV file wins. Isolates of which all 'vir_id' are
+        taken by later isolates are counted as unchanged.
+    Args:
+        writer      - A DbWriter
+        isolates    - A list of (info, acc), by parse_row()
+        virids      - A VirIdMap, by load_virids()
+        misses      - A list, which accessions not found are appended to
+    Ret:
+        No. of correctly updated isolates. Exit if the update fails.
+    """
+
+    if sqlite3.sqlite_version_info < (3, 33, 0):
+        sys.exit('[ERROR] Bulk mode needs SQLite >= 3.33.0, not {}.' \
+            . format(sqlite3.sqlite_version))
+
+    stage_isos  = []
+    stage_segs  = []
+
+    # Order of each segment update, as update_rows()
+    for n, (info, acc) in enumerate(isolates):
+        segs    = isolate_virids(info, acc, virids, misses)
+
+        if segs is None:
+            continue
+
+        stage_isos.append((n,) + info)
+        stage_segs  += [(n * len(SEGMENTS) + SEGMENTS.index(seg), n,
+                         SEGMENT_NAMES[seg], acc[seg], vir_id)
+                        for seg, vir_id in segs]
 
     try:
-        cursor  = conn.cursor()
-        sql = 'SELECT vir_id FROM sequence WHERE accession = ?'
-        cursor.execute(sql, (acc,))
+        for sql in STAGE_SQLS:
+            writer.execute(sql)
 
-    # Since one sqeuence 'accession' related to one 'vir_id'
-        row = cursor.fetchone()
+        writer.executemany('INSERT INTO stage_isolate VALUES ' \
+            '(?, ?, ?, ?, ?, ?, ?, ?)', stage_isos)
+        writer.executemany('INSERT INTO stage_segment VALUES ' \
+            '(?, ?, ?, ?, ?)', stage_segs)
 
-    except Exception as err: 
-        print('[ERROR] Query table "sequence" failed!\n', err)
-    else:
-        # return row['vir_id']
-        return row[0]
+        writer.execute(BULK_SQLS[0])
+
+        changed = writer.execute(CHANGED_SQL).fetchone()[0]
+
+        for sql in BULK_SQLS[1:]:
+            writer.execute(sql)
+
+        for table in ('stage_isolate', 'stage_segment', 'stage_last'):
+            writer.execute('DROP TABLE temp.' + table)
+    except Exception as err:
+        if writer.conn.in_transaction:
+            writer.cursor.execute('ROLLBACK')
+
+        # Exit non-zero, nothing is updated
+        sys.exit('[ERROR] Bulk update failed!\n{}' . format(err))
+
+    # One transaction of all isolates
+    writer.counts['isolates']   = len(stage_isos)
+    writer.counts['changed']    = changed
+    writer.counts['unchanged']  = len(stage_isos) - changed
+    writer.counts['missing']    = len(isolates) - len(stage_isos)
+    writer.offset               = len(isolates)
+    writer.commit()
+
+    print('[NOTE] Staged isolates {}, segments {}.' \
+        . format(len(stage_isos), len(stage_segs)))
+
+    return len(stage_isos)
+
+#===========================================================
+#
+#                   Classes
+#
+#===========================================================
+
+class VirIdMap:
+    """
+    Desc:
+        Mapping of accession -> 'vir_id'. A dict, or for many accessions of
+        one prefix and digits, e.g. 'EPI123456', sorted arrays of numbers
+        and 'vir_id' of 16 bytes per accession, searched by bisection.
+    Args:
+        rows    - An iterable of (accession, vir_id)
+        size    - Expected No. of accessions. Default 0
+    """
+
+    def __init__(self, rows, size=0):
+        self.prefix = None
+        self.nums   = None
+        self.virids = None
+        self.map    = {}
+
+        if size < ARRAY_MIN:
+            self.map    = dict(rows)
+            return
+
+        nums    = array('q')
+        virids  = array('q')
+
+        for acc, vir_id in rows:
+            match   = ACC_RE.match(acc)
+
+            if self.prefix is None and match:
+                self.prefix = match.group(1)
+
+            # Digits of leading zeros are not a unique number
+            if not match or match.group(1) != self.prefix \
+                or match.group(2).startswith('0'):
+                self.map[acc]   = vir_id
+            else:
+                nums.append(int(match.group(2)))
+                virids.append(vir_id)
+
+        order       = sorted(range(len(nums)), key=nums.__getitem__)
+        self.nums   = array('q', (nums[i] for i in order))
+        self.virids = array('q', (virids[i] for i in order))
+
+    def get(self, acc):
+        "'vir_id' of an accession, or None"
+
+        if acc in self.map or self.nums is None:
+            return self.map.get(acc)
+
+        match   = ACC_RE.match(acc)
+
+        if not match or match.group(1) != self.prefix:
+            return None
+
+        num = int(match.group(2))
+        i   = bisect_left(self.nums, num)
+
+        if i < len(self.nums) and self.nums[i] == num \
+            and str(num) == match.group(2):
+            return self.virids[i]
+
+        return None
+
+    def __len__(self):
+        return len(self.map) + (len(self.nums) if self.nums else 0)
 
 #===========================================================
 #
@@ -69,6 +582,14 @@ arg_parser.add_argument('-i', '--in', action='store', dest='fin',
                         help='Input GISAID information file')
 arg_parser.add_argument('-d', '--db', action='store', dest='db',
                         help='SQLite3 database file')
+arg_parser.add_argument('--bulk', action='store_true',
+                        help='Update by staging tables and set based '
+                             'UPDATE ... FROM joins, in one transaction')
+add_writer_args(arg_parser)
+add_pipeline_args(arg_parser)
+arg_parser.add_argument('--misses', action='store', dest='fmiss',
+                        help='Output report of accessions not found. '
+                             'Default "<input>.misses"')
 arg_parser.add_argument('-v', '--version', action='version',
                         version='%(prog)s V' + __version__)
 
@@ -85,98 +606,57 @@ elif not args.db:
 else:
     pass
     
-# A dictionary for segment
-# segments    = {'PB2' : '1', 'PB1' : '2', 'PA' : '3', 'HA' : '4', \
-#                 'NP' : '5', 'NA' : '6', 'MP' : '7', 'NS' : '8'}
+# Accessions not found, of (isolate ID, segment, accession)
+misses  = []
 
-segments    = {'PB2' : 'PB2', 'PB1' : 'PB1', 'PA' : 'PA', \
-               'HA' : 'HA', 'NP' : 'NP', 'NA' : 'NA', \
-               'MP' : 'MP', 'NS' : 'NS'}
+with DbWriter(args.db, args.batch_size, args.fckpt or args.fin + CKPT_SUFFIX,
+              args.fin) as writer, open(args.fin, 'r') as fh_in:
+    reader  = csv.DictReader(fh_in) # Header lines
 
-# A counter for number of correcty updated records
-iso_counter = 0
-seq_counter = 0
+    # Rows are read and parsed by threads, and written by this thread only
+    pipe    = Pipeline(parse_rows, args.jobs, args.queue_depth,
+                       args.chunk_size)
 
-with sqlite3.connect(args.db) as conn, open(args.fin, 'r') as fh_in:
-    reader  = csv.DictReader(fh_in) # Header lines
+    if args.bulk:
+        isolates    = [iso for chunk in pipe.run(reader) for iso in chunk]
 
-    cursor  = conn.cursor()
-    
-    for row in reader:
-        # print('[ROW] ', row)
-        isolate     = row['Isolate_Id'] or ''
-        strain      = row['Isolate_Name'] or ''
-        serotype    = row['Subtype'].split()[2] or ''
-        country     = row['Location'] or ''
-        host        = row['Host'] or ''
-        collect_date    = row['Collection_Date'] or ''
-        tissue_type     = row['Animal_Specimen_Source'] or ''
-
-        print('Isolate: ', isolate)
-
-        # Segment EPI accession numbers
-        acc         = dict()
-        acc['PB2']  = row['PB2 Segment_Id'].split('|')[0].strip() or ''
-        acc['PB1']  = row['PB1 Segment_Id'].split('|')[0].strip() or ''
-        acc['PA']   = row['PA Segment_Id'].split('|')[0].strip() or ''
-        acc['HA']   = row['HA Segment_Id'].split('|')[0].strip() or ''
-        acc['NP']   = row['NP Segment_Id'].split('|')[0].strip() or ''
-        acc['NA']   = row['NA Segment_Id'].split('|')[0].strip() or ''
-        acc['MP']   = row['MP Segment_Id'].split('|')[0].strip() or ''
-        acc['NS']   = row['NS Segment_Id'].split('|')[0].strip() or ''
+        # 'vir_id' of all accessions of the CSV file, by one query
+        virids  = load_virids(writer.conn, isolate_accs(isolates))
+        loaded  = len(virids)
 
-        # Update 'virus' and 'sequence' tables
-        try:
-            for seg in ('PB2', 'PB1', 'PA', 'HA', 'NP', 'NA', 'MP', 'NS'):
-                # print('Segment: {}\tAccession: {}' . format(seg, acc[seg]))
-                if not acc[seg]:
-                    next
-                else:
-                    print('Segment: {}\tAccession: "{}"' \
-                        . format(seg, acc[seg]))
-                    vir_id  = get_virid(conn, acc[seg])   # get 'vir_id'
-
-                    # Update 'sequence.segment'
-                    sql = '''
-                        UPDATE sequence 
-                        SET 
-                            segment = ?
-                        WHERE 
-                            vir_id = ?
-                    '''
-
-                    cursor.execute(sql, (segments[seg], vir_id,))
-
-                    # Update table 'virus'
-                    sql = '''
-                        UPDATE virus
-                        SET
-                            strain          = ?,
-                            isolate         = ?,
-                            serotype        = ?,
-                            country         = ?,
-                            host            = ?,
-                            collect_date    = ?,
-                            tissue_type     = ?
-                        WHERE
-                            id  = ?
-                    '''
-
-                    cursor.execute(sql, (strain, isolate, serotype, \
-                        country, host, collect_date, tissue_type, vir_id,))
+        iso_counter = update_bulk(writer, isolates, virids, misses)
+    else:
+        first   = 0 if args.restart else writer.resume()
+        loaded  = 0
 
-        except Exception as err:
-            print('[ERROR] Update table failed!\n', err)
+        # Rows done by a previous run are neither parsed nor looked up
+        rows    = itertools.islice(reader, first, None)
 
-            # Show Error type, filename and line no.
-            exc_type, exc_obj, exc_tb = sys.exc_info()
-            fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
-            print('Type: {}\nFilename: {}\nLine No. {}\n' \
-                . format(exc_type, fname, exc_tb.tb_lineno))
-            conn.rollback()
-        else:
-            conn.commit()
+        # 'vir_id' of accessions of each chunk, by one query
+        for isolates in pipe.run(rows):
+            virids  = load_virids(writer.conn, isolate_accs(isolates))
+            loaded  += len(virids)
+
+            update_rows(writer, isolates, virids, misses, first)
+
+            first   += len(isolates)
+
+        iso_counter = writer.counts['isolates']
+
+    print('[NOTE] Loaded "vir_id" of {} accessions.' . format(loaded))
+
+    pipe.report()
+
+    counts  = writer.counts
+
+if misses:
+    fmiss   = args.fmiss or args.fin + '.misses'
+
+    write_misses(fmiss, misses)
 
-            iso_counter += 1
+    print('[WARNING] {} accessions not found, of {} isolates, in "{}".' \
+        . format(len(misses), len({m[0] for m in misses}), fmiss))
 
+print('[NOTE] Isolates changed {}, unchanged {}, missing accessions {}.' \
+    . format(counts['changed'], counts['unchanged'], counts['missing']))
 print('[DONE] Successfully updated {} isolates.' . format(iso_counter))